@@ -0,0 +1,162 @@
+"""
+Admission control for outbound patent searches.
+
+BigQuery caps how many queries a project runs at once and fails the rest, so
+searches take a slot from an AdmissionController before they reach the
+backend. At most ``max_concurrent`` run at a time; up to ``max_waiting`` more
+wait for a slot in arrival order, each for at most ``max_wait_seconds``.
+Searches beyond that are refused with AdmissionRejected, which carries a
+Retry-After hint, instead of being sent on to fail at BigQuery.
+
+The limits are per process. Each API process (e.g. each uvicorn or gunicorn
+worker) has its own controller, so the project-wide ceiling is the limit
+times the number of processes; size SEARCH_MAX_CONCURRENT for that.
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque
+
+import metrics
+
+DEFAULT_MAX_CONCURRENT = int(os.getenv("SEARCH_MAX_CONCURRENT", "8"))
+# As deep as the slot count, so an admitted waiter waits about one search at most
+DEFAULT_MAX_WAITING = int(os.getenv("SEARCH_MAX_WAITING", str(DEFAULT_MAX_CONCURRENT)))
+DEFAULT_MAX_WAIT_SECONDS = float(os.getenv("SEARCH_MAX_WAIT_SECONDS", "30"))
+
+# Reasons a search is refused
+QUEUE_FULL = "queue_full"
+QUEUE_TIMEOUT = "queue_timeout"
+
+WAIT_SECONDS = metrics.histogram(
+    "fto_search_admission_wait_seconds", "Time searches waited for a backend slot, admitted or not", ["outcome"]
+)
+REJECTED = metrics.counter("fto_search_admission_rejected_total", "Searches refused by admission control", ["reason"])
+
+
+class AdmissionRejected(Exception):
+    """A search was refused a backend slot; retry after ``retry_after`` seconds"""
+
+    def __init__(self, message: str, reason: str, retry_after: int):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Counting semaphore with a bounded FIFO wait queue and a wait deadline.
+    Not bound to an event loop: waiters are futures of whichever loop is
+    running when they queue.
+    """
+
+    def __init__(self, max_concurrent: int = DEFAULT_MAX_CONCURRENT, max_waiting: int = DEFAULT_MAX_WAITING,
+                 max_wait_seconds: float = DEFAULT_MAX_WAIT_SECONDS):
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.max_wait_seconds = max_wait_seconds
+        self.running = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def saturated(self) -> bool:
+        """True while a new search would be refused outright"""
+        return self.running >= self.max_concurrent and self.waiting >= self.max_waiting
+
+    @property
+    def retry_after(self) -> int:
+        """Seconds a refused caller should wait: long enough for the queue to move"""
+        return max(1, math.ceil(self.max_wait_seconds / 2))
+
+    def check(self):
+        """Raise AdmissionRejected now if a search would be refused, before any work starts"""
+        if self.saturated:
+            self._reject(QUEUE_FULL, f"{self.waiting} searches are already waiting for a backend slot")
+
+    async def acquire(self):
+        started = time.perf_counter()
+        if self.running < self.max_concurrent and not self._waiters:
+            self.running += 1
+            self._admit(started)
+            return
+        self.check()
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        # A timer rather than wait_for, which before Python 3.12 swallows a
+        # cancellation that arrives after the slot was handed over
+        deadline = loop.call_later(self.max_wait_seconds, self._expire, waiter)
+        try:
+            await waiter
+        except asyncio.TimeoutError:
+            WAIT_SECONDS.observe(time.perf_counter() - started, outcome=QUEUE_TIMEOUT)
+            self._reject(QUEUE_TIMEOUT, f"No backend slot became free within {self.max_wait_seconds} seconds")
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # The slot was handed over just as the caller gave up; pass it on
+                self.release()
+            else:
+                self._discard(waiter)
+            raise
+        finally:
+            deadline.cancel()
+        self._admit(started)
+
+    def release(self):
+        """Hand the slot to the longest waiter, or free it"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.running -= 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _admit(self, started: float):
+        self.admitted += 1
+        WAIT_SECONDS.observe(time.perf_counter() - started, outcome="admitted")
+
+    def _expire(self, waiter: asyncio.Future):
+        """Fail a waiter whose deadline passed before a slot was handed to it"""
+        if not waiter.done():
+            self._discard(waiter)
+            waiter.set_exception(asyncio.TimeoutError())
+
+    def _discard(self, waiter: asyncio.Future):
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _reject(self, reason: str, message: str):
+        self.rejected += 1
+        REJECTED.inc(reason=reason)
+        raise AdmissionRejected(message, reason, self.retry_after)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_waiting": self.max_waiting,
+            "max_wait_seconds": self.max_wait_seconds,
+            "running": self.running,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
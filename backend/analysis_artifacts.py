@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Dict, Optional
+import json
+
+from sqlalchemy.orm import Session
+
+from database import AnalysisArtifact
+
+# Artifact kinds
+RISK = "risk"
+REPORT = "report"
+
+
+def load_artifact(db: Session, analysis_id: str, kind: str, model_version: str) -> Optional[str]:
+    """
+    Stored JSON payload for ``analysis_id``/``kind`` if it was computed with
+    ``model_version``; stale or missing artifacts return None.
+    """
+    artifact = db.get(AnalysisArtifact, (analysis_id, kind))
+    if artifact is None or artifact.model_version != model_version:
+        return None
+    return artifact.payload
+
+
+def store_artifact(db: Session, analysis_id: str, kind: str, model_version: str, payload: Dict) -> str:
+    """Insert or replace an artifact; returns the stored JSON text (caller commits)"""
+    payload_json = json.dumps(payload)
+    db.merge(AnalysisArtifact(
+        analysis_id=analysis_id,
+        kind=kind,
+        model_version=model_version,
+        payload=payload_json,
+        created_at=datetime.utcnow()
+    ))
+    return payload_json
+
+
+def invalidate_artifacts(db: Session, analysis_id: str):
+    """Drop every stored artifact of an analysis, e.g. after its patents changed (caller commits)"""
+    db.query(AnalysisArtifact).filter(
+        AnalysisArtifact.analysis_id == analysis_id
+    ).delete(synchronize_session=False)
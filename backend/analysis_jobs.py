@@ -0,0 +1,132 @@
+import asyncio
+import contextvars
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Statuses an analysis moves through; the last two are terminal
+PENDING = "pending"
+SEARCHING = "searching"
+COMPLETED = "completed"
+ERROR = "error"
+TERMINAL_STATUSES = (COMPLETED, ERROR)
+
+
+class JobQueueFull(Exception):
+    """Raised when the pending-job queue is at capacity"""
+
+
+class AnalysisJobQueue:
+    """
+    Bounded pool of background workers that run submitted analyses.
+
+    Each job is an ``(analysis_id, payload)`` pair handed to ``run_job`` together
+    with a ``report(status, progress, message)`` callback. Reported progress is
+    kept in memory so status endpoints and event streams can follow a job without
+    polling the database. Jobs run in a copy of the context they were
+    submitted from, so context variables such as the request id follow them.
+
+    If ``run_job`` raises, ``on_failure(analysis_id, payload, message)`` is
+    awaited before the error is reported, so the failure is stored where
+    status readers look once the in-memory progress is dropped.
+    """
+
+    def __init__(self, run_job: Callable[..., Awaitable[None]], workers: int = 4, max_pending: int = 100,
+                 on_failure: Optional[Callable[[str, Any, str], Awaitable[None]]] = None):
+        self.run_job = run_job
+        self.on_failure = on_failure
+        self.workers = workers
+        self.max_pending = max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._progress: Dict[str, Dict[str, Any]] = {}
+        self._subscribers: Dict[str, List[asyncio.Queue]] = {}
+
+    async def start(self):
+        """Start the worker tasks (call from the app lifespan)"""
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the workers; running searches are cancelled with them"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def submit(self, analysis_id: str, payload: Any):
+        """Queue a job, raising JobQueueFull instead of waiting for room"""
+        if self._queue is None:
+            raise RuntimeError("AnalysisJobQueue has not been started")
+        try:
+            self._queue.put_nowait((analysis_id, payload, contextvars.copy_context()))
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"{self.max_pending} analyses are already waiting")
+        self._update(analysis_id, PENDING, 0, "Queued for patent search")
+
+    def get_progress(self, analysis_id: str) -> Optional[Dict[str, Any]]:
+        """Latest reported progress for a job handled by this process, if any"""
+        return self._progress.get(analysis_id)
+
+    def subscribe(self, analysis_id: str) -> asyncio.Queue:
+        """Return a queue that receives every progress update for ``analysis_id``"""
+        updates: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(analysis_id, []).append(updates)
+        return updates
+
+    def unsubscribe(self, analysis_id: str, updates: asyncio.Queue):
+        listeners = self._subscribers.get(analysis_id, [])
+        if updates in listeners:
+            listeners.remove(updates)
+        if not listeners:
+            self._subscribers.pop(analysis_id, None)
+
+    def publish(self, analysis_id: str, status: str, progress: int, message: str = ""):
+        """
+        Report progress for an analysis run outside this queue's own jobs (e.g.
+        as part of a batch). Terminal updates reach subscribers and are then
+        dropped, so the status is read from the database afterwards.
+        """
+        self._update(analysis_id, status, progress, message)
+        if status in TERMINAL_STATUSES:
+            self._progress.pop(analysis_id, None)
+
+    def _update(self, analysis_id: str, status: str, progress: int, message: str):
+        state = {
+            "analysis_id": analysis_id,
+            "status": status,
+            "progress": progress,
+            "message": message,
+        }
+        self._progress[analysis_id] = state
+        for updates in self._subscribers.get(analysis_id, []):
+            updates.put_nowait(state)
+
+    async def _worker(self):
+        while True:
+            analysis_id, payload, context = await self._queue.get()
+
+            def report(status: str, progress: int, message: str = "", _id: str = analysis_id):
+                self._update(_id, status, progress, message)
+
+            try:
+                # The task copies the context current at creation; create_task(context=) needs Python 3.11
+                await context.run(asyncio.create_task, self.run_job(analysis_id, payload, report))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Analysis job {analysis_id} failed: {str(e)}")
+                message = f"Analysis failed: {str(e)}"
+                if self.on_failure is not None:
+                    try:
+                        await self.on_failure(analysis_id, payload, message)
+                    except Exception as record_error:
+                        print(f"Could not record failure of job {analysis_id}: {str(record_error)}")
+                report(ERROR, 100, message)
+            finally:
+                self._queue.task_done()
+                if self._progress.get(analysis_id, {}).get("status") in TERMINAL_STATUSES:
+                    # Finished jobs are served from the database from now on
+                    self._progress.pop(analysis_id, None)
@@ -0,0 +1,103 @@
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import base64
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, load_only
+
+from database import ResearchAnalysis
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Only these columns are read for the listing; description/keywords stay deferred
+LISTING_COLUMNS = (
+    ResearchAnalysis.analysis_id,
+    ResearchAnalysis.title,
+    ResearchAnalysis.field_of_study,
+    ResearchAnalysis.researcher_name,
+    ResearchAnalysis.created_at,
+    ResearchAnalysis.patent_search_status,
+    ResearchAnalysis.patent_count,
+)
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor that was not produced by ``encode_cursor``"""
+
+
+def encode_cursor(created_at: datetime, analysis_id: str) -> str:
+    """Opaque cursor pointing just past the given row"""
+    raw = f"{created_at.isoformat()}|{analysis_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, analysis_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), analysis_id
+    except ValueError as e:
+        raise InvalidCursor(f"Invalid cursor: {cursor}") from e
+
+
+def list_analyses_page(
+    db: Session,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    field_of_study: Optional[str] = None,
+    researcher: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> Dict:
+    """
+    One page of analyses, newest first. Pages are seeked on
+    (created_at, analysis_id) rather than offset, so fetching a page costs
+    the same however deep into the listing it is; ``next_cursor`` is None
+    on the last page.
+    """
+    query = db.query(ResearchAnalysis).options(load_only(*LISTING_COLUMNS))
+
+    if status:
+        query = query.filter(ResearchAnalysis.patent_search_status == status)
+    if field_of_study:
+        query = query.filter(ResearchAnalysis.field_of_study == field_of_study)
+    if researcher:
+        query = query.filter(ResearchAnalysis.researcher_name == researcher)
+    if created_after:
+        query = query.filter(ResearchAnalysis.created_at >= created_after)
+    if created_before:
+        query = query.filter(ResearchAnalysis.created_at < created_before)
+    if cursor:
+        query = query.filter(
+            tuple_(ResearchAnalysis.created_at, ResearchAnalysis.analysis_id) < tuple_(*decode_cursor(cursor))
+        )
+
+    # Fetch one extra row to learn whether another page follows
+    rows = query.order_by(
+        ResearchAnalysis.created_at.desc(),
+        ResearchAnalysis.analysis_id.desc()
+    ).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].analysis_id)
+
+    return {
+        "count": len(rows),
+        "next_cursor": next_cursor,
+        "analyses": [
+            {
+                "analysis_id": a.analysis_id,
+                "title": a.title,
+                "field_of_study": a.field_of_study,
+                "researcher_name": a.researcher_name,
+                "created_at": a.created_at.isoformat() if a.created_at else None,
+                "status": a.patent_search_status,
+                "patent_count": a.patent_count,
+            }
+            for a in rows
+        ]
+    }
@@ -0,0 +1,150 @@
+from datetime import date
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from keyword_matcher import KeywordMatcher
+from patent_record import PatentRecord, format_day
+from text_similarity import TextSimilarity, patent_text
+
+RISK_LEVELS = np.array(["LOW", "MEDIUM", "HIGH"])
+
+
+class BatchRiskScorer:
+    """
+    Column-oriented version of RiskAssessmentService._analyze_single_patent.
+
+    The patent list is turned into per-factor NumPy arrays once; keyword matching
+    runs one combined-regex pass per title and abstract. Recency is banded on an
+    array of day numbers, classification sums trie weights looked up once per
+    distinct CPC code, applicant types are scored once per distinct applicant
+    list, and the weighted score and risk levels are computed in vectorized
+    form. Scores are bit-for-bit identical to the per-patent path.
+
+    Keyword matching and text similarity tokenization still cost one Python
+    call per patent and take most of the time, so end to end this is only
+    about 1.2x faster than the per-patent path at 1k to 100k patents.
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    def score(self, research_data: Dict, patents: List[PatentRecord], matcher: KeywordMatcher,
+              similarity: TextSimilarity) -> Dict:
+        """
+        Return factor columns (``keyword``, ``similarity``, ``classification``, ``recency``,
+        ``applicant``), the weighted ``risk_score`` and ``risk_level`` (0=LOW,
+        1=MEDIUM, 2=HIGH), all aligned with ``patents``, plus the per-patent
+        keyword hits (``title_hits``, ``abstract_hits``).
+        """
+        service = self.service
+        research_field = research_data.get('field_of_study', '').lower()
+
+        title_hits = matcher.find_all([p.title or '' for p in patents])
+        abstract_hits = matcher.find_all([p.abstract or '' for p in patents])
+        keyword = self._keyword_overlap(matcher, title_hits, abstract_hits)
+        text_similarity = similarity.score_all([patent_text(p) for p in patents])
+        classification = service.taxonomy.relevance_all(research_field, [p.classifications for p in patents])
+        recency = self._recency([p.grant_day for p in patents], date.today().toordinal())
+        # Record list fields are tuples, so they can be factorized directly
+        codes, applicant_lists = _factorize([p.applicants for p in patents])
+        applicant = np.array(
+            [service._calculate_applicant_type_score(a) for a in applicant_lists], dtype=np.float64
+        )[codes]
+
+        risk_score = (
+            keyword * service.KEYWORD_WEIGHT +
+            text_similarity * service.SIMILARITY_WEIGHT +
+            classification * service.CLASSIFICATION_WEIGHT +
+            recency * service.RECENCY_WEIGHT +
+            applicant * service.APPLICANT_TYPE_WEIGHT
+        )
+        risk_level = np.where(
+            risk_score >= service.HIGH_RISK_THRESHOLD, 2,
+            np.where(risk_score >= service.MEDIUM_RISK_THRESHOLD, 1, 0)
+        )
+
+        return {
+            "keyword": keyword,
+            "similarity": text_similarity,
+            "classification": classification,
+            "recency": recency,
+            "applicant": applicant,
+            "risk_score": risk_score,
+            "risk_level": risk_level,
+            "title_hits": title_hits,
+            "abstract_hits": abstract_hits,
+        }
+
+    def _recency(self, grant_days: List, today: int) -> np.ndarray:
+        """``_calculate_recency_score`` of every grant day number (None if unknown)"""
+        service = self.service
+        known = np.fromiter((day is not None for day in grant_days), dtype=bool, count=len(grant_days))
+        days = np.fromiter((day or 0 for day in grant_days), dtype=np.int64, count=len(grant_days))
+        years_old = (today - days) / 365.25
+        banded = np.select(
+            [years_old < max_years for max_years, _ in service.RECENCY_BANDS],
+            [score for _, score in service.RECENCY_BANDS],
+            default=service.RECENCY_OLDEST_SCORE
+        )
+        return np.where(known, banded, service.RECENCY_UNKNOWN_SCORE)
+
+    def _keyword_overlap(self, matcher: KeywordMatcher, title_hits: List, abstract_hits: List) -> np.ndarray:
+        """Weighted share of keywords found in title (full credit) or only in abstract"""
+        if not len(matcher):
+            return np.zeros(len(title_hits), dtype=np.float64)
+
+        title_matches = np.fromiter((matcher.count(h) for h in title_hits), dtype=np.int64, count=len(title_hits))
+        abstract_matches = np.fromiter(
+            (matcher.count(a - t) for t, a in zip(title_hits, abstract_hits)),
+            dtype=np.int64, count=len(abstract_hits)
+        )
+        return (
+            title_matches * self.service.TITLE_MATCH_WEIGHT +
+            abstract_matches * self.service.ABSTRACT_MATCH_WEIGHT
+        ) / len(matcher)
+
+    def analyze(self, research_data: Dict, patents: List[PatentRecord], columns: Dict, indices) -> List[Dict]:
+        """Build the per-patent analysis dicts for the selected rows only"""
+        service = self.service
+        analyzed = []
+        for i in indices:
+            patent = patents[i]
+            keyword_score = float(columns["keyword"][i])
+            classification_score = float(columns["classification"][i])
+            risk_level = str(RISK_LEVELS[columns["risk_level"][i]])
+            analyzed.append({
+                "patent_number": patent.patent_number or 'N/A',
+                "title": patent.title or 'No title',
+                "risk_score": round(float(columns["risk_score"][i]), 3),
+                "risk_level": risk_level,
+                "risk_factors": {
+                    "keyword_overlap": round(keyword_score, 3),
+                    "text_similarity": round(float(columns["similarity"][i]), 3),
+                    "classification_match": round(classification_score, 3),
+                    "recency": round(float(columns["recency"][i]), 3),
+                    "applicant_type": round(float(columns["applicant"][i]), 3)
+                },
+                "matched_keywords": service._matched_keywords(
+                    columns["title_hits"][i], columns["abstract_hits"][i]
+                ),
+                "grant_date": format_day(patent.grant_day),
+                "applicants": list(patent.applicants),
+                "relevance_explanation": service._generate_relevance_explanation(
+                    risk_level, keyword_score, classification_score
+                )
+            })
+        return analyzed
+
+    def rank(self, columns: Dict) -> np.ndarray:
+        """Row order of ``analyzed_patents.sort(key=risk_score, reverse=True)``"""
+        rounded = np.array([round(s, 3) for s in columns["risk_score"].tolist()], dtype=np.float64)
+        # Stable sort on the negated rounded score keeps ties in input order
+        return np.argsort(-rounded, kind='stable')
+
+
+def _factorize(values: List) -> Tuple[np.ndarray, List]:
+    """Integer code of each value and the distinct values, in order of first occurrence"""
+    index = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int64, count=len(values))
+    return codes, list(index)
@@ -0,0 +1,165 @@
+"""
+Benchmark concurrent reads and writes against the analyses table.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_db --rows 20000 --writes 500 --readers 8
+
+Two setups run the same workload on a fresh copy of a synthetic database. In
+both, a writer inserts analyses one commit at a time from a coroutine while
+reader coroutines keep fetching the newest page of the listing.
+
+- "rollback journal, sync": the old setup. It uses the default journal mode,
+  with synchronous=FULL. Writes use a sync session on the event loop. Reads
+  go through threads, as FastAPI runs sync endpoints.
+- "WAL, async": the current setup. It uses the database module's pragmas.
+  Reads and writes go through the aiosqlite engine.
+
+Reported per setup: writes/s, reads completed, read latency (median and p95),
+and the longest event-loop stall seen by a 1 ms ticker.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+from sqlalchemy.orm import load_only, sessionmaker
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from database import Base, ResearchAnalysis, SQLITE_PRAGMAS, create_db_engine, create_async_db_engine
+
+ROLLBACK_JOURNAL_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout": 5000}
+LISTING_PAGE_SIZE = 20
+
+
+def _analysis(i: int, created_at: datetime) -> ResearchAnalysis:
+    return ResearchAnalysis(
+        analysis_id=str(uuid.uuid4()),
+        title=f"Synthetic analysis {i}",
+        description="Synthetic research description for benchmarking. " * 20,
+        field_of_study="Biotechnology",
+        keywords=json.dumps(["crispr", "gene editing"]),
+        created_at=created_at,
+        patent_search_status="completed",
+        patent_count=25
+    )
+
+
+def seed_database(path: str, rows: int):
+    engine = create_db_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    started = datetime(2024, 1, 1)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all(_analysis(i, started + timedelta(seconds=i)) for i in range(rows))
+        db.commit()
+    engine.dispose()
+
+
+def _listing_query():
+    return (
+        select(ResearchAnalysis)
+        .options(load_only(ResearchAnalysis.analysis_id, ResearchAnalysis.title, ResearchAnalysis.created_at))
+        .order_by(ResearchAnalysis.created_at.desc(), ResearchAnalysis.analysis_id.desc())
+        .limit(LISTING_PAGE_SIZE)
+    )
+
+
+async def _ticker(done: asyncio.Event, stalls: list):
+    """Longest gap between 1 ms sleeps, i.e. how long the loop was blocked"""
+    last = time.perf_counter()
+    while not done.is_set():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        stalls.append(now - last)
+        last = now
+
+
+async def run_rollback_sync(path: str, writes: int, readers: int):
+    engine = create_db_engine(f"sqlite:///{path}", pragmas=ROLLBACK_JOURNAL_PRAGMAS)
+    Session = sessionmaker(bind=engine)
+    done = asyncio.Event()
+    latencies, stalls = [], []
+
+    def read_page():
+        with Session() as db:
+            db.execute(_listing_query()).all()
+
+    async def writer():
+        with Session() as db:
+            for i in range(writes):
+                db.add(_analysis(i, datetime.utcnow()))
+                db.commit()
+                await asyncio.sleep(0)
+        done.set()
+
+    async def reader():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.to_thread(read_page)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(writer(), _ticker(done, stalls), *(reader() for _ in range(readers)))
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+    return elapsed, latencies, stalls
+
+
+async def run_wal_async(path: str, writes: int, readers: int):
+    engine = create_async_db_engine(f"sqlite:///{path}", pragmas=SQLITE_PRAGMAS)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    done = asyncio.Event()
+    latencies, stalls = [], []
+
+    async def writer():
+        async with Session() as db:
+            for i in range(writes):
+                db.add(_analysis(i, datetime.utcnow()))
+                await db.commit()
+        done.set()
+
+    async def reader():
+        while not done.is_set():
+            started = time.perf_counter()
+            async with Session() as db:
+                (await db.execute(_listing_query())).all()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(writer(), _ticker(done, stalls), *(reader() for _ in range(readers)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+    return elapsed, latencies, stalls
+
+
+def run(rows: int, writes: int, readers: int):
+    setups = [("rollback journal, sync", run_rollback_sync), ("WAL, async", run_wal_async)]
+    with tempfile.TemporaryDirectory() as tmp:
+        seed = os.path.join(tmp, "seed.db")
+        seed_database(seed, rows)
+
+        print(f"{'setup':<24} {'writes/s':>9} {'reads':>7} {'read p50 ms':>12} {'read p95 ms':>12} {'max stall ms':>13}")
+        for label, runner in setups:
+            path = os.path.join(tmp, f"{runner.__name__}.db")
+            shutil.copyfile(seed, path)
+            elapsed, latencies, stalls = asyncio.run(runner(path, writes, readers))
+            p95 = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            print(
+                f"{label:<24} {writes / elapsed:>9.0f} {len(latencies):>7} "
+                f"{statistics.median(latencies) * 1000:>12.2f} {p95 * 1000:>12.2f} {max(stalls) * 1000:>13.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--writes", type=int, default=500)
+    parser.add_argument("--readers", type=int, default=8)
+    args = parser.parse_args()
+    run(args.rows, args.writes, args.readers)
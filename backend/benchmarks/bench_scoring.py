@@ -0,0 +1,76 @@
+"""
+Benchmark per-patent vs. batch (NumPy) risk scoring.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_scoring --sizes 1000 10000 100000
+
+For every size the two paths are timed on the same synthetic patents and their
+assessments are checked for identical output.
+"""
+import argparse
+import random
+import time
+
+from risk_assessment import RiskAssessmentService
+
+WORDS = (
+    "gene editing crispr cas9 guide rna delivery vector lipid nanoparticle "
+    "neural network training inference sensor battery lithium anode polymer "
+    "antibody vaccine protein expression method system apparatus composition"
+).split()
+CPC_CODES = ["C12N15/11", "C07K14/705", "A61K48/00", "G06N3/08", "H01M10/052", "B25J9/16", "G06F17/30"]
+APPLICANTS = ["Broad Institute Inc.", "University of California", "Acme Corp.", "Jane Doe", "Institute Pasteur", "Widget LLC"]
+
+
+def synthetic_patents(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    patents = []
+    for i in range(count):
+        year = rng.randint(2004, 2024)
+        grant_date = (
+            f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if i % 2
+            else f"{year}{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+        )
+        patents.append({
+            "patent_number": f"US-{10000000 + i}-B2",
+            "title": " ".join(rng.choices(WORDS, k=rng.randint(4, 12))).capitalize(),
+            "abstract": " ".join(rng.choices(WORDS, k=rng.randint(60, 150))),
+            "grant_date": grant_date,
+            "filing_date": "N/A",
+            "applicants": rng.sample(APPLICANTS, k=rng.randint(0, 2)),
+            "classifications": rng.sample(CPC_CODES, k=rng.randint(0, 6)),
+            "jurisdiction": "US",
+        })
+    return patents
+
+
+def run(sizes, repeat: int = 3):
+    service = RiskAssessmentService()
+    research_data = {
+        "title": "Improved CRISPR delivery",
+        "field_of_study": "Biotechnology",
+        "keywords": ["CRISPR", "gene editing", "lipid nanoparticle", "guide RNA"],
+    }
+    print(f"{'patents':>10} {'per-patent s':>14} {'batch s':>10} {'speedup':>9}")
+    for size in sizes:
+        patents = synthetic_patents(size)
+        timings = {}
+        results = {}
+        for batch in (False, True):
+            best = float("inf")
+            for _ in range(repeat):
+                started = time.perf_counter()
+                results[batch] = service.assess_patents(research_data, patents, batch=batch)
+                best = min(best, time.perf_counter() - started)
+            timings[batch] = best
+            results[batch].pop("assessment_date")
+        assert results[False] == results[True], f"batch output differs at {size} patents"
+        print(f"{size:>10} {timings[False]:>14.4f} {timings[True]:>10.4f} {timings[False] / timings[True]:>8.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.sizes, args.repeat)
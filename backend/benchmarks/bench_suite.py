@@ -0,0 +1,231 @@
+"""
+Benchmark suite: risk scoring, report generation and the API endpoints on a
+synthetic corpus, with results that can be saved and compared.
+
+Usage (from the backend directory):
+    python -m benchmarks.bench_suite --output bench.json
+    python -m benchmarks.bench_suite --baseline bench.json --threshold 0.25
+
+Cases run at every corpus size (see benchmarks/corpus.py):
+
+- scoring.assess_patents: RiskAssessmentService.assess_patents
+- report.generate_report: ReportGenerator.generate_report on that assessment
+- api.*: main.py endpoints called in-process through FastAPI's TestClient,
+  against a throwaway SQLite database and a search backend that serves the
+  corpus without I/O. api.analyze covers the whole submit-search-store-score
+  cycle, and the ``.cold`` variants time risk and report with no stored
+  artifact, the ``.stored`` ones with it.
+
+Each case reports min, median and mean seconds over ``--repeat`` runs after a
+warm-up run. With ``--baseline``, the fastest runs are compared to an earlier
+``--output`` file and the exit status is 1 if any case is slower than the
+baseline by more than ``--threshold`` (a fraction, 0.25 = 25%) and by more
+than ``--noise-floor`` seconds.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.corpus import RESEARCH_DATA, synthetic_patents
+
+RESULTS_FORMAT_VERSION = 1
+# Compared against the baseline: the fastest run is the least disturbed by
+# other load on the machine, so it moves far less between runs than the median
+COMPARED_METRIC = "min_s"
+SUITES = ("scoring", "report", "api")
+
+
+def measure(fn: Callable[[], object], repeat: int, setup: Optional[Callable[[], object]] = None) -> Dict:
+    """Time ``fn`` ``repeat`` times after one warm-up call; ``setup`` runs untimed before each call"""
+    samples = []
+    for i in range(repeat + 1):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        if i:
+            samples.append(elapsed)
+    return {
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "runs": len(samples),
+    }
+
+
+def bench_scoring(sizes: List[int], repeat: int, results: Dict):
+    from risk_assessment import RiskAssessmentService
+
+    service = RiskAssessmentService()
+    for size in sizes:
+        patents = synthetic_patents(size)
+        results[f"scoring.assess_patents[n={size}]"] = measure(
+            lambda: service.assess_patents(RESEARCH_DATA, patents), repeat
+        )
+
+
+def bench_report(sizes: List[int], repeat: int, results: Dict):
+    from report_generator import ReportGenerator
+    from risk_assessment import RiskAssessmentService
+
+    service = RiskAssessmentService()
+    generator = ReportGenerator()
+    for size in sizes:
+        assessment = service.assess_patents(RESEARCH_DATA, synthetic_patents(size))
+        results[f"report.generate_report[n={size}]"] = measure(
+            lambda: generator.generate_report(RESEARCH_DATA, assessment), repeat
+        )
+
+
+def bench_api(sizes: List[int], repeat: int, results: Dict):
+    workdir = tempfile.mkdtemp(prefix="fto-bench-")
+    try:
+        _bench_api(sizes, repeat, results, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def _bench_api(sizes: List[int], repeat: int, results: Dict, workdir: str):
+    # main reads its database and search backend settings at import time
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["PATENT_SEARCH_BACKEND"] = "local"
+    os.environ["LOCAL_PATENT_INDEX_PATH"] = os.path.join(workdir, "patent_index.db")
+
+    from fastapi.testclient import TestClient
+    import main
+    from analysis_artifacts import invalidate_artifacts
+    from database import SessionLocal
+    from patent_service import PatentSearchService
+    from search_backend import SearchBackend
+
+    class CorpusSearchBackend(SearchBackend):
+        """Serves the current corpus; ignores ``limit`` so analyses can be any size"""
+
+        name = "benchmark"
+        label = "Benchmark corpus"
+        patents: List[Dict] = []
+
+        async def search(self, keywords, jurisdiction, limit, filing_date_threshold, published_after=None):
+            return {"patents": list(self.patents), "search_query": "benchmark corpus"}
+
+    backend = CorpusSearchBackend()
+    main.patent_service = PatentSearchService(backend=backend)
+
+    research = {
+        "title": RESEARCH_DATA["title"],
+        "description": "Synthetic research description used to benchmark the analysis endpoints end to end.",
+        "field_of_study": RESEARCH_DATA["field_of_study"],
+        "keywords": RESEARCH_DATA["keywords"],
+        "bypass_cache": True,
+    }
+
+    with TestClient(main.app) as client:
+        def analyze() -> str:
+            response = client.post("/api/analyze", json=research)
+            response.raise_for_status()
+            analysis_id = response.json()["analysis_id"]
+            while True:
+                status = client.get(f"/api/analyses/{analysis_id}/status").json()["status"]
+                if status == "completed":
+                    return analysis_id
+                if status == "error":
+                    raise RuntimeError(f"benchmark analysis {analysis_id} failed")
+                time.sleep(0.001)
+
+        def get(path: str) -> Callable[[], None]:
+            return lambda: client.get(path).raise_for_status()
+
+        def drop_artifacts(analysis_id: str) -> Callable[[], None]:
+            def drop():
+                with SessionLocal() as db:
+                    invalidate_artifacts(db, analysis_id)
+                    db.commit()
+            return drop
+
+        for size in sizes:
+            backend.patents = synthetic_patents(size)
+            results[f"api.analyze[n={size}]"] = measure(analyze, repeat)
+
+            analysis_id = analyze()
+            results[f"api.get_analysis[n={size}]"] = measure(get(f"/api/analyses/{analysis_id}"), repeat)
+            for kind in ("risk", "report"):
+                path = f"/api/analyses/{analysis_id}/{kind}"
+                results[f"api.{kind}.cold[n={size}]"] = measure(get(path), repeat, setup=drop_artifacts(analysis_id))
+                results[f"api.{kind}.stored[n={size}]"] = measure(get(path), repeat)
+
+        results["api.list_analyses"] = measure(get("/api/analyses?limit=20"), repeat)
+
+
+def compare(results: Dict, baseline: Dict, threshold: float, noise_floor: float = 0.0) -> List[str]:
+    """
+    Print each case against the baseline; returns the cases whose fastest run
+    got slower by more than ``threshold`` (relative) and ``noise_floor`` seconds
+    """
+    regressions = []
+    print(f"{'case':<40} {'best ms':>11} {'baseline ms':>12} {'change':>8}")
+    for case, current in results.items():
+        before = baseline.get(case)
+        if before is None:
+            print(f"{case:<40} {current[COMPARED_METRIC] * 1000:>11.3f} {'-':>12} {'new':>8}")
+            continue
+        change = current[COMPARED_METRIC] / before[COMPARED_METRIC] - 1 if before[COMPARED_METRIC] else 0.0
+        flag = ""
+        if change > threshold and current[COMPARED_METRIC] - before[COMPARED_METRIC] > noise_floor:
+            regressions.append(case)
+            flag = "  REGRESSION"
+        print(f"{case:<40} {current[COMPARED_METRIC] * 1000:>11.3f} {before[COMPARED_METRIC] * 1000:>12.3f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def run(sizes: List[int], repeat: int, suites: List[str]) -> Dict:
+    results: Dict[str, Dict] = {}
+    benches = {"scoring": bench_scoring, "report": bench_report, "api": bench_api}
+    for suite in suites:
+        benches[suite](sizes, repeat, results)
+    return {
+        "format_version": RESULTS_FORMAT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sizes": sizes,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--only", nargs="+", choices=SUITES, default=list(SUITES), help="Suites to run")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Results file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown over the baseline's fastest run")
+    parser.add_argument("--noise-floor", type=float, default=0.001,
+                        help="Slowdowns of fewer seconds than this are never regressions")
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.repeat, args.only)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("format_version") != RESULTS_FORMAT_VERSION:
+            sys.exit(f"{args.baseline} has results format {baseline.get('format_version')}, expected {RESULTS_FORMAT_VERSION}")
+    regressions = compare(report["results"], baseline.get("results", {}), args.threshold, args.noise_floor)
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+        sys.exit(1)
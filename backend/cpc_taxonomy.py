@@ -0,0 +1,134 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+import functools
+import hashlib
+import json
+import os
+
+# Field-of-study -> weighted CPC prefix data file
+DEFAULT_TAXONOMY_PATH = os.getenv(
+    "CPC_TAXONOMY_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cpc_taxonomy.json")
+)
+
+
+class _TrieNode:
+    __slots__ = ("children", "weight")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.weight: Optional[float] = None
+
+
+class CPCPrefixTrie:
+    """
+    Character trie over CPC prefixes (section "C", class "C12", subclass "C12N",
+    group "C12N15/11", ...). A code's weight is that of its most specific prefix.
+    """
+
+    def __init__(self, prefixes: Dict[str, float]):
+        self.root = _TrieNode()
+        for prefix, weight in prefixes.items():
+            node = self.root
+            for ch in normalize_code(prefix):
+                node = node.children.setdefault(ch, _TrieNode())
+            node.weight = float(weight)
+
+    def weight(self, code: str) -> float:
+        """Weight of the longest prefix of ``code`` in the trie, 0.0 if none"""
+        node = self.root
+        weight = 0.0
+        for ch in code:
+            node = node.children.get(ch)
+            if node is None:
+                break
+            if node.weight is not None:
+                weight = node.weight
+        return weight
+
+
+def normalize_code(code: str) -> str:
+    """CPC codes come as "C12N15/11" or "C12N 15/11"; compare them without spaces"""
+    return code.replace(" ", "").upper()
+
+
+class CPCTaxonomy:
+    """
+    Fields of study (and their aliases) mapped to weighted CPC prefixes, loaded
+    from a JSON data file so the taxonomy can grow without code changes.
+    """
+
+    def __init__(self, data: Dict):
+        self.version = data.get("version", 1)
+        self.default_score = float(data.get("default_score", 0.3))
+        self.match_divisor = float(data.get("match_divisor", 3.0))
+        self.fingerprint = hashlib.sha256(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+
+        self._tries: Dict[str, CPCPrefixTrie] = {}
+        self._fields: Dict[str, str] = {}
+        for field, spec in data.get("fields", {}).items():
+            name = field.strip().lower()
+            self._tries[name] = CPCPrefixTrie(spec.get("prefixes", {}))
+            self._fields[name] = name
+            for alias in spec.get("aliases", []):
+                self._fields[alias.strip().lower()] = name
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_TAXONOMY_PATH) -> "CPCTaxonomy":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def trie_for(self, research_field: str) -> Optional[CPCPrefixTrie]:
+        name = self._fields.get((research_field or "").strip().lower())
+        return self._tries.get(name) if name else None
+
+    def relevance(self, research_field: str, classifications: Iterable[str]) -> float:
+        """
+        Sum of prefix weights over all of a patent's CPC codes, scaled by
+        ``match_divisor`` and capped at 1.0. Unknown fields and patents without
+        codes get ``default_score``.
+        """
+        trie = self.trie_for(research_field)
+        if trie is None or not classifications:
+            return self.default_score
+
+        total = 0.0
+        for code in classifications:
+            if code:
+                total += trie.weight(normalize_code(code))
+
+        return min(total / self.match_divisor, 1.0)
+
+    def relevance_all(self, research_field: str, classifications: Sequence[Sequence[str]]):
+        """
+        ``relevance`` of many patents' codes, as a NumPy array. Each distinct
+        code is looked up in the trie once; per-patent sums run in code order,
+        so results are bit-identical.
+        """
+        import numpy as np
+
+        trie = self.trie_for(research_field)
+        if trie is None:
+            return np.full(len(classifications), self.default_score, dtype=np.float64)
+
+        codes: Dict[str, int] = {}
+        rows: List[int] = []
+        code_ids: List[int] = []
+        for row, patent_codes in enumerate(classifications):
+            for code in patent_codes:
+                if code:
+                    rows.append(row)
+                    code_ids.append(codes.setdefault(code, len(codes)))
+
+        weights = np.array([trie.weight(normalize_code(code)) for code in codes], dtype=np.float64)
+        totals = np.bincount(
+            np.array(rows, dtype=np.int64), weights=weights[np.array(code_ids, dtype=np.int64)],
+            minlength=len(classifications)
+        )
+        relevance = np.minimum(totals / self.match_divisor, 1.0)
+        has_codes = np.fromiter((len(c) > 0 for c in classifications), dtype=bool, count=len(classifications))
+        return np.where(has_codes, relevance, self.default_score)
+
+
+@functools.lru_cache(maxsize=None)
+def load_default_taxonomy() -> CPCTaxonomy:
+    """The taxonomy from CPC_TAXONOMY_PATH, parsed once per process"""
+    return CPCTaxonomy.load(DEFAULT_TAXONOMY_PATH)
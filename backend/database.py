@@ -1,20 +1,80 @@
-from sqlalchemy import create_engine, Column, String, Text, DateTime, JSON
+from sqlalchemy import create_engine, event, Boolean, Column, String, Text, DateTime, Integer, JSON, ForeignKey, Index
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 from datetime import datetime
 import json
+import os
 
-# SQLite database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./fto_navigator.db"
+# Database URL (SQLite by default); the async engine uses the aiosqlite driver on the same file
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./fto_navigator.db")
 
-# Create database engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, 
-    connect_args={"check_same_thread": False}  # Needed for SQLite
-)
+# Connection pool sizing, shared by the sync and async engines
+POOL_SETTINGS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+}
 
-# Create session factory
+# Applied to every new SQLite connection. WAL lets readers run while a write
+# commits; synchronous=NORMAL is durable across crashes of the app in WAL mode.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+}
+
+
+def async_database_url(url: str) -> str:
+    """Same database behind an async driver: sqlite:// -> sqlite+aiosqlite://"""
+    parsed = make_url(url)
+    if parsed.drivername == "sqlite":
+        parsed = parsed.set(drivername="sqlite+aiosqlite")
+    return parsed.render_as_string(hide_password=False)
+
+
+def set_sqlite_pragmas(engine, pragmas=SQLITE_PRAGMAS):
+    """Run ``pragmas`` on each connection the (sync) engine opens"""
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+def create_db_engine(url: str = SQLALCHEMY_DATABASE_URL, pragmas=SQLITE_PRAGMAS):
+    """Synchronous engine, for migrations, workers and the sync endpoints"""
+    if url.startswith("sqlite"):
+        engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},  # Needed for SQLite
+            poolclass=QueuePool,
+            **POOL_SETTINGS
+        )
+        set_sqlite_pragmas(engine, pragmas)
+        return engine
+    return create_engine(url, **POOL_SETTINGS)
+
+
+def create_async_db_engine(url: str = SQLALCHEMY_DATABASE_URL, pragmas=SQLITE_PRAGMAS):
+    """Async engine for the async endpoints, so queries and commits don't block the event loop"""
+    engine = create_async_engine(async_database_url(url), poolclass=AsyncAdaptedQueuePool, **POOL_SETTINGS)
+    if url.startswith("sqlite"):
+        set_sqlite_pragmas(engine.sync_engine, pragmas)
+    return engine
+
+
+# Create database engines
+engine = create_db_engine()
+async_engine = create_async_db_engine()
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # Base class for our models
 Base = declarative_base()
@@ -22,6 +82,11 @@ Base = declarative_base()
 # Define our database models
 class ResearchAnalysis(Base):
     __tablename__ = "research_analyses"
+    __table_args__ = (
+        # Keyset pagination of the newest-first listing, overall and per status
+        Index("ix_research_analyses_created_id", "created_at", "analysis_id"),
+        Index("ix_research_analyses_status_created_id", "patent_search_status", "created_at", "analysis_id"),
+    )
     
     analysis_id = Column(String, primary_key=True, index=True)
     title = Column(String, nullable=False)
@@ -31,21 +96,122 @@ class ResearchAnalysis(Base):
     researcher_name = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     
-    # Patent search results
+    # Patent search results (the patents themselves live in analysis_patents/patents)
     patent_search_status = Column(String, default="pending")
-    patent_results = Column(Text, nullable=True)  # Store as JSON string
-    patent_count = Column(String, nullable=True)
+    patent_count = Column(Integer, nullable=True)
+    search_error = Column(Text, nullable=True)
     
     def get_keywords(self):
         """Convert keywords JSON string back to list"""
         return json.loads(self.keywords) if self.keywords else []
+
+class Patent(Base):
+    """A patent publication, stored once and shared by every analysis that found it"""
+    __tablename__ = "patents"
+    
+    publication_number = Column(String, primary_key=True)
+    title = Column(Text, nullable=True)
+    abstract = Column(Text, nullable=True)
+    publication_date = Column(String, nullable=True)
+    grant_date = Column(String, nullable=True)
+    filing_date = Column(String, nullable=True)
+    jurisdiction = Column(String, nullable=True)
+    status = Column(String, nullable=True)
+    family_id = Column(String, nullable=True)  # Publications of one invention share it
+    applicants = Column(JSON, nullable=True)
+    inventors = Column(JSON, nullable=True)
+    classifications = Column(JSON, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
     
-    def get_patent_results(self):
-        """Convert patent results JSON string back to dict"""
-        return json.loads(self.patent_results) if self.patent_results else None
+    def to_dict(self):
+        """Patent in the shape returned by the search service"""
+        return {
+            "patent_number": self.publication_number,
+            "title": self.title,
+            "abstract": self.abstract,
+            "publication_date": self.publication_date or "N/A",
+            "grant_date": self.grant_date,
+            "filing_date": self.filing_date,
+            "applicants": self.applicants or [],
+            "inventors": self.inventors or [],
+            "classifications": self.classifications or [],
+            "jurisdiction": self.jurisdiction,
+            "status": self.status,
+            "family_id": self.family_id
+        }
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+class AnalysisPatent(Base):
+    """Search hit: links an analysis to a patent with its rank and search metadata"""
+    __tablename__ = "analysis_patents"
+    __table_args__ = (
+        Index("ix_analysis_patents_analysis_rank", "analysis_id", "rank"),
+    )
+    
+    analysis_id = Column(String, ForeignKey("research_analyses.analysis_id"), primary_key=True)
+    publication_number = Column(String, ForeignKey("patents.publication_number"), primary_key=True, index=True)
+    rank = Column(Integer, nullable=False)  # Position in the search results, 0-based
+    search_backend = Column(String, nullable=True)
+    search_jurisdiction = Column(String, nullable=True)
+    found_at = Column(DateTime, default=datetime.utcnow)
+
+class Watchlist(Base):
+    """Periodic re-check of an analysis for patents published since the last run"""
+    __tablename__ = "watchlists"
+    
+    analysis_id = Column(String, ForeignKey("research_analyses.analysis_id"), primary_key=True)
+    jurisdiction = Column(String, nullable=False)
+    interval_days = Column(Integer, nullable=False, default=7)
+    watermark = Column(Integer, nullable=False)  # Latest publication date (YYYYMMDD) already searched
+    active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_run_at = Column(DateTime, nullable=True)
+    next_run_at = Column(DateTime, nullable=False, index=True)
+
+class WatchlistRun(Base):
+    """What one watchlist run found"""
+    __tablename__ = "watchlist_runs"
+    __table_args__ = (
+        Index("ix_watchlist_runs_analysis_started", "analysis_id", "started_at"),
+    )
+    
+    run_id = Column(String, primary_key=True)
+    analysis_id = Column(String, ForeignKey("watchlists.analysis_id"), nullable=False)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    status = Column(String, nullable=False)  # "completed" or "error"
+    previous_watermark = Column(Integer, nullable=False)
+    watermark = Column(Integer, nullable=False)
+    new_patents = Column(JSON, nullable=True)  # Publication numbers added to the analysis
+    new_high_risk_patents = Column(JSON, nullable=True)
+    previous_risk_level = Column(String, nullable=True)
+    risk_level = Column(String, nullable=True)
+    error = Column(Text, nullable=True)
+
+class SearchCacheEntry(Base):
+    __tablename__ = "search_cache"
+    
+    cache_key = Column(String, primary_key=True)
+    query = Column(Text, nullable=False)  # Normalized query as JSON string
+    results = Column(Text, nullable=False)  # Search results as JSON string
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    last_accessed = Column(DateTime, default=datetime.utcnow, index=True)
+    hit_count = Column(Integer, default=0)
+
+class AnalysisArtifact(Base):
+    """Computed output (risk assessment, report) stored next to its analysis"""
+    __tablename__ = "analysis_artifacts"
+    
+    analysis_id = Column(String, primary_key=True)
+    kind = Column(String, primary_key=True)  # "risk" or "report"
+    model_version = Column(String, nullable=False)  # Scoring model the payload was computed with
+    payload = Column(Text, nullable=False)  # Store as JSON string
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+def init_db(bind=None):
+    """
+    Create missing tables. Not done at import, so importing the models costs
+    no database work; the API does it at startup through run_migrations.
+    """
+    Base.metadata.create_all(bind=bind or engine)
 
 # Dependency to get database session
 def get_db():
@@ -53,4 +219,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,24 @@
+SELECT
+    p.publication_number,
+    p.family_id,
+    (SELECT text FROM UNNEST(p.title_localized) WHERE language = 'en' LIMIT 1) AS title,
+    (SELECT text FROM UNNEST(p.abstract_localized) WHERE language = 'en' LIMIT 1) AS abstract,
+    p.publication_date,
+    p.filing_date,
+    p.grant_date,
+    p.country_code,
+    (SELECT ARRAY_AGG(c.code) FROM UNNEST(p.cpc) AS c) AS cpc_codes,
+    (SELECT ARRAY_AGG(a.name) FROM UNNEST(p.assignee_harmonized) AS a) AS assignees
+FROM
+    `patents-public-data.patents.publications` AS p
+WHERE
+    p.country_code = @jurisdiction
+    AND p.grant_date > 0 -- It must be a granted patent
+    AND p.filing_date >= @filing_date_threshold -- Filed in the last 20 years
+    AND (
+        EXISTS(SELECT 1 FROM UNNEST(p.title_localized) AS tl WHERE tl.language = 'en' AND REGEXP_CONTAINS(tl.text, @keyword_pattern))
+        OR EXISTS(SELECT 1 FROM UNNEST(p.abstract_localized) AS al WHERE al.language = 'en' AND REGEXP_CONTAINS(al.text, @keyword_pattern))
+    )
+ORDER BY
+    p.publication_date DESC
+LIMIT @limit
@@ -0,0 +1,299 @@
+"""
+Stream Google Patents exports into the local patent index.
+
+Usage:
+    python ingest_patents.py shards/*.json.gz --index patent_index.db --workers 4
+
+Shards are newline-delimited JSON or CSV files (optionally gzip-compressed) using
+the column names of `patents-public-data.patents.publications`. Each shard is read
+record by record and written in large transactions; progress is checkpointed in
+the index after every batch, so an interrupted run resumes where it stopped. Rows
+are upserted on publication number, which makes weekly delta shards safe to load
+on top of an existing index.
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from local_index import DEFAULT_INDEX_PATH, LocalPatentIndex
+
+DEFAULT_BATCH_SIZE = 5000
+
+CHECKPOINT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ingest_checkpoints (
+    shard TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    records_done INTEGER NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL
+);
+"""
+
+# Nested columns that CSV exports carry as JSON-encoded cells
+NESTED_COLUMNS = (
+    "title_localized", "abstract_localized", "cpc",
+    "assignee_harmonized", "inventor_harmonized",
+)
+
+
+def shard_fingerprint(path: str) -> str:
+    """Identifies a shard's contents; a changed file restarts from the beginning"""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def open_shard(path: str) -> io.TextIOBase:
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def shard_format(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.endswith(".csv") else "ndjson"
+
+
+def iter_records(path: str, skip: int = 0) -> Iterator[Dict]:
+    """Yield the records of a shard one at a time, skipping the first ``skip``"""
+    with open_shard(path) as f:
+        if shard_format(path) == "csv":
+            csv.field_size_limit(sys.maxsize)
+            for index, record in enumerate(csv.DictReader(f)):
+                if index < skip:
+                    continue
+                for column in NESTED_COLUMNS:
+                    value = record.get(column)
+                    if value and value[0] in "[{":
+                        record[column] = json.loads(value)
+                yield record
+        else:
+            index = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                if index >= skip:
+                    yield json.loads(line)
+                index += 1
+
+
+def _english_text(localized) -> Optional[str]:
+    for entry in localized or []:
+        if entry.get("language") == "en":
+            return entry.get("text")
+    return None
+
+
+def _names(entries) -> List[str]:
+    return [e["name"] if isinstance(e, dict) else e for e in entries or [] if e]
+
+
+def _date(value) -> int:
+    """Export dates are YYYYMMDD integers (or strings); 0 means unknown"""
+    try:
+        return int(value) if value not in (None, "") else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def extract_publication(record: Dict) -> Optional[tuple]:
+    """
+    Pick the fields the patent search selects (English title/abstract, CPC codes,
+    harmonized assignees/inventors, dates, family id) in LocalPatentIndex upsert order.
+    Flat exports that already carry title/abstract/cpc_codes columns work too.
+    """
+    publication_number = record.get("publication_number")
+    if not publication_number:
+        return None
+
+    title = _english_text(record.get("title_localized")) or record.get("title")
+    abstract = _english_text(record.get("abstract_localized")) or record.get("abstract")
+    cpc_codes = [c["code"] if isinstance(c, dict) else c for c in record.get("cpc") or []]
+    if not cpc_codes and record.get("cpc_codes"):
+        cpc_codes = _names(_maybe_json(record["cpc_codes"]))
+    assignees = _names(record.get("assignee_harmonized")) or _names(_maybe_json(record.get("assignees")))
+    inventors = _names(record.get("inventor_harmonized")) or _names(_maybe_json(record.get("inventors")))
+
+    return (
+        publication_number,
+        title,
+        abstract,
+        _date(record.get("publication_date")),
+        _date(record.get("filing_date")),
+        _date(record.get("grant_date")),
+        record.get("country_code"),
+        json.dumps(cpc_codes),
+        json.dumps(assignees),
+        json.dumps(inventors),
+        record.get("family_id"),
+    )
+
+
+def _maybe_json(value):
+    if isinstance(value, str) and value[:1] == "[":
+        return json.loads(value)
+    return value
+
+
+def iter_batches(path: str, skip: int, batch_size: int) -> Iterator[Tuple[List[tuple], int, bool]]:
+    """
+    Yield ``(rows, records_done, completed)`` batches for a shard. ``records_done``
+    counts every record read so far (the resume point); the last batch, possibly
+    empty, has ``completed`` set.
+    """
+    rows = []
+    records_done = skip
+    for record in iter_records(path, skip):
+        records_done += 1
+        row = extract_publication(record)
+        if row is not None:
+            rows.append(row)
+        if len(rows) >= batch_size:
+            yield rows, records_done, False
+            rows = []
+    yield rows, records_done, True
+
+
+class PatentIngester:
+    """Writes parsed shard batches into a LocalPatentIndex with checkpoints"""
+
+    def __init__(self, index: LocalPatentIndex, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.index = index
+        self.batch_size = batch_size
+        self.index.ensure_schema()
+        self.conn = self.index.connect()
+        self.conn.executescript(CHECKPOINT_SCHEMA)
+        # Bulk-load settings: WAL keeps the index readable while loading
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+
+    def close(self):
+        self.conn.close()
+
+    def resume_point(self, shard: str) -> Optional[int]:
+        """Records already loaded from ``shard``, or None if it is fully loaded"""
+        row = self.conn.execute(
+            "SELECT fingerprint, records_done, completed FROM ingest_checkpoints WHERE shard = ?",
+            (shard,)
+        ).fetchone()
+        if row is None or row["fingerprint"] != shard_fingerprint(shard):
+            return 0
+        return None if row["completed"] else row["records_done"]
+
+    def write_batch(self, shard: str, rows: List[tuple], records_done: int, completed: bool = False):
+        """Upsert a batch and advance the shard checkpoint in the same transaction"""
+        with self.conn:
+            LocalPatentIndex.upsert(self.conn, rows)
+            self.conn.execute(
+                """
+                INSERT INTO ingest_checkpoints (shard, fingerprint, records_done, completed, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (shard) DO UPDATE SET
+                    fingerprint = excluded.fingerprint,
+                    records_done = excluded.records_done,
+                    completed = excluded.completed,
+                    updated_at = excluded.updated_at
+                """,
+                (shard, shard_fingerprint(shard), records_done, int(completed), datetime.utcnow().isoformat())
+            )
+
+    def ingest(self, shards: List[str], workers: int = 1) -> Dict:
+        """Load every shard; with ``workers > 1`` shards are parsed in separate processes"""
+        shards = [os.path.abspath(s) for s in shards]
+        pending = []
+        for shard in shards:
+            skip = self.resume_point(shard)
+            if skip is None:
+                print(f"Skipping {shard}: already loaded")
+            else:
+                pending.append((shard, skip))
+
+        stats = {"shards": len(pending), "rows": 0, "seconds": 0.0}
+        started = time.time()
+        if workers <= 1 or len(pending) <= 1:
+            for shard, skip in pending:
+                for rows, records_done, completed in iter_batches(shard, skip, self.batch_size):
+                    self._write(shard, rows, records_done, completed, stats)
+        else:
+            self._ingest_parallel(pending, workers, stats)
+        stats["seconds"] = round(time.time() - started, 2)
+        return stats
+
+    def _write(self, shard: str, rows: List[tuple], records_done: int, completed: bool, stats: Dict):
+        self.write_batch(shard, rows, records_done, completed)
+        stats["rows"] += len(rows)
+        if completed:
+            print(f"Loaded {shard} ({records_done} records)")
+
+    def _ingest_parallel(self, pending: List[Tuple[str, int]], workers: int, stats: Dict):
+        # A bounded queue keeps fast parsers from buffering whole shards in memory
+        batches = multiprocessing.Queue(maxsize=workers * 2)
+        shard_queue = multiprocessing.Queue()
+        processes = [
+            multiprocessing.Process(target=_parse_worker, args=(shard_queue, batches, self.batch_size))
+            for _ in range(min(workers, len(pending)))
+        ]
+        for item in pending:
+            shard_queue.put(item)
+        for _ in processes:
+            shard_queue.put(None)
+        for process in processes:
+            process.start()
+
+        running = len(processes)
+        try:
+            while running:
+                message = batches.get()
+                if message[0] == "done":
+                    running -= 1
+                elif message[0] == "error":
+                    raise RuntimeError(f"Failed to parse {message[1]}: {message[2]}")
+                else:
+                    self._write(*message[1:], stats)
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+
+
+def _parse_worker(shard_queue, batches, batch_size: int):
+    """Worker process: parse assigned shards and hand batches to the writer"""
+    while True:
+        item = shard_queue.get()
+        if item is None:
+            batches.put(("done",))
+            return
+        shard, skip = item
+        try:
+            for rows, records_done, completed in iter_batches(shard, skip, batch_size):
+                batches.put(("batch", shard, rows, records_done, completed))
+        except Exception as e:
+            batches.put(("error", shard, f"{type(e).__name__}: {e}"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load Google Patents export shards into the local patent index")
+    parser.add_argument("shards", nargs="+", help="NDJSON or CSV shards, optionally .gz")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="SQLite index file")
+    parser.add_argument("--workers", type=int, default=1, help="Processes parsing shards in parallel")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per transaction")
+    args = parser.parse_args(argv)
+
+    ingester = PatentIngester(LocalPatentIndex(args.index), batch_size=args.batch_size)
+    try:
+        stats = ingester.ingest(args.shards, workers=args.workers)
+    finally:
+        ingester.close()
+    print(f"Ingested {stats['rows']} rows from {stats['shards']} shards in {stats['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+from typing import Dict, FrozenSet, Iterable, List
+import re
+
+# Matches a word boundary at the position handed to .match()
+_BOUNDARY = re.compile(r'\b')
+
+
+class KeywordMatcher:
+    """
+    Finds which research keywords occur in a text in a single regex pass.
+
+    All keywords are compiled into one alternation (longest first) inside a
+    lookahead, so every word-boundary position is tested against every keyword at
+    once and overlapping hits are still seen. A keyword hits exactly when
+    ``re.search(r'\\b' + re.escape(keyword) + r'\\b', text)`` would, except that
+    empty keywords never hit. Matching is case-insensitive: keywords and texts
+    are compared lowercased.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = [k.lower() for k in keywords]
+        self.multiplicity: Dict[str, int] = {}
+        for keyword in self.keywords:
+            self.multiplicity[keyword] = self.multiplicity.get(keyword, 0) + 1
+
+        distinct = sorted((k for k in self.multiplicity if k), key=len, reverse=True)
+        self._pattern = None
+        if distinct:
+            alternation = '|'.join(re.escape(k) for k in distinct)
+            self._pattern = re.compile(r'\b(?=(' + alternation + r')\b)')
+
+        # The regex reports the longest keyword at each position; shorter keywords
+        # that are word-bounded prefixes of it hit at the same position too
+        self._implied: Dict[str, FrozenSet[str]] = {}
+        for longer in distinct:
+            self._implied[longer] = frozenset(
+                shorter for shorter in distinct
+                if len(shorter) < len(longer)
+                and longer.startswith(shorter)
+                and _BOUNDARY.match(longer, len(shorter))
+            )
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def find(self, text: str) -> FrozenSet[str]:
+        """Distinct keywords that occur in ``text``"""
+        if not text or self._pattern is None:
+            return frozenset()
+        found = set()
+        for match in self._pattern.finditer(text.lower()):
+            keyword = match.group(1)
+            if keyword not in found:
+                found.add(keyword)
+                found.update(self._implied[keyword])
+        return frozenset(found)
+
+    def count(self, found: Iterable[str]) -> int:
+        """Number of research keywords (duplicates included) among ``found``"""
+        return sum(self.multiplicity.get(k, 0) for k in found)
+
+    def find_all(self, texts: List[str]) -> List[FrozenSet[str]]:
+        return [self.find(text) for text in texts]
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import os
+import re
+import sqlite3
+from typing import Dict, List, Optional
+
+from search_backend import SearchBackend, format_patent
+
+# Location of the local patent index (a standalone SQLite file)
+DEFAULT_INDEX_PATH = os.getenv("LOCAL_PATENT_INDEX_PATH", "./patent_index.db")
+
+# Columns stored as JSON arrays
+ARRAY_COLUMNS = ("cpc_codes", "assignees", "inventors")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS publications (
+    id INTEGER PRIMARY KEY,
+    publication_number TEXT NOT NULL UNIQUE,
+    title TEXT,
+    abstract TEXT,
+    publication_date INTEGER,
+    filing_date INTEGER,
+    grant_date INTEGER,
+    country_code TEXT,
+    cpc_codes TEXT,
+    assignees TEXT,
+    inventors TEXT,
+    family_id TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_publications_country_filing
+    ON publications (country_code, filing_date);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS publications_fts USING fts5(
+    title, abstract,
+    content='publications', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS publications_ai AFTER INSERT ON publications BEGIN
+    INSERT INTO publications_fts (rowid, title, abstract)
+    VALUES (new.id, new.title, new.abstract);
+END;
+
+CREATE TRIGGER IF NOT EXISTS publications_ad AFTER DELETE ON publications BEGIN
+    INSERT INTO publications_fts (publications_fts, rowid, title, abstract)
+    VALUES ('delete', old.id, old.title, old.abstract);
+END;
+
+CREATE TRIGGER IF NOT EXISTS publications_au AFTER UPDATE ON publications BEGIN
+    INSERT INTO publications_fts (publications_fts, rowid, title, abstract)
+    VALUES ('delete', old.id, old.title, old.abstract);
+    INSERT INTO publications_fts (rowid, title, abstract)
+    VALUES (new.id, new.title, new.abstract);
+END;
+"""
+
+# Insert-or-update keyed on publication number; the FTS triggers keep the index in sync
+UPSERT_SQL = """
+INSERT INTO publications (
+    publication_number, title, abstract,
+    publication_date, filing_date, grant_date, country_code,
+    cpc_codes, assignees, inventors, family_id
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (publication_number) DO UPDATE SET
+    title = excluded.title,
+    abstract = excluded.abstract,
+    publication_date = excluded.publication_date,
+    filing_date = excluded.filing_date,
+    grant_date = excluded.grant_date,
+    country_code = excluded.country_code,
+    cpc_codes = excluded.cpc_codes,
+    assignees = excluded.assignees,
+    inventors = excluded.inventors,
+    family_id = excluded.family_id
+"""
+
+SEARCH_SQL = """
+SELECT
+    p.publication_number, p.title, p.abstract,
+    p.publication_date, p.filing_date, p.grant_date, p.country_code,
+    p.cpc_codes, p.assignees, p.inventors, p.family_id
+FROM publications_fts
+JOIN publications AS p ON p.id = publications_fts.rowid
+WHERE publications_fts MATCH :match
+    AND p.country_code = :jurisdiction
+    AND p.grant_date > 0 -- It must be a granted patent
+    AND p.filing_date >= :filing_date_threshold -- Filed in the last 20 years
+    AND (:published_after IS NULL OR p.publication_date > :published_after)
+-- After a watermark the oldest matches are taken, so it can page forward
+ORDER BY CASE WHEN :published_after IS NULL THEN -p.publication_date ELSE p.publication_date END
+LIMIT :limit
+"""
+
+
+class LocalPatentIndex:
+    """
+    Patent publications in a local SQLite file with an FTS5 index over title and
+    abstract. Rows mirror the columns the BigQuery search selects.
+    """
+
+    def __init__(self, path: str = DEFAULT_INDEX_PATH):
+        self.path = path
+
+    def connect(self, readonly: bool = False) -> sqlite3.Connection:
+        if readonly:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        else:
+            conn = sqlite3.connect(self.path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def ensure_schema(self):
+        conn = self.connect()
+        try:
+            conn.executescript(SCHEMA)
+            # Indexes built before family ids were stored
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(publications)")}
+            if "family_id" not in columns:
+                conn.execute("ALTER TABLE publications ADD COLUMN family_id TEXT")
+                conn.commit()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def upsert(conn: sqlite3.Connection, rows: List[tuple]):
+        """Insert or update publication rows (in UPSERT_SQL column order); caller commits"""
+        conn.executemany(UPSERT_SQL, rows)
+
+
+def build_match_expression(keywords: List[str]) -> Optional[str]:
+    """
+    FTS5 query matching any keyword as a phrase, with a prefix match on its last
+    token to approximate the substring matching of the BigQuery search.
+    """
+    phrases = []
+    for keyword in keywords:
+        tokens = re.findall(r"\w+", keyword.lower())
+        if tokens:
+            phrases.append('"' + " ".join(tokens) + '"*')
+    return " OR ".join(phrases) if phrases else None
+
+
+class LocalIndexSearchBackend(SearchBackend):
+    """Search backed by a LocalPatentIndex; works offline and without GCP credentials"""
+
+    name = "local"
+    label = "Local index"
+
+    def __init__(self, index: Optional[LocalPatentIndex] = None):
+        self.index = index or LocalPatentIndex()
+        self._search_sql: Optional[str] = None
+
+    def _sql(self, conn: sqlite3.Connection) -> str:
+        # Indexes loaded before family ids were stored search without them
+        # until ingest_patents.py (or ensure_schema) upgrades them
+        if self._search_sql is None:
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(publications)")}
+            self._search_sql = SEARCH_SQL if "family_id" in columns else SEARCH_SQL.replace(
+                "p.family_id", "NULL AS family_id"
+            )
+        return self._search_sql
+
+    async def search(self, keywords: List[str], jurisdiction: str, limit: int, filing_date_threshold: int,
+                     published_after: Optional[int] = None) -> Dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, self._search, keywords, jurisdiction, limit, filing_date_threshold, published_after
+        )
+
+    def _search(self, keywords: List[str], jurisdiction: str, limit: int, filing_date_threshold: int,
+                published_after: Optional[int] = None) -> Dict:
+        match = build_match_expression(keywords)
+        if match is None:
+            return {"patents": [], "search_query": SEARCH_SQL}
+
+        conn = self.index.connect(readonly=True)
+        try:
+            rows = conn.execute(self._sql(conn), {
+                "match": match,
+                "jurisdiction": jurisdiction.upper(),
+                "filing_date_threshold": filing_date_threshold,
+                "published_after": published_after,
+                "limit": limit,
+            }).fetchall()
+        finally:
+            conn.close()
+        if published_after is not None:
+            rows = sorted(rows, key=lambda row: row["publication_date"] or 0, reverse=True)
+
+        patents = []
+        for row in rows:
+            record = dict(row)
+            for column in ARRAY_COLUMNS:
+                record[column] = json.loads(record[column]) if record[column] else []
+            patents.append(format_patent(record))
+
+        return {"patents": patents, "search_query": f"{SEARCH_SQL.strip()}\n-- MATCH {match}"}
@@ -1,15 +1,40 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict
-from datetime import datetime
+from fastapi.responses import Response, StreamingResponse, PlainTextResponse
+from contextlib import asynccontextmanager
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Dict, Union
+from datetime import datetime, timedelta
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+import asyncio
+import functools
+import os
 import uuid
 import json
 
 # Import our new modules
-from database import get_db, ResearchAnalysis
-from patent_service import PatentSearchService
+from database import (
+    get_db, get_async_db, SessionLocal, AsyncSessionLocal, ResearchAnalysis, AnalysisPatent, Watchlist, WatchlistRun
+)
+from migrations import run_migrations
+from patent_service import PatentSearchService, merge_jurisdiction_results
+from admission import AdmissionRejected
+from search_cache import SearchCache
+from patent_store import (
+    save_analysis_patents, merge_analysis_patents, load_analysis_patents, load_analysis_patent_records,
+    analyses_for_patent
+)
+from analysis_listing import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor, list_analyses_page
+from analysis_artifacts import RISK, REPORT, load_artifact, store_artifact, invalidate_artifacts
+from analysis_jobs import (
+    AnalysisJobQueue, JobQueueFull,
+    PENDING, SEARCHING, COMPLETED, ERROR, TERMINAL_STATUSES
+)
+import metrics
+import watchlists
+from watchlists import WatchlistScheduler, watchlist_to_dict, run_to_dict
 
 # Add these imports after the existing ones
 from risk_assessment import RiskAssessmentService
@@ -19,11 +44,29 @@ from report_generator import ReportGenerator
 risk_service = RiskAssessmentService()
 report_generator = ReportGenerator()
 
+# Seconds between SSE keep-alives, and the Retry-After hint when the job queue is full
+SSE_HEARTBEAT_SECONDS = 15
+JOB_QUEUE_RETRY_AFTER = 5
+MAX_STREAM_LIMIT = 1000
+MAX_JURISDICTIONS = 10
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    run_migrations()
+    await analysis_jobs.start()
+    await batch_jobs.start()
+    await watchlist_scheduler.start()
+    yield
+    await watchlist_scheduler.stop()
+    await batch_jobs.stop()
+    await analysis_jobs.stop()
+
 # Create our FastAPI application
 app = FastAPI(
     title="FTO Navigator API",
     description="Patent freedom-to-operate analysis for researchers",
-    version="0.3.0" # Version bump for new features
+    version="0.3.0", # Version bump for new features
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -33,10 +76,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["X-Request-ID"],
 )
+# Request ids and per-route request metrics
+app.add_middleware(metrics.RequestMetricsMiddleware)
 
 # Initialize patent search service
-patent_service = PatentSearchService()
+search_cache = SearchCache()
+patent_service = PatentSearchService(cache=search_cache)
 
 # Define what research input looks like
 class ResearchInput(BaseModel):
@@ -45,7 +92,24 @@ class ResearchInput(BaseModel):
     field_of_study: str = Field(..., description="e.g., 'Biotechnology', 'Software', 'Mechanical'")
     keywords: list[str] = Field(..., min_items=1, max_items=10, description="Key technical terms")
     researcher_name: Optional[str] = Field(None, description="Your name (optional)")
-    jurisdiction: str = Field('US', description="The patent jurisdiction to search (e.g., 'US', 'EP', 'WO')")
+    jurisdiction: Union[str, List[str]] = Field(
+        'US', description="The patent jurisdiction(s) to search (e.g., 'US', or ['US', 'EP', 'WO'] searched concurrently)"
+    )
+    bypass_cache: bool = Field(False, description="Skip cached search results and query the patent database again")
+
+    @field_validator("jurisdiction")
+    @classmethod
+    def normalize_jurisdiction(cls, value: Union[str, List[str]]) -> Union[str, List[str]]:
+        if isinstance(value, str):
+            return value.strip().upper()
+        codes = list(dict.fromkeys(code.strip().upper() for code in value if code.strip()))
+        if not 1 <= len(codes) <= MAX_JURISDICTIONS:
+            raise ValueError(f"Provide between 1 and {MAX_JURISDICTIONS} jurisdictions")
+        return codes
+
+    @property
+    def jurisdictions(self) -> List[str]:
+        return [self.jurisdiction] if isinstance(self.jurisdiction, str) else self.jurisdiction
 
 # Response model for analysis results
 class AnalysisResponse(BaseModel):
@@ -55,6 +119,16 @@ class AnalysisResponse(BaseModel):
     patent_count: Optional[int] = None
     top_patents: Optional[List[Dict]] = None
 
+# A portfolio of research inputs analysed together
+class BatchResearchInput(BaseModel):
+    analyses: List[ResearchInput] = Field(..., min_items=1, max_items=500, description="Research inputs to analyse")
+
+class BatchAnalysisResponse(BaseModel):
+    batch_id: str
+    status: str
+    message: str
+    analyses: List[AnalysisResponse]
+
 # Basic health check endpoint
 @app.get("/")
 def read_root():
@@ -65,12 +139,410 @@ def read_root():
         "features": ["Patent search", "Database storage", "Analysis tracking"]
     }
 
+ANALYSES = metrics.counter("fto_analyses_total", "Analyses run by the background workers, by final status", ["status"])
+ANALYSIS_SECONDS = metrics.histogram("fto_analysis_duration_seconds", "Time from a worker picking up an analysis to its final status")
+
+async def run_analysis_job(analysis_id: str, research: ResearchInput, report):
+    """
+    Background worker body: search patents for a queued analysis and store the
+    results, moving the row through pending -> searching -> completed/error.
+    Every job ends with one log line holding its request id, final status and
+    the time spent in each stage.
+    """
+    final = {"status": ERROR}
+
+    def tracked_report(status: str, progress: int, message: str = ""):
+        final["status"] = status
+        report(status, progress, message)
+
+    with metrics.trace() as trace:
+        try:
+            await _search_analysis(analysis_id, research, tracked_report)
+        except asyncio.CancelledError:
+            final["status"] = "cancelled"
+            raise
+        except Exception:
+            final["status"] = ERROR
+            raise
+        finally:
+            ANALYSES.inc(status=final["status"])
+            ANALYSIS_SECONDS.observe(trace.elapsed)
+            metrics.log_event(
+                "analysis_finished", analysis_id=analysis_id, status=final["status"],
+                jurisdiction=",".join(research.jurisdictions), **trace.summary()
+            )
+
+async def _search_analysis(analysis_id: str, research: ResearchInput, report):
+    async with AsyncSessionLocal() as db:
+        db_analysis = await db.get(ResearchAnalysis, analysis_id)
+        if not db_analysis:
+            return
+        metrics.observe_stage("analysis.queue_wait", (datetime.utcnow() - db_analysis.created_at).total_seconds())
+
+        db_analysis.patent_search_status = SEARCHING
+        await db.commit()
+        report(SEARCHING, 10, f"Searching {', '.join(research.jurisdictions)} patents")
+
+        # Search for relevant patents; several jurisdictions are searched concurrently
+        try:
+            if len(research.jurisdictions) > 1:
+                patent_results = await patent_service.search_patents_multi(
+                    keywords=research.keywords,
+                    jurisdictions=research.jurisdictions,
+                    use_cache=not research.bypass_cache
+                )
+            else:
+                patent_results = await patent_service.search_patents(
+                    keywords=research.keywords,
+                    field_of_study=research.field_of_study,
+                    jurisdiction=research.jurisdictions[0],
+                    use_cache=not research.bypass_cache
+                )
+        except asyncio.CancelledError:
+            db_analysis.patent_search_status = ERROR
+            db_analysis.search_error = "Search cancelled: server shutting down"
+            await db.commit()
+            raise
+
+        await _store_search_results(db, db_analysis, research, patent_results, report)
+
+async def _store_search_results(db: AsyncSession, db_analysis: ResearchAnalysis, research: ResearchInput, patent_results: Dict, report):
+    """Save one analysis' search outcome, score it and report the final status"""
+    report(SEARCHING, 90, "Saving search results")
+    metrics.annotate(patent_count=patent_results["count"])
+    if patent_results["success"]:
+        db_analysis.patent_search_status = COMPLETED
+        db_analysis.patent_count = patent_results["count"]
+        with metrics.span("db.save_patents"):
+            await db.run_sync(
+                save_analysis_patents, db_analysis.analysis_id, patent_results["patents"],
+                search_backend=patent_service.backend.name,
+                # Hits of a multi-jurisdiction search are tagged with their own jurisdiction
+                search_jurisdiction=research.jurisdictions[0] if len(research.jurisdictions) == 1 else None
+            )
+    else:
+        db_analysis.patent_search_status = ERROR
+        db_analysis.search_error = patent_results["error"]
+    with metrics.span("db.commit"):
+        await db.commit()
+    with metrics.span("artifacts.materialize"):
+        # Scoring and report generation are CPU work; keep them off the event loop
+        await asyncio.to_thread(_materialize_stored_artifacts, db_analysis.analysis_id)
+
+    if patent_results["success"]:
+        message = f"Found {patent_results['count']} potentially relevant patents in {', '.join(research.jurisdictions)}"
+        if patent_results.get("families_collapsed"):
+            message += f" ({patent_results['families_collapsed']} more publications of the same families)"
+        report(COMPLETED, 100, message)
+    else:
+        report(ERROR, 100, f"Patent search failed: {patent_results['error']}")
+
+async def run_batch_job(batch_id: str, items: List, report):
+    """
+    Background worker body for a batch: one combined search per jurisdiction
+    for all queued analyses, then each analysis' share of the results is
+    stored and scored on its own.
+    """
+    by_jurisdiction: Dict[str, List] = {}
+    for analysis_id, research in items:
+        for jurisdiction in research.jurisdictions:
+            by_jurisdiction.setdefault(jurisdiction, []).append((analysis_id, research))
+
+    async with AsyncSessionLocal() as db:
+        analyses = {}
+        for analysis_id, _ in items:
+            db_analysis = await db.get(ResearchAnalysis, analysis_id)
+            if db_analysis:
+                db_analysis.patent_search_status = SEARCHING
+                analyses[analysis_id] = db_analysis
+        await db.commit()
+        for analysis_id in analyses:
+            analysis_jobs.publish(analysis_id, SEARCHING, 10, "Searching patents as part of a batch")
+        report(SEARCHING, 10, f"Searching {len(by_jurisdiction)} jurisdiction(s) for {len(analyses)} analyses")
+
+        async def search_jurisdiction(jurisdiction: str, group: List) -> Dict[str, Dict]:
+            return await patent_service.search_patents_batch(
+                [
+                    {"tag": analysis_id, "keywords": research.keywords, "use_cache": not research.bypass_cache}
+                    for analysis_id, research in group if analysis_id in analyses
+                ],
+                jurisdiction=jurisdiction
+            )
+
+        try:
+            searched = await asyncio.gather(*(
+                search_jurisdiction(jurisdiction, group) for jurisdiction, group in by_jurisdiction.items()
+            ))
+        except asyncio.CancelledError:
+            for db_analysis in analyses.values():
+                db_analysis.patent_search_status = ERROR
+                db_analysis.search_error = "Search cancelled: server shutting down"
+            await db.commit()
+            raise
+
+    report(SEARCHING, 50, "Saving and scoring search results")
+    by_analysis: Dict[str, Dict[str, Dict]] = {}
+    for jurisdiction, results in zip(by_jurisdiction, searched):
+        for analysis_id, patent_results in results.items():
+            by_analysis.setdefault(analysis_id, {})[jurisdiction] = patent_results
+    researches = dict(items)
+    for analysis_id, results in by_analysis.items():
+        research = researches[analysis_id]
+        if len(research.jurisdictions) > 1:
+            patent_results = merge_jurisdiction_results({j: results[j] for j in research.jurisdictions})
+        else:
+            patent_results = results[research.jurisdictions[0]]
+        publish = functools.partial(analysis_jobs.publish, analysis_id)
+        try:
+            # A session per analysis, so a failure rolls back only that analysis' work
+            async with AsyncSessionLocal() as db:
+                db_analysis = await db.get(ResearchAnalysis, analysis_id)
+                if db_analysis:
+                    await _store_search_results(db, db_analysis, research, patent_results, publish)
+        except Exception as e:
+            # One bad analysis must not fail the rest of the batch
+            print(f"Batch {batch_id}: analysis {analysis_id} failed: {str(e)}")
+            message = f"Analysis failed: {str(e)}"
+            await _record_failures([analysis_id], message)
+            publish(ERROR, 100, message)
+    report(COMPLETED, 100, f"Searched {len(analyses)} analyses")
+
+async def run_watchlists(analysis_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Re-search the given watchlists: one combined search per jurisdiction, each
+    input only asking for publications after its watchlist's watermark. Inputs
+    whose page came back full are searched again from where it ended, up to
+    watchlists.MAX_PAGES pages. New hits are merged into the analysis and
+    scored, and every watchlist gets a run record and its next run scheduled,
+    whether or not its search worked. Returns each watchlist's run as a dict.
+    """
+    async with AsyncSessionLocal() as db:
+        rows = await db.execute(
+            select(Watchlist.analysis_id, Watchlist.jurisdiction, Watchlist.watermark, ResearchAnalysis.keywords)
+            .join(ResearchAnalysis, ResearchAnalysis.analysis_id == Watchlist.analysis_id)
+            .where(Watchlist.analysis_id.in_(analysis_ids))
+        )
+        # Plain values: nothing below depends on this session's objects staying loaded
+        by_jurisdiction: Dict[str, List] = {}
+        for analysis_id, jurisdiction, watermark, keywords in rows:
+            by_jurisdiction.setdefault(jurisdiction, []).append(
+                (analysis_id, watermark, json.loads(keywords) if keywords else [])
+            )
+
+    found = await _search_watchlist_pages(by_jurisdiction)
+
+    runs = {}
+    for group in by_jurisdiction.values():
+        for analysis_id, _, _ in group:
+            patent_results = found[analysis_id]
+            try:
+                if not patent_results["success"]:
+                    raise RuntimeError(patent_results["error"])
+                runs[analysis_id] = await asyncio.to_thread(_run_watchlist, analysis_id, patent_results["patents"])
+            except Exception as e:
+                # One failing watchlist must not hold up the rest; it retries at its next interval
+                print(f"Watchlist run for analysis {analysis_id} failed: {str(e)}")
+                try:
+                    runs[analysis_id] = await asyncio.to_thread(_record_watchlist_error, analysis_id, str(e))
+                except Exception as record_error:
+                    print(f"Could not record failed watchlist run for analysis {analysis_id}: {str(record_error)}")
+    return runs
+
+async def _search_watchlist_pages(by_jurisdiction: Dict[str, List]) -> Dict[str, Dict]:
+    """
+    Every watchlist's hits since its watermark, newest first, as
+    ``search_patents``-shaped results; a failed page fails that watchlist's run
+    """
+    found = {
+        analysis_id: {"success": True, "patents": {}}
+        for group in by_jurisdiction.values() for analysis_id, _, _ in group
+    }
+    # Per jurisdiction: analysis id -> (keywords, publication date to search after)
+    pending = {
+        jurisdiction: {
+            analysis_id: (keywords, watchlists.search_watermark(watermark))
+            for analysis_id, watermark, keywords in group
+        }
+        for jurisdiction, group in by_jurisdiction.items()
+    }
+    for _ in range(watchlists.MAX_PAGES):
+        pending = {jurisdiction: inputs for jurisdiction, inputs in pending.items() if inputs}
+        if not pending:
+            break
+        searched = await asyncio.gather(*(
+            patent_service.search_patents_batch(
+                [
+                    {
+                        "tag": analysis_id,
+                        "keywords": keywords,
+                        "published_after": published_after,
+                        # The point of a run is data newer than any cached answer
+                        "use_cache": False,
+                    }
+                    for analysis_id, (keywords, published_after) in inputs.items()
+                ],
+                jurisdiction=jurisdiction,
+                limit=watchlists.SEARCH_LIMIT
+            )
+            for jurisdiction, inputs in pending.items()
+        ))
+        for inputs, results in zip(pending.values(), searched):
+            for analysis_id in list(inputs):
+                patent_results = results[analysis_id]
+                next_after = None
+                if not patent_results["success"]:
+                    found[analysis_id] = patent_results
+                else:
+                    for patent in patent_results["patents"]:
+                        found[analysis_id]["patents"].setdefault(patent["patent_number"], patent)
+                    next_after = watchlists.next_page_after(patent_results["patents"], watchlists.SEARCH_LIMIT)
+                if next_after is None:
+                    del inputs[analysis_id]
+                else:
+                    inputs[analysis_id] = (inputs[analysis_id][0], next_after)
+
+    for results in found.values():
+        if results["success"]:
+            results["patents"] = sorted(
+                results["patents"].values(), key=lambda p: watchlists.parse_date_int(p.get("publication_date")) or 0, reverse=True
+            )
+    return found
+
+def _run_watchlist(analysis_id: str, patents: List[Dict]) -> Dict:
+    """Apply one watchlist run's hits in a sync session of its own, for a worker thread"""
+    with SessionLocal() as db:
+        watchlist = db.get(Watchlist, analysis_id)
+        analysis = db.get(ResearchAnalysis, analysis_id)
+        run = _apply_watchlist_hits(db, watchlist, analysis, patents)
+        db.commit()
+        return run_to_dict(run)
+
+def _record_watchlist_error(analysis_id: str, error: str) -> Dict:
+    """Store a failed run and schedule the next one, in a sync session of its own"""
+    with SessionLocal() as db:
+        watchlist = db.get(Watchlist, analysis_id)
+        run = WatchlistRun(
+            run_id=str(uuid.uuid4()),
+            analysis_id=analysis_id,
+            status=ERROR,
+            previous_watermark=watchlist.watermark,
+            watermark=watchlist.watermark,
+            error=error
+        )
+        db.add(run)
+        _schedule_next_run(watchlist)
+        db.commit()
+        return run_to_dict(run)
+
+def _apply_watchlist_hits(db: Session, watchlist: Watchlist, analysis: ResearchAnalysis, patents: List[Dict]) -> WatchlistRun:
+    """
+    Merge one watchlist run's hits into its analysis (caller commits). A
+    current stored risk assessment is carried forward so only the new patents
+    are scored; without one the existing patents are assessed first.
+    """
+    research_data = _research_data(analysis)
+    risk_json = load_artifact(db, analysis.analysis_id, RISK, risk_service.model_version)
+    previous = json.loads(risk_json) if risk_json else risk_service.assess_patents(research_data, load_analysis_patent_records(db, analysis.analysis_id))
+
+    new_patents = merge_analysis_patents(
+        db, analysis.analysis_id, patents,
+        search_backend=patent_service.backend.name,
+        search_jurisdiction=watchlist.jurisdiction
+    )
+    run = WatchlistRun(
+        run_id=str(uuid.uuid4()),
+        analysis_id=analysis.analysis_id,
+        status=COMPLETED,
+        previous_watermark=watchlist.watermark,
+        watermark=watchlists.advance_watermark(watchlist.watermark, patents),
+        new_patents=[patent["patent_number"] for patent in new_patents],
+        new_high_risk_patents=[],
+        previous_risk_level=previous["overall_risk_level"],
+        risk_level=previous["overall_risk_level"]
+    )
+
+    if new_patents or not risk_json:
+        assessment = risk_service.stream_assessment(research_data, previous=previous)
+        for patent in new_patents:
+            if assessment.add(patent)["risk_level"] == "HIGH":
+                run.new_high_risk_patents.append(patent["patent_number"])
+        risk_assessment = assessment.result() if new_patents else previous
+        invalidate_artifacts(db, analysis.analysis_id)
+        store_artifact(db, analysis.analysis_id, RISK, risk_service.model_version, risk_assessment)
+        report = report_generator.generate_report(research_data, risk_assessment)
+        store_artifact(db, analysis.analysis_id, REPORT, _report_version(), report)
+        analysis.patent_count = (analysis.patent_count or 0) + len(new_patents)
+        run.risk_level = risk_assessment["overall_risk_level"]
+
+    watchlist.watermark = run.watermark
+    _schedule_next_run(watchlist)
+    db.add(run)
+    return run
+
+def _schedule_next_run(watchlist: Watchlist):
+    watchlist.last_run_at = datetime.utcnow()
+    watchlist.next_run_at = watchlist.last_run_at + timedelta(days=watchlist.interval_days)
+
+async def _record_failures(analysis_ids: List[str], message: str, unfinished_only: bool = False):
+    """Mark analyses as failed in the database, in a session of their own"""
+    statement = update(ResearchAnalysis).where(ResearchAnalysis.analysis_id.in_(analysis_ids))
+    if unfinished_only:
+        statement = statement.where(ResearchAnalysis.patent_search_status.notin_(TERMINAL_STATUSES))
+    async with AsyncSessionLocal() as db:
+        await db.execute(statement.values(patent_search_status=ERROR, search_error=message))
+        await db.commit()
+
+async def record_analysis_failure(analysis_id: str, research: ResearchInput, message: str):
+    await _record_failures([analysis_id], message)
+
+async def record_batch_failure(batch_id: str, items: List, message: str):
+    """A failed batch fails the analyses it had not finished yet"""
+    analysis_ids = [analysis_id for analysis_id, _ in items]
+    await _record_failures(analysis_ids, message, unfinished_only=True)
+    for analysis_id in analysis_ids:
+        if analysis_jobs.get_progress(analysis_id):
+            analysis_jobs.publish(analysis_id, ERROR, 100, message)
+
+# Background worker pool for submitted analyses
+analysis_jobs = AnalysisJobQueue(
+    run_analysis_job,
+    workers=int(os.getenv("ANALYSIS_WORKERS", "4")),
+    max_pending=int(os.getenv("ANALYSIS_MAX_PENDING", "100")),
+    on_failure=record_analysis_failure,
+)
+
+# Batches get their own pool so a large portfolio doesn't hold up single submissions
+batch_jobs = AnalysisJobQueue(
+    run_batch_job,
+    workers=int(os.getenv("ANALYSIS_BATCH_WORKERS", "1")),
+    max_pending=int(os.getenv("ANALYSIS_BATCH_MAX_PENDING", "10")),
+    on_failure=record_batch_failure,
+)
+
+# Re-checks watchlisted analyses for newly published patents
+watchlist_scheduler = WatchlistScheduler(run_watchlists)
+
+def _check_search_admission():
+    """
+    Refuse a search stream with 429 while the backend search queue is full.
+    Submitted analyses are not checked: they wait in their job queue, whose
+    own bound (503) is the one rejection path for them.
+    """
+    try:
+        patent_service.admission.check()
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many patent searches in progress, please retry shortly: {e}",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
 # Our enhanced analysis endpoint
-@app.post("/api/analyze", response_model=AnalysisResponse)
-async def analyze_research(research: ResearchInput, db: Session = Depends(get_db)):
+@app.post("/api/analyze", response_model=AnalysisResponse, status_code=202)
+async def analyze_research(research: ResearchInput, db: AsyncSession = Depends(get_async_db)):
     """
-    Analyze research for potential patent conflicts
-    Now includes real USPTO patent search!
+    Submit research for patent conflict analysis.
+    The search runs in the background; follow it via /status or /events.
     """
     # Generate unique ID for this analysis
     analysis_id = str(uuid.uuid4())
@@ -83,44 +555,162 @@ async def analyze_research(research: ResearchInput, db: Session = Depends(get_db
         field_of_study=research.field_of_study,
         keywords=json.dumps(research.keywords),
         researcher_name=research.researcher_name,
-        patent_search_status="searching"
+        patent_search_status=PENDING
     )
     db.add(db_analysis)
-    db.commit()
-    
-    # Search for relevant patents, now with jurisdiction
-    patent_results = await patent_service.search_patents(
-        keywords=research.keywords,
-        field_of_study=research.field_of_study,
-        jurisdiction=research.jurisdiction
-    )
-    
-    # Update database with results
-    if patent_results["success"]:
-        db_analysis.patent_search_status = "completed"
-        db_analysis.patent_results = json.dumps(patent_results["patents"])
-        db_analysis.patent_count = str(patent_results["count"])
-    else:
-        db_analysis.patent_search_status = "error"
-        db_analysis.patent_results = json.dumps({"error": patent_results["error"]})
+    with metrics.span("db.create_analysis"):
+        await db.commit()
     
-    db.commit()
+    try:
+        analysis_jobs.submit(analysis_id, research)
+    except JobQueueFull as e:
+        db_analysis.patent_search_status = ERROR
+        db_analysis.search_error = str(e)
+        await db.commit()
+        raise HTTPException(
+            status_code=503,
+            detail="Too many analyses in progress, please retry shortly",
+            headers={"Retry-After": str(JOB_QUEUE_RETRY_AFTER)}
+        )
     
-    # Prepare response
-    if patent_results["success"]:
-        return AnalysisResponse(
+    return AnalysisResponse(
+        analysis_id=analysis_id,
+        status=PENDING,
+        message=f"Analysis queued for patent search in {', '.join(research.jurisdictions)}"
+    )
+
+@app.post("/api/analyze/batch", response_model=BatchAnalysisResponse, status_code=202)
+async def analyze_research_batch(batch: BatchResearchInput, db: AsyncSession = Depends(get_async_db)):
+    """
+    Submit a portfolio of research inputs. Each gets its own analysis (follow
+    them via /status or /events), but patents are searched with one combined
+    query per jurisdiction instead of one query per input.
+    """
+    batch_id = str(uuid.uuid4())
+    items = []
+    for research in batch.analyses:
+        analysis_id = str(uuid.uuid4())
+        db.add(ResearchAnalysis(
             analysis_id=analysis_id,
-            status="completed",
-            message=f"Found {patent_results['count']} potentially relevant patents in {research.jurisdiction}",
-            patent_count=patent_results["count"],
-            top_patents=patent_results["patents"][:5]  # Return top 5 patents
+            title=research.title,
+            description=research.description,
+            field_of_study=research.field_of_study,
+            keywords=json.dumps(research.keywords),
+            researcher_name=research.researcher_name,
+            patent_search_status=PENDING
+        ))
+        items.append((analysis_id, research))
+    await db.commit()
+
+    try:
+        batch_jobs.submit(batch_id, items)
+    except JobQueueFull as e:
+        await db.execute(
+            update(ResearchAnalysis)
+            .where(ResearchAnalysis.analysis_id.in_([analysis_id for analysis_id, _ in items]))
+            .values(patent_search_status=ERROR, search_error=str(e))
         )
-    else:
-        return AnalysisResponse(
-            analysis_id=analysis_id,
-            status="error",
-            message=f"Patent search failed: {patent_results['error']}"
+        await db.commit()
+        raise HTTPException(
+            status_code=503,
+            detail="Too many batches in progress, please retry shortly",
+            headers={"Retry-After": str(JOB_QUEUE_RETRY_AFTER)}
         )
+
+    for analysis_id, _ in items:
+        analysis_jobs.publish(analysis_id, PENDING, 0, "Queued for batch patent search")
+
+    jurisdictions = sorted({jurisdiction for _, research in items for jurisdiction in research.jurisdictions})
+    return BatchAnalysisResponse(
+        batch_id=batch_id,
+        status=PENDING,
+        message=f"{len(items)} analyses queued for patent search in {', '.join(jurisdictions)}",
+        analyses=[
+            AnalysisResponse(
+                analysis_id=analysis_id,
+                status=PENDING,
+                message=f"Analysis queued for patent search in {', '.join(research.jurisdictions)}"
+            )
+            for analysis_id, research in items
+        ]
+    )
+
+async def _analysis_status(analysis_id: str, db: AsyncSession) -> Dict:
+    """Current job status: in-memory progress if this process runs the job, else the stored row"""
+    progress = analysis_jobs.get_progress(analysis_id)
+    if progress:
+        return progress
+    
+    analysis = await db.get(ResearchAnalysis, analysis_id)
+    if not analysis:
+        return None
+    
+    status = analysis.patent_search_status
+    state = {
+        "analysis_id": analysis_id,
+        "status": status,
+        "progress": 100 if status in TERMINAL_STATUSES else 0,
+        "message": "",
+    }
+    if status == COMPLETED:
+        state["patent_count"] = analysis.patent_count or 0
+        state["message"] = f"Found {state['patent_count']} potentially relevant patents"
+    elif status == ERROR:
+        state["message"] = analysis.search_error or ""
+    return state
+
+@app.get("/api/analyses/{analysis_id}/status")
+async def get_analysis_status(analysis_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Poll the progress of a submitted analysis"""
+    state = await _analysis_status(analysis_id, db)
+    if not state:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return state
+
+@app.get("/api/analyses/{analysis_id}/events")
+async def stream_analysis_events(analysis_id: str, request: Request):
+    """Server-sent events with status updates until the analysis finishes"""
+    # Subscribe before reading the state, so an update published in between is queued, not missed
+    updates = analysis_jobs.subscribe(analysis_id)
+    try:
+        async with AsyncSessionLocal() as db:
+            state = await _analysis_status(analysis_id, db)
+    except Exception:
+        analysis_jobs.unsubscribe(analysis_id, updates)
+        raise
+    if not state:
+        analysis_jobs.unsubscribe(analysis_id, updates)
+        raise HTTPException(status_code=404, detail="Analysis not found")
+
+    async def event_stream():
+        current = state
+        try:
+            yield _sse_event(current)
+            while current["status"] not in TERMINAL_STATUSES:
+                if await request.is_disconnected():
+                    return
+                try:
+                    current = await asyncio.wait_for(updates.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # The job may be running in another worker process; re-check the row
+                    async with AsyncSessionLocal() as db:
+                        latest = await _analysis_status(analysis_id, db)
+                    if latest["status"] == current["status"]:
+                        yield ": keep-alive\n\n"
+                        continue
+                    current = latest
+                yield _sse_event(current)
+        finally:
+            analysis_jobs.unsubscribe(analysis_id, updates)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _sse_event(state: Dict) -> str:
+    return f"event: status\ndata: {json.dumps(state)}\n\n"
     
 # New endpoint to retrieve analysis results
 @app.get("/api/analyses/{analysis_id}")
@@ -133,7 +723,7 @@ def get_analysis(analysis_id: str, db: Session = Depends(get_db)):
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    patents = analysis.get_patent_results()
+    patents = load_analysis_patents(db, analysis_id) if analysis.patent_search_status == COMPLETED else None
     
     return {
         "analysis_id": analysis.analysis_id,
@@ -143,14 +733,64 @@ def get_analysis(analysis_id: str, db: Session = Depends(get_db)):
         "created_at": analysis.created_at.isoformat(),
         "patent_search_status": analysis.patent_search_status,
         "patent_count": analysis.patent_count,
+        "search_error": analysis.search_error,
         "patents": patents
     }
 
-# Add this endpoint after the get_analysis endpoint
+def _research_data(analysis: ResearchAnalysis) -> Dict:
+    return {
+        "analysis_id": analysis.analysis_id,
+        "title": analysis.title,
+        "description": analysis.description,
+        "field_of_study": analysis.field_of_study,
+        "keywords": analysis.get_keywords(),
+        "researcher_name": analysis.researcher_name
+    }
+
+def _stored_patents(db: Session, analysis: ResearchAnalysis) -> List[Dict]:
+    return load_analysis_patents(db, analysis.analysis_id)
+
+def _report_version() -> str:
+    return f"{risk_service.model_version}+report-{report_generator.REPORT_VERSION}"
+
+def _compute_risk(db: Session, analysis: ResearchAnalysis) -> Dict:
+    """Assess an analysis and store the result while the analysis is finished"""
+    risk_assessment = risk_service.assess_patents(_research_data(analysis), load_analysis_patent_records(db, analysis.analysis_id))
+    if analysis.patent_search_status in TERMINAL_STATUSES:
+        store_artifact(db, analysis.analysis_id, RISK, risk_service.model_version, risk_assessment)
+    return risk_assessment
+
+def _compute_report(db: Session, analysis: ResearchAnalysis) -> Dict:
+    """Build (and store) the report, reusing a current stored risk assessment"""
+    risk_json = load_artifact(db, analysis.analysis_id, RISK, risk_service.model_version)
+    risk_assessment = json.loads(risk_json) if risk_json else _compute_risk(db, analysis)
+    report = report_generator.generate_report(_research_data(analysis), risk_assessment)
+    if analysis.patent_search_status in TERMINAL_STATUSES:
+        store_artifact(db, analysis.analysis_id, REPORT, _report_version(), report)
+    return report
+
+def _materialize_artifacts(db: Session, analysis: ResearchAnalysis):
+    """Replace stored risk assessment and report after an analysis' patents changed"""
+    invalidate_artifacts(db, analysis.analysis_id)
+    _compute_report(db, analysis)
+    with metrics.span("db.commit"):
+        db.commit()
+
+def _materialize_stored_artifacts(analysis_id: str):
+    """``_materialize_artifacts`` in a sync session of its own, for a worker thread"""
+    with SessionLocal() as db:
+        analysis = db.get(ResearchAnalysis, analysis_id)
+        if analysis:
+            _materialize_artifacts(db, analysis)
 
 @app.get("/api/analyses/{analysis_id}/report")
 def generate_report(analysis_id: str, db: Session = Depends(get_db)):
     """Generate a comprehensive FTO report for an analysis"""
+    # Served straight from storage while the scoring model is unchanged
+    stored = load_artifact(db, analysis_id, REPORT, _report_version())
+    if stored is not None:
+        return Response(content=stored, media_type="application/json")
+    
     analysis = db.query(ResearchAnalysis).filter(
         ResearchAnalysis.analysis_id == analysis_id
     ).first()
@@ -158,33 +798,19 @@ def generate_report(analysis_id: str, db: Session = Depends(get_db)):
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    # Get patent results - handle None case
-    patents = analysis.get_patent_results()
-    
-    # Don't raise error if no patents - just use empty list
-    if patents is None:
-        patents = []
-    
-    # Prepare research data
-    research_data = {
-        "analysis_id": analysis.analysis_id,
-        "title": analysis.title,
-        "field_of_study": analysis.field_of_study,
-        "keywords": analysis.get_keywords(),
-        "researcher_name": analysis.researcher_name
-    }
-    
-    # Run risk assessment (will handle empty patents)
-    risk_assessment = risk_service.assess_patents(research_data, patents)
-    
-    # Generate report
-    report = report_generator.generate_report(research_data, risk_assessment)
+    # Run risk assessment (will handle empty patents) and generate report
+    report = _compute_report(db, analysis)
+    db.commit()
     
     return report
 
 @app.get("/api/analyses/{analysis_id}/risk")
 def get_risk_assessment(analysis_id: str, db: Session = Depends(get_db)):
     """Get just the risk assessment for an analysis"""
+    stored = load_artifact(db, analysis_id, RISK, risk_service.model_version)
+    if stored is not None:
+        return Response(content=stored, media_type="application/json")
+    
     analysis = db.query(ResearchAnalysis).filter(
         ResearchAnalysis.analysis_id == analysis_id
     ).first()
@@ -192,35 +818,229 @@ def get_risk_assessment(analysis_id: str, db: Session = Depends(get_db)):
     if not analysis:
         raise HTTPException(status_code=404, detail="Analysis not found")
     
-    patents = analysis.get_patent_results()
-    
-    research_data = {
-        "title": analysis.title,
-        "field_of_study": analysis.field_of_study,
-        "keywords": analysis.get_keywords()
-    }
-    
-    risk_assessment = risk_service.assess_patents(research_data, patents or [])
+    risk_assessment = _compute_risk(db, analysis)
+    db.commit()
     
     return risk_assessment
 
-# List all analyses (useful for testing)
-@app.get("/api/analyses")
-def list_analyses(db: Session = Depends(get_db)):
-    """List all analyses in the database"""
-    analyses = db.query(ResearchAnalysis).order_by(
-        ResearchAnalysis.created_at.desc()
-    ).limit(10).all()
-    
+# Scrape-time views of in-memory state
+metrics.gauge("fto_analysis_queue_pending", "Analyses waiting for a worker", function=lambda: analysis_jobs.pending)
+metrics.gauge("fto_batch_queue_pending", "Batches waiting for a worker", function=lambda: batch_jobs.pending)
+metrics.gauge("fto_searches_in_flight", "Distinct patent searches currently running", function=lambda: patent_service.inflight.in_flight)
+metrics.gauge("fto_search_admission_running", "Backend searches holding an admission slot", function=lambda: patent_service.admission.running)
+metrics.gauge("fto_search_admission_waiting", "Backend searches queued for an admission slot", function=lambda: patent_service.admission.waiting)
+metrics.counter("fto_search_cache_hits_total", "Search cache hits", function=lambda: search_cache.hits)
+metrics.counter("fto_search_cache_misses_total", "Search cache misses", function=lambda: search_cache.misses)
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Counters, gauges and latency histograms in the Prometheus text format"""
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+@app.get("/api/search-cache/stats")
+def get_search_cache_stats():
+    """Hit/miss counters and size of the patent search cache"""
+    return search_cache.stats()
+
+# Keywords whose search cost should be estimated
+class SearchEstimateInput(BaseModel):
+    keywords: list[str] = Field(..., min_items=1, max_items=10, description="Key technical terms")
+    jurisdiction: str = Field('US', description="The patent jurisdiction to search (e.g., 'US', 'EP', 'WO')")
+
+@app.post("/api/search/dry-run")
+async def estimate_search(search: SearchEstimateInput):
+    """Bytes a patent search would process, estimated with a BigQuery dry run"""
+    if not patent_service.backend.supports_dry_run:
+        raise HTTPException(status_code=400, detail=f"{patent_service.backend.label} search does not support dry runs")
+    return await patent_service.estimate_search(search.keywords, jurisdiction=search.jurisdiction)
+
+@app.get("/api/search/stream")
+async def stream_search(
+    request: Request,
+    keywords: List[str] = Query(..., description="Key technical terms (repeat the parameter for several)"),
+    field_of_study: str = "",
+    jurisdiction: str = "US",
+    limit: int = Query(100, ge=1, le=MAX_STREAM_LIMIT),
+    page_size: Optional[int] = Query(None, ge=1, le=1000),
+    format: Optional[str] = Query(None, pattern="^(ndjson|sse)$", description="ndjson (default) or sse")
+):
+    """
+    Stream search results as they arrive, each patent scored on the fly.
+
+    Emits one ``patent`` message per patent (the patent and its assessment),
+    then a ``summary`` with the overall assessment, or an ``error``. Messages
+    are NDJSON lines with a ``type`` field, or server-sent events when
+    ``format=sse`` or the client accepts ``text/event-stream``.
+    """
+    if not 1 <= len(keywords) <= 10:
+        raise HTTPException(status_code=422, detail="Provide between 1 and 10 keywords")
+    _check_search_admission()
+    use_sse = format == "sse" or (format is None and "text/event-stream" in request.headers.get("accept", ""))
+    assessment = risk_service.stream_assessment({
+        "title": "",
+        "field_of_study": field_of_study,
+        "keywords": keywords,
+    })
+
+    def message(kind: str, data: Dict) -> str:
+        if use_sse:
+            return f"event: {kind}\ndata: {json.dumps(data)}\n\n"
+        return json.dumps({"type": kind, **data}) + "\n"
+
+    async def results():
+        try:
+            async for page in patent_service.stream_patents(
+                keywords, jurisdiction=jurisdiction, limit=limit, page_size=page_size
+            ):
+                if await request.is_disconnected():
+                    return
+                for patent in page:
+                    yield message("patent", {"patent": patent, "assessment": assessment.add(patent)})
+        except AdmissionRejected as e:
+            yield message("error", {
+                "error": f"{patent_service.backend.label} search not started: {e}",
+                "retry_after": e.retry_after
+            })
+            return
+        except asyncio.TimeoutError:
+            yield message("error", {"error": f"{patent_service.backend.label} search timed out"})
+            return
+        except Exception as e:
+            print(f"Error streaming {patent_service.backend.label} search: {str(e)}")
+            yield message("error", {"error": f"{patent_service.backend.label} search error: {str(e)}"})
+            return
+        yield message("summary", assessment.result())
+
+    if use_sse:
+        return StreamingResponse(
+            results(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+@app.get("/api/search/stats")
+def get_search_stats():
+    """
+    Backend searches started vs. identical concurrent searches that joined one,
+    and the admission queue in front of the backend
+    """
+    return {**patent_service.inflight.stats(), "admission": patent_service.admission.stats()}
+
+@app.get("/api/patents/{publication_number}/analyses")
+def get_patent_analyses(publication_number: str, db: Session = Depends(get_db)):
+    """Which analyses found a given patent"""
+    analyses = analyses_for_patent(db, publication_number)
     return {
+        "publication_number": publication_number,
         "count": len(analyses),
-        "analyses": [
-            {
-                "analysis_id": a.analysis_id,
-                "title": a.title,
-                "created_at": a.created_at.isoformat(),
-                "status": a.patent_search_status
-            }
-            for a in analyses
-        ]
-    }
\ No newline at end of file
+        "analyses": analyses
+    }
+
+# List analyses, newest first, one page at a time
+@app.get("/api/analyses")
+def list_analyses(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    field_of_study: Optional[str] = None,
+    researcher: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    List analyses with optional filters. Pass the returned ``next_cursor``
+    as ``cursor`` to fetch the following page.
+    """
+    try:
+        return list_analyses_page(
+            db,
+            limit=limit,
+            cursor=cursor,
+            status=status,
+            field_of_study=field_of_study,
+            researcher=researcher,
+            created_after=created_after,
+            created_before=created_before
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# Keep an analysis up to date with newly published patents
+class WatchlistInput(BaseModel):
+    interval_days: int = Field(watchlists.DEFAULT_INTERVAL_DAYS, ge=1, le=365, description="Days between re-checks")
+    jurisdiction: Optional[str] = Field(None, description="Jurisdiction to watch; defaults to the one the analysis searched")
+
+@app.put("/api/analyses/{analysis_id}/watchlist")
+def put_watchlist(analysis_id: str, watch: WatchlistInput, db: Session = Depends(get_db)):
+    """
+    Watch a completed analysis: every ``interval_days`` it is searched again
+    for patents published since the last check, and new hits are added to it.
+    """
+    analysis = db.query(ResearchAnalysis).filter(
+        ResearchAnalysis.analysis_id == analysis_id
+    ).first()
+
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    if analysis.patent_search_status != COMPLETED:
+        raise HTTPException(status_code=409, detail="Only completed analyses can be watched")
+
+    watchlist = db.get(Watchlist, analysis_id)
+    if watchlist is None:
+        searched = db.query(AnalysisPatent.search_jurisdiction).filter(
+            AnalysisPatent.analysis_id == analysis_id,
+            AnalysisPatent.search_jurisdiction.isnot(None)
+        ).first()
+        watchlist = Watchlist(
+            analysis_id=analysis_id,
+            jurisdiction=searched[0] if searched else "US",
+            watermark=watchlists.initial_watermark(_stored_patents(db, analysis), analysis.created_at)
+        )
+        db.add(watchlist)
+    if watch.jurisdiction:
+        watchlist.jurisdiction = watch.jurisdiction.upper()
+    watchlist.interval_days = watch.interval_days
+    watchlist.active = True
+    watchlist.next_run_at = (watchlist.last_run_at or datetime.utcnow()) + timedelta(days=watch.interval_days)
+    db.commit()
+
+    return watchlist_to_dict(watchlist)
+
+@app.get("/api/analyses/{analysis_id}/watchlist")
+def get_watchlist(analysis_id: str, runs: int = Query(10, ge=1, le=100), db: Session = Depends(get_db)):
+    """An analysis' watchlist and its most recent runs, newest first"""
+    watchlist = db.get(Watchlist, analysis_id)
+    if not watchlist:
+        raise HTTPException(status_code=404, detail="Analysis is not watched")
+
+    recent = db.query(WatchlistRun).filter(
+        WatchlistRun.analysis_id == analysis_id
+    ).order_by(WatchlistRun.started_at.desc()).limit(runs).all()
+
+    return {**watchlist_to_dict(watchlist), "runs": [run_to_dict(run) for run in recent]}
+
+@app.delete("/api/analyses/{analysis_id}/watchlist")
+def delete_watchlist(analysis_id: str, db: Session = Depends(get_db)):
+    """Stop watching an analysis; its run history is kept"""
+    watchlist = db.get(Watchlist, analysis_id)
+    if not watchlist:
+        raise HTTPException(status_code=404, detail="Analysis is not watched")
+
+    watchlist.active = False
+    db.commit()
+
+    return watchlist_to_dict(watchlist)
+
+@app.post("/api/analyses/{analysis_id}/watchlist/run")
+async def run_watchlist_now(analysis_id: str, db: AsyncSession = Depends(get_async_db)):
+    """Check a watched analysis for new patents now instead of waiting for its next run"""
+    watchlist = await db.get(Watchlist, analysis_id)
+    if not watchlist or not watchlist.active:
+        raise HTTPException(status_code=404, detail="Analysis is not watched")
+
+    runs = await run_watchlists([analysis_id])
+    if analysis_id not in runs:
+        raise HTTPException(status_code=503, detail="The watchlist run could not be recorded, please retry shortly")
+    return runs[analysis_id]
@@ -0,0 +1,340 @@
+"""
+Process-local metrics in the Prometheus text format, and timing spans for the
+stages of an analysis.
+
+Metrics are created once at module level next to the code they measure
+(``counter``, ``gauge``, ``histogram``) and rendered together by ``render()``
+for the ``/metrics`` endpoint. ``span(stage)`` times a block into the
+``fto_stage_duration_seconds`` histogram and, inside ``trace()``, also into the
+current trace, so one analysis' stages can be logged as a single line.
+``request_id`` holds the id of the request being served; background jobs run
+in the context they were submitted from, so it follows them, and
+``log_event`` writes it into every structured log line.
+"""
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# Upper bounds in seconds, from a cache hit to a slow BigQuery job
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (),
+                 function: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> Iterator[str]:
+        if self.function is not None:
+            yield f"{self.name} {_format_value(self.function())}"
+            return
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_label_text(self.labelnames, key)} {_format_value(value)}"
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing total; ``function`` reads it from elsewhere instead"""
+
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """Value that goes up and down; ``function`` reads it at scrape time instead"""
+
+    type_name = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative ``le`` buckets, with their count and sum"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, description: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}  # bucket counts..., count, sum
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        for key, values in series:
+            for bound, count in zip(self.buckets, values):
+                bucket = _label_text(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{bucket} {_format_value(count)}"
+            labels = _label_text(self.labelnames, key)
+            yield f"{self.name}_count{labels} {_format_value(values[-2])}"
+            yield f"{self.name}_sum{labels} {_format_value(values[-1])}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, description: str, labelnames: Sequence[str] = (),
+            function: Optional[Callable[[], float]] = None) -> Counter:
+    return REGISTRY.register(Counter(name, description, labelnames, function))
+
+
+def gauge(name: str, description: str, labelnames: Sequence[str] = (),
+          function: Optional[Callable[[], float]] = None) -> Gauge:
+    return REGISTRY.register(Gauge(name, description, labelnames, function))
+
+
+def histogram(name: str, description: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, description, labelnames, buckets))
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+STAGE_SECONDS = histogram(
+    "fto_stage_duration_seconds", "Time spent in each stage of an analysis or search", ["stage"]
+)
+
+
+class Trace:
+    """Seconds per stage and annotations collected for one unit of work"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.fields: Dict[str, object] = {}
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = round(self.stages.get(stage, 0.0) + seconds, 6)
+
+    def summary(self) -> Dict:
+        return {
+            "duration_s": round(self.elapsed, 6),
+            "stages": dict(self.stages),
+            **self.fields,
+        }
+
+
+@contextmanager
+def trace() -> Iterator[Trace]:
+    """Collect the spans run inside the block (including awaited coroutines) into a Trace"""
+    current = Trace()
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+
+def annotate(**fields):
+    """Attach fields (e.g. BigQuery job stats) to the current trace, if any"""
+    current = _current_trace.get()
+    if current is not None:
+        current.fields.update(fields)
+
+
+def observe_stage(stage: str, seconds: float):
+    """Record a stage duration measured elsewhere (e.g. reported by BigQuery)"""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    current = _current_trace.get()
+    if current is not None:
+        current.add(stage, seconds)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """Time the block into STAGE_SECONDS and the current trace"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def timed(stage: str):
+    """Decorator form of ``span`` for functions and coroutine functions"""
+    def decorate(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+HTTP_REQUESTS = counter("fto_http_requests_total", "HTTP requests by method, route and status", ["method", "route", "status"])
+HTTP_SECONDS = histogram("fto_http_request_duration_seconds", "HTTP request latency by method and route", ["method", "route"])
+
+
+def _route_template(scope) -> str:
+    """Path template of the matched route, so ids don't explode the label set"""
+    from starlette.routing import Match
+
+    app = scope.get("app")
+    for route in getattr(app, "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware that gives every request an id (the caller's X-Request-ID
+    or a new one, echoed in the response) and records request counts and
+    latency per route. Plain ASGI rather than BaseHTTPMiddleware, so streamed
+    responses and client disconnects pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope.get("headers") or []).get(b"x-request-id", b"").decode("latin-1").strip()
+        rid = incoming[:128] or uuid.uuid4().hex
+        token = request_id.set(rid)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_id(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-request-id", rid.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            route = _route_template(scope)
+            HTTP_REQUESTS.inc(method=scope["method"], route=route, status=str(status))
+            HTTP_SECONDS.observe(time.perf_counter() - started, method=scope["method"], route=route)
+            request_id.reset(token)
+
+
+event_logger = logging.getLogger("fto_navigator.events")
+if not event_logger.handlers:
+    # One JSON object per line on stderr, whatever the server's logging setup
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    event_logger.addHandler(_handler)
+    event_logger.setLevel(logging.INFO)
+    event_logger.propagate = False
+
+
+def log_event(event: str, **fields):
+    """Write one structured log line tagged with the current request id"""
+    record = {"event": event, "request_id": request_id.get(), **fields}
+    event_logger.info(json.dumps(record, default=str))
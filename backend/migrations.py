@@ -0,0 +1,138 @@
+"""
+Schema migrations for the SQLite database, tracked with PRAGMA user_version.
+
+Run at application startup, or by hand:
+    python migrations.py
+"""
+import json
+from typing import Dict, List
+
+from sqlalchemy import inspect, text
+
+from database import engine, SessionLocal, Base, ResearchAnalysis, init_db
+from patent_store import save_analysis_patents, storage_number
+
+# Where version 1 leaves the old research_analyses rows if the backfill came up short
+LEGACY_ANALYSES_TABLE = "research_analyses_legacy"
+
+
+def _legacy_patents(analysis_id: str, patent_results: str) -> List[Dict]:
+    """
+    The hits in a legacy patent_results blob. Hits with neither a publication
+    nor an application number get a key of their own, so none are merged.
+    """
+    try:
+        patents = json.loads(patent_results)
+    except ValueError:
+        return []
+    if not isinstance(patents, list):
+        return []
+    return [
+        patent if storage_number(patent) else {**patent, "patent_number": f"legacy:{analysis_id}:{index}"}
+        for index, patent in enumerate(patents)
+        if isinstance(patent, dict)
+    ]
+
+
+def _normalize_patent_storage(connection):
+    """
+    Version 1: move per-analysis patent_results JSON blobs into the shared
+    patents/analysis_patents tables, recount patent_count from the stored
+    hits and keep search errors in search_error. The old rows are dropped
+    only once every hit has its link.
+    """
+    columns = {c["name"] for c in inspect(connection).get_columns("research_analyses")}
+    if "patent_results" not in columns:
+        return
+
+    # Keep analysis_patents' foreign key pointing at research_analyses
+    connection.execute(text("PRAGMA legacy_alter_table = ON"))
+    connection.execute(text(f"ALTER TABLE research_analyses RENAME TO {LEGACY_ANALYSES_TABLE}"))
+    connection.execute(text("PRAGMA legacy_alter_table = OFF"))
+    connection.execute(text("DROP INDEX IF EXISTS ix_research_analyses_analysis_id"))
+    Base.metadata.create_all(bind=connection)
+    connection.execute(text(f"""
+        INSERT INTO research_analyses (
+            analysis_id, title, description, field_of_study, keywords,
+            researcher_name, created_at, patent_search_status, patent_count, search_error
+        )
+        SELECT
+            analysis_id, title, description, field_of_study, keywords,
+            researcher_name, created_at, patent_search_status, NULL,
+            CASE WHEN json_valid(patent_results) AND json_type(patent_results) = 'object'
+                 THEN json_extract(patent_results, '$.error') END
+        FROM {LEGACY_ANALYSES_TABLE}
+    """))
+
+    legacy = connection.execute(text(
+        f"SELECT analysis_id, patent_results FROM {LEGACY_ANALYSES_TABLE} WHERE patent_results IS NOT NULL"
+    )).fetchall()
+    expected_links = 0
+    db = SessionLocal(bind=connection)
+    try:
+        for analysis_id, patent_results in legacy:
+            patents = _legacy_patents(analysis_id, patent_results)
+            expected_links += len({storage_number(patent) for patent in patents})
+            save_analysis_patents(db, analysis_id, patents, search_backend="bigquery")
+        db.flush()
+    finally:
+        db.close()
+
+    # The legacy counts are unreliable; count what was actually stored
+    connection.execute(text("""
+        UPDATE research_analyses SET patent_count = (
+            SELECT COUNT(*) FROM analysis_patents
+            WHERE analysis_patents.analysis_id = research_analyses.analysis_id
+        )
+    """))
+
+    links = connection.execute(text("SELECT COUNT(*) FROM analysis_patents")).scalar()
+    if links == expected_links:
+        connection.execute(text(f"DROP TABLE {LEGACY_ANALYSES_TABLE}"))
+    else:
+        print(f"Kept {LEGACY_ANALYSES_TABLE}: stored {links} patent links of {expected_links}")
+
+
+def _index_analysis_listing(connection):
+    """Version 2: indexes backing the keyset-paginated analysis listing"""
+    for index in ResearchAnalysis.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+
+def _add_publication_dates(connection):
+    """Version 3: patents keep their publication date (watchlists track it as a watermark)"""
+    columns = {c["name"] for c in inspect(connection).get_columns("patents")}
+    if "publication_date" not in columns:
+        connection.execute(text("ALTER TABLE patents ADD COLUMN publication_date VARCHAR"))
+
+
+def _add_family_ids(connection):
+    """Version 4: patents keep their family id (multi-jurisdiction searches collapse families)"""
+    columns = {c["name"] for c in inspect(connection).get_columns("patents")}
+    if "family_id" not in columns:
+        connection.execute(text("ALTER TABLE patents ADD COLUMN family_id VARCHAR"))
+
+
+# Ordered migrations; the database's user_version is the number already applied
+MIGRATIONS = [
+    _normalize_patent_storage,
+    _index_analysis_listing,
+    _add_publication_dates,
+    _add_family_ids,
+]
+
+
+def run_migrations(bind=engine):
+    """Create missing tables, then apply pending migrations, each in its own transaction"""
+    init_db(bind)
+    with bind.connect() as connection:
+        version = connection.execute(text("PRAGMA user_version")).scalar()
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        with bind.begin() as connection:
+            migration(connection)
+            connection.execute(text(f"PRAGMA user_version = {number}"))
+        print(f"Applied database migration {number}: {migration.__name__}")
+
+
+if __name__ == "__main__":
+    run_migrations()
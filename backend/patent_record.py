@@ -0,0 +1,155 @@
+"""
+Compact patent records for scoring.
+
+Search results travel through the API, the search cache and the database as
+JSON-friendly dicts in the ``format_patent`` shape. Scoring works on
+PatentRecord instead. It is a ``__slots__`` object with tuples for the list
+fields and every date parsed once into a day number (``date.toordinal()``),
+so a large result set costs far less memory than dicts, and no date string
+is parsed again per factor. ``to_dict`` and ``from_dict`` convert between
+the two without loss. Dates come out as YYYYMMDD strings, the form BigQuery's
+integer dates always had in the API, and "N/A" when missing.
+"""
+import sys
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Union
+
+MISSING_DATE = "N/A"
+
+# family_id values the publications table uses for "no family"
+UNKNOWN_FAMILY_IDS = frozenset(("", "-1", "0"))
+
+
+def parse_day(value) -> Optional[int]:
+    """
+    Day number of 20190312, "20190312", "2019-03-12" (optionally followed by
+    a time) or a date; None for missing, zero (BigQuery's "no date") or
+    unparseable values
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, date):
+        return value.toordinal()
+    text = str(value).strip()
+    if len(text) >= 10 and text[4] == "-" and text[7] == "-":
+        text = text[:4] + text[5:7] + text[8:10]
+    if len(text) != 8 or not text.isdigit():
+        return None
+    try:
+        return date(int(text[:4]), int(text[4:6]), int(text[6:])).toordinal()
+    except ValueError:
+        return None
+
+
+def format_day(day: Optional[int]) -> str:
+    """YYYYMMDD string for a day number, "N/A" for None"""
+    return date.fromordinal(day).strftime("%Y%m%d") if day is not None else MISSING_DATE
+
+
+def _family_id(value) -> Optional[str]:
+    family_id = str(value).strip() if value is not None else ""
+    return None if family_id in UNKNOWN_FAMILY_IDS else family_id
+
+
+def _strings(values) -> tuple:
+    # Codes, names and countries repeat across a result set; share one copy of each
+    return tuple(sys.intern(str(value)) for value in values or ())
+
+
+class PatentRecord:
+    __slots__ = (
+        "patent_number", "title", "abstract",
+        "publication_day", "grant_day", "filing_day",
+        "applicants", "inventors", "classifications",
+        "jurisdiction", "status", "family_id",
+    )
+
+    def __init__(self, patent_number: Optional[str], title: Optional[str] = None, abstract: Optional[str] = None,
+                 publication_day: Optional[int] = None, grant_day: Optional[int] = None,
+                 filing_day: Optional[int] = None, applicants: Iterable[str] = (), inventors: Iterable[str] = (),
+                 classifications: Iterable[str] = (), jurisdiction: Optional[str] = None,
+                 status: Optional[str] = "Active", family_id: Optional[str] = None):
+        self.patent_number = patent_number
+        self.title = title
+        self.abstract = abstract
+        self.publication_day = publication_day
+        self.grant_day = grant_day
+        self.filing_day = filing_day
+        self.applicants = _strings(applicants)
+        self.inventors = _strings(inventors)
+        self.classifications = _strings(classifications)
+        self.jurisdiction = sys.intern(jurisdiction) if jurisdiction else jurisdiction
+        self.status = sys.intern(status) if status else status
+        self.family_id = _family_id(family_id)
+
+    @classmethod
+    def from_row(cls, row) -> "PatentRecord":
+        """Record from a publications row (BigQuery Row, or dict from the local index)"""
+        return cls(
+            patent_number=row.get("publication_number"),
+            title=row.get("title"),
+            abstract=row.get("abstract"),
+            publication_day=parse_day(row.get("publication_date")),
+            grant_day=parse_day(row.get("grant_date")),
+            filing_day=parse_day(row.get("filing_date")),
+            applicants=row.get("assignees"),
+            inventors=row.get("inventors"),
+            classifications=row.get("cpc_codes"),
+            jurisdiction=row.get("country_code"),
+            family_id=row.get("family_id"),
+        )
+
+    @classmethod
+    def from_dict(cls, patent: Dict) -> "PatentRecord":
+        """Record from the API patent shape (``to_dict``'s inverse)"""
+        return cls(
+            patent_number=patent.get("patent_number"),
+            title=patent.get("title"),
+            abstract=patent.get("abstract"),
+            publication_day=parse_day(patent.get("publication_date")),
+            grant_day=parse_day(patent.get("grant_date")),
+            filing_day=parse_day(patent.get("filing_date")),
+            applicants=patent.get("applicants"),
+            inventors=patent.get("inventors"),
+            classifications=patent.get("classifications"),
+            jurisdiction=patent.get("jurisdiction"),
+            status=patent.get("status"),
+            family_id=patent.get("family_id"),
+        )
+
+    def to_dict(self) -> Dict:
+        """
+        The API patent shape (see search_backend.format_patent); bump
+        search_backend.RESULT_FORMAT_VERSION when it changes
+        """
+        return {
+            "patent_number": self.patent_number,
+            "title": self.title,
+            "abstract": self.abstract,
+            "publication_date": format_day(self.publication_day),
+            "grant_date": format_day(self.grant_day),
+            "filing_date": format_day(self.filing_day),
+            "applicants": list(self.applicants),
+            "inventors": list(self.inventors),
+            "classifications": list(self.classifications),
+            "jurisdiction": self.jurisdiction,
+            "status": self.status,
+            "family_id": self.family_id,
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PatentRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f"PatentRecord({self.patent_number!r}, granted {format_day(self.grant_day)})"
+
+
+def as_record(patent: Union[Dict, PatentRecord]) -> PatentRecord:
+    return patent if isinstance(patent, PatentRecord) else PatentRecord.from_dict(patent)
+
+
+def as_records(patents: Iterable[Union[Dict, PatentRecord]]) -> List[PatentRecord]:
+    """Records for a mix of API-shape dicts and records; records pass through"""
+    return [as_record(patent) for patent in patents]
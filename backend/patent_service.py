@@ -1,118 +1,600 @@
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Optional
 from dotenv import load_dotenv
 import asyncio
-from google.cloud import bigquery
+import functools
+import threading
 from datetime import datetime, timedelta
 
+from admission import AdmissionController, AdmissionRejected
+from patent_record import UNKNOWN_FAMILY_IDS, parse_day
+from search_backend import SearchBackend, format_patent
+from search_cache import normalize_query, make_cache_key
+from singleflight import SingleFlight
+import metrics
+from query_builder import PatentQuery, PatentQueryBuilder
+
 # Load environment variables from .env file
 load_dotenv()
 
-# Initialize BigQuery client
-client = bigquery.Client()
+def filing_date_threshold_bucket(today: Optional[datetime] = None) -> int:
+    """
+    Earliest filing date (YYYYMMDD) for the 20-year activity filter, rounded down to
+    the first of the month so equal searches share a cache entry for a whole month.
+    """
+    twenty_years_ago = (today or datetime.now()) - timedelta(days=20 * 365.25)
+    return int(twenty_years_ago.replace(day=1).strftime('%Y%m%d'))
 
-class PatentSearchService:
-    def __init__(self):
-        self.client = bigquery.Client()
+def family_key(patent: Dict) -> str:
+    """Publications of one invention share a family id; without one a patent is its own family"""
+    family_id = str(patent.get("family_id") or "").strip()
+    return patent.get("patent_number") if family_id in UNKNOWN_FAMILY_IDS else family_id
+
+def merge_jurisdiction_results(results: Dict[str, Dict]) -> Dict:
+    """
+    Combine ``search_patents`` results keyed by jurisdiction into one result.
+    Patents come newest publication first, and each patent family is kept once,
+    as its newest publication (the earlier-listed jurisdiction's on a tie), so
+    one invention filed in several offices is scored and reported once. If any
+    jurisdiction failed the merged search fails, rather than silently missing
+    coverage that was asked for.
+    """
+    summary = {
+        jurisdiction: {"success": result["success"], "count": result["count"], "cached": result.get("cached", False)}
+        for jurisdiction, result in results.items()
+    }
+    failed = [f"{jurisdiction}: {result['error']}" for jurisdiction, result in results.items() if not result["success"]]
+    if failed:
+        return {"success": False, "error": "; ".join(failed), "patents": [], "count": 0, "jurisdictions": summary}
+
+    hits = [patent for result in results.values() for patent in result["patents"]]
+    # Stable, so equal dates keep the jurisdictions' order
+    hits.sort(key=lambda patent: parse_day(patent.get("publication_date")) or 0, reverse=True)
+    seen = set()
+    patents = []
+    for patent in hits:
+        key = family_key(patent)
+        if key not in seen:
+            seen.add(key)
+            patents.append(patent)
+    return {
+        "success": True,
+        "count": len(patents),
+        "patents": patents,
+        "search_query": "\n\n".join(result.get("search_query", "") for result in results.values()),
+        "cached": all(result.get("cached", False) for result in results.values()),
+        "jurisdictions": summary,
+        "families_collapsed": len(hits) - len(patents),
+    }
+
+# Per-search deadline (seconds) and how often a running job is polled
+DEFAULT_SEARCH_TIMEOUT = float(os.getenv("BIGQUERY_SEARCH_TIMEOUT", "60"))
+DEFAULT_POLL_INTERVAL = float(os.getenv("BIGQUERY_POLL_INTERVAL", "0.5"))
+
+# Byte cap for a single BigQuery job (0 = no cap); with the dry-run check on,
+# searches estimated over the cap are refused before a job is started
+DEFAULT_MAXIMUM_BYTES_BILLED = int(os.getenv("BIGQUERY_MAXIMUM_BYTES_BILLED", "0"))
+DEFAULT_DRY_RUN_CHECK = os.getenv("BIGQUERY_DRY_RUN_CHECK", "false").lower() in ("1", "true", "yes")
+
+# Patents per page when search results are streamed
+DEFAULT_STREAM_PAGE_SIZE = int(os.getenv("SEARCH_STREAM_PAGE_SIZE", "50"))
+
+# Which search backend main.py uses: "bigquery" or "local"
+DEFAULT_SEARCH_BACKEND = os.getenv("PATENT_SEARCH_BACKEND", "bigquery")
+
+
+SEARCHES = metrics.counter(
+    "fto_searches_total", "Patent searches by backend and outcome (cache_hit, success, error, timeout, rejected)",
+    ["backend", "outcome"]
+)
+SEARCH_CACHE_ERRORS = metrics.counter(
+    "fto_search_cache_errors_total", "Search cache reads and writes that failed and were skipped", ["operation"]
+)
+BIGQUERY_JOBS = metrics.counter(
+    "fto_bigquery_jobs_total", "Finished BigQuery jobs by whether BigQuery answered from its cache", ["cache_hit"]
+)
+BIGQUERY_BYTES_PROCESSED = metrics.counter("fto_bigquery_bytes_processed_total", "Bytes processed by BigQuery jobs")
+BIGQUERY_BYTES_BILLED = metrics.counter("fto_bigquery_bytes_billed_total", "Bytes billed for BigQuery jobs")
+BIGQUERY_SLOT_MILLIS = metrics.counter("fto_bigquery_slot_milliseconds_total", "Slot time consumed by BigQuery jobs")
+
+
+class QueryTooExpensive(Exception):
+    """A search's dry-run estimate exceeds the configured maximum bytes billed"""
+
+
+class BigQuerySearchBackend(SearchBackend):
+    """Google Patents Public Dataset on BigQuery"""
+
+    name = "bigquery"
+    label = "BigQuery"
+    supports_dry_run = True
+
+    def __init__(self, poll_interval: Optional[float] = None, maximum_bytes_billed: Optional[int] = None,
+                 dry_run_check: Optional[bool] = None):
+        self._client = None
+        self._client_lock = threading.Lock()
         self.project_id = os.getenv("GCP_PROJECT_ID")
         self.dataset_id = "patents-public-data.patents"
+        self.query_builder = PatentQueryBuilder(self.dataset_id)
+        self.poll_interval = DEFAULT_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.maximum_bytes_billed = DEFAULT_MAXIMUM_BYTES_BILLED if maximum_bytes_billed is None else maximum_bytes_billed
+        self.dry_run_check = DEFAULT_DRY_RUN_CHECK if dry_run_check is None else dry_run_check
+
+    @property
+    def client(self):
+        """
+        BigQuery client, created on first use: importing google-cloud-bigquery
+        and discovering credentials are slow, and the API must be able to
+        start (and serve everything but BigQuery searches) without them
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    from google.cloud import bigquery
+                    self._client = bigquery.Client()
+        return self._client
+
+    def _submit(self, sql: str, job_config):
+        # Runs in the executor, so the first call's client setup stays off the event loop
+        return self.client.query(sql, job_config=job_config)
+
+    async def search(self, keywords: List[str], jurisdiction: str, limit: int, filing_date_threshold: int,
+                     published_after: Optional[int] = None) -> Dict:
+        """
+        Job submission, polling and row fetching run in the default executor so the
+        event loop keeps serving other requests. If the awaiting task is cancelled
+        (deadline passed, client gone, shutdown) the BigQuery job is cancelled too.
+        """
+        with metrics.span("bigquery.build_sql"):
+            patent_query = self.query_builder.search(keywords, jurisdiction, limit, filing_date_threshold, published_after)
+        rows = await self._run_patent_query(patent_query)
+        if published_after:
+            # Selected oldest first (see PatentQueryBuilder.search), returned newest first
+            rows = sorted(rows, key=lambda r: r.get("publication_date") or 0, reverse=True)
+        with metrics.span("bigquery.materialize_rows"):
+            patents = [format_patent(row) for row in rows]
+        return {
+            "patents": patents,
+            "search_query": patent_query.sql,
+        }
+
+    async def search_batch(self, queries: List[Dict], jurisdiction: str, limit: int, filing_date_threshold: int) -> Dict[str, Dict]:
+        """
+        One job for all ``queries`` (see PatentQueryBuilder.search_batch), so the
+        publications table is read once per batch. Rows come back tagged with the
+        input they matched and are split per tag, newest first.
+        """
+        with metrics.span("bigquery.build_sql"):
+            patent_query = self.query_builder.search_batch(queries, jurisdiction, limit, filing_date_threshold)
+        rows = await self._run_patent_query(patent_query)
+
+        results = {q["tag"]: {"patents": [], "search_query": patent_query.sql} for q in queries}
+        with metrics.span("bigquery.materialize_rows"):
+            for row in sorted(rows, key=lambda r: r.get("publication_date") or 0, reverse=True):
+                results[row.get("tag")]["patents"].append(format_patent(row))
+        return results
 
-    async def search_patents(self, keywords: List[str], field_of_study: str = None, jurisdiction: str = 'US', limit: int = 25) -> Dict:
+    async def search_pages(self, keywords: List[str], jurisdiction: str, limit: int, filing_date_threshold: int,
+                           page_size: int) -> AsyncIterator[List[Dict]]:
         """
-        Search Google Patents Public Dataset on BigQuery, filtering for active patents by jurisdiction.
+        Fetch the finished job's rows one BigQuery result page at a time, so
+        each page is yielded as soon as it has been downloaded. The job is
+        cancelled if the consumer stops early or the task is cancelled.
         """
+        patent_query = self.query_builder.search(keywords, jurisdiction, limit, filing_date_threshold)
+        await self._check_estimate(patent_query)
+
+        loop = asyncio.get_running_loop()
+        job_holder = []
+        finished = False
         try:
-            # Construct keyword search conditions for title and abstract
-            search_terms_lower = [k.lower() for k in keywords]
-            keyword_conditions_list = []
-            for term in search_terms_lower:
-                keyword_conditions_list.append(f"""
-                    EXISTS(SELECT 1 FROM UNNEST(p.title_localized) AS tl WHERE tl.language = 'en' AND LOWER(tl.text) LIKE '%{term}%') OR
-                    EXISTS(SELECT 1 FROM UNNEST(p.abstract_localized) AS al WHERE al.language = 'en' AND LOWER(al.text) LIKE '%{term}%')
-                """)
-            keyword_conditions = "(" + " OR ".join(keyword_conditions_list) + ")"
-
-            # Calculate the date 20 years ago from today for the activity filter
-            twenty_years_ago = datetime.now() - timedelta(days=20 * 365.25)
-            filing_date_threshold = int(twenty_years_ago.strftime('%Y%m%d'))
-
-            # CORRECTED QUERY: Aliases added to UNNEST operations in subqueries
-            query = f"""
-                SELECT
-                    p.publication_number,
-                    (SELECT text FROM UNNEST(p.title_localized) WHERE language = 'en' LIMIT 1) AS title,
-                    (SELECT text FROM UNNEST(p.abstract_localized) WHERE language = 'en' LIMIT 1) AS abstract,
-                    p.publication_date,
-                    p.filing_date,
-                    p.grant_date,
-                    p.country_code,
-                    (SELECT ARRAY_AGG(c.code) FROM UNNEST(p.cpc) AS c) as cpc_codes,
-                    (SELECT ARRAY_AGG(a.name) FROM UNNEST(p.assignee_harmonized) as a) as assignees,
-                    (SELECT ARRAY_AGG(i.name) FROM UNNEST(p.inventor_harmonized) as i) as inventors
-                FROM
-                    `{self.dataset_id}.publications` AS p
-                WHERE
-                    {keyword_conditions}
-                    AND p.country_code = @jurisdiction
-                    AND p.grant_date > 0 -- It must be a granted patent
-                    AND p.filing_date >= @filing_date_threshold -- Filed in the last 20 years
-                ORDER BY
-                    p.publication_date DESC
-                LIMIT @limit
-            """
-
-            job_config = bigquery.QueryJobConfig(
-                query_parameters=[
-                    bigquery.ScalarQueryParameter("jurisdiction", "STRING", jurisdiction.upper()),
-                    bigquery.ScalarQueryParameter("filing_date_threshold", "INT64", filing_date_threshold),
-                    bigquery.ScalarQueryParameter("limit", "INT64", limit),
-                ]
+            query_job = await self._wait_for_job(
+                patent_query.sql, patent_query.job_config(maximum_bytes_billed=self.maximum_bytes_billed), job_holder
             )
+            row_iterator = await loop.run_in_executor(None, functools.partial(query_job.result, page_size=page_size))
+            pages = iter(row_iterator.pages)
+            while True:
+                with metrics.span("bigquery.fetch_rows"):
+                    page = await loop.run_in_executor(None, lambda: list(next(pages, None) or []))
+                if not page:
+                    break
+                with metrics.span("bigquery.materialize_rows"):
+                    patents = [format_patent(row) for row in page]
+                yield patents
+            finished = True
+        finally:
+            if not finished:
+                self._cancel_jobs(job_holder)
+
+    async def dry_run(self, keywords: List[str], jurisdiction: str, limit: int, filing_date_threshold: int) -> Dict:
+        """Estimated bytes a search would process, without running (or paying for) it"""
+        patent_query = self.query_builder.search(keywords, jurisdiction, limit, filing_date_threshold)
+        bytes_processed = await self._estimate_bytes(patent_query)
+        return {
+            "bytes_processed": bytes_processed,
+            "maximum_bytes_billed": self.maximum_bytes_billed or None,
+            "within_limit": not self.maximum_bytes_billed or bytes_processed <= self.maximum_bytes_billed,
+            "search_query": patent_query.sql,
+        }
+
+    async def _estimate_bytes(self, patent_query: PatentQuery) -> int:
+        loop = asyncio.get_running_loop()
+        query_job = await loop.run_in_executor(None, functools.partial(
+            self._submit, patent_query.sql, patent_query.job_config(dry_run=True)
+        ))
+        return query_job.total_bytes_processed or 0
+
+    async def _check_estimate(self, patent_query: PatentQuery):
+        """With the dry-run check on, refuse queries estimated over the byte cap"""
+        if self.dry_run_check and self.maximum_bytes_billed:
+            with metrics.span("bigquery.dry_run"):
+                estimate = await self._estimate_bytes(patent_query)
+            if estimate > self.maximum_bytes_billed:
+                raise QueryTooExpensive(
+                    f"query would process {estimate} bytes, over the {self.maximum_bytes_billed} byte limit"
+                )
+
+    async def _run_patent_query(self, patent_query: PatentQuery) -> List:
+        """Run a built query under the byte cap"""
+        await self._check_estimate(patent_query)
+
+        job_config = patent_query.job_config(maximum_bytes_billed=self.maximum_bytes_billed)
+        job_holder = []
+        try:
+            return await self._run_query(patent_query.sql, job_config, job_holder)
+        except asyncio.CancelledError:
+            self._cancel_jobs(job_holder)
+            raise
+
+    async def _run_query(self, query: str, job_config, job_holder: List) -> List:
+        """
+        Submit a query, poll it until done and fetch its rows without blocking the loop.
+        The submitted job is appended to ``job_holder`` so the caller can cancel it.
+        """
+        query_job = await self._wait_for_job(query, job_config, job_holder)
+        loop = asyncio.get_running_loop()
+        with metrics.span("bigquery.fetch_rows"):
+            return await loop.run_in_executor(None, lambda: list(query_job.result()))
+
+    async def _wait_for_job(self, query: str, job_config, job_holder: List):
+        """Submit a query and poll it until done, off the event loop"""
+        loop = asyncio.get_running_loop()
+        with metrics.span("bigquery.submit"):
+            query_job = await loop.run_in_executor(
+                None, functools.partial(self._submit, query, job_config)
+            )
+        job_holder.append(query_job)
+
+        with metrics.span("bigquery.wait"):
+            while not await loop.run_in_executor(None, query_job.done):
+                await asyncio.sleep(self.poll_interval)
+        _record_job_stats(query_job)
+        return query_job
+
+    def _cancel_jobs(self, job_holder: List) -> None:
+        """Ask BigQuery to cancel submitted jobs (fire-and-forget, off the loop)."""
+        loop = asyncio.get_running_loop()
+        for query_job in job_holder:
+            loop.run_in_executor(None, _cancel_quietly, query_job)
+
+
+def _record_job_stats(query_job) -> None:
+    """
+    Metrics from a finished job's statistics: time queued (created -> started)
+    and executing (started -> ended) as BigQuery saw it, bytes, slot time and
+    whether the result came from BigQuery's cache
+    """
+    created, started, ended = (getattr(query_job, name, None) for name in ("created", "started", "ended"))
+    if created and started:
+        metrics.observe_stage("bigquery.queue", (started - created).total_seconds())
+    if started and ended:
+        metrics.observe_stage("bigquery.execution", (ended - started).total_seconds())
+
+    bytes_processed = getattr(query_job, "total_bytes_processed", None) or 0
+    bytes_billed = getattr(query_job, "total_bytes_billed", None) or 0
+    slot_millis = getattr(query_job, "slot_millis", None) or 0
+    cache_hit = bool(getattr(query_job, "cache_hit", False))
+    BIGQUERY_JOBS.inc(cache_hit=str(cache_hit).lower())
+    BIGQUERY_BYTES_PROCESSED.inc(bytes_processed)
+    BIGQUERY_BYTES_BILLED.inc(bytes_billed)
+    BIGQUERY_SLOT_MILLIS.inc(slot_millis)
+    metrics.annotate(
+        bigquery_job_id=getattr(query_job, "job_id", None),
+        bigquery_bytes_processed=bytes_processed,
+        bigquery_bytes_billed=bytes_billed,
+        bigquery_slot_millis=slot_millis,
+        bigquery_cache_hit=cache_hit,
+    )
+
+
+def _cancel_quietly(query_job) -> None:
+    try:
+        query_job.cancel()
+    except Exception as e:
+        print(f"Failed to cancel BigQuery job {getattr(query_job, 'job_id', '?')}: {str(e)}")
+
+
+def create_search_backend(name: Optional[str] = None) -> SearchBackend:
+    """Build the search backend selected by ``name`` or PATENT_SEARCH_BACKEND"""
+    name = (name or DEFAULT_SEARCH_BACKEND).lower()
+    if name == "bigquery":
+        return BigQuerySearchBackend()
+    if name == "local":
+        from local_index import LocalIndexSearchBackend
+        return LocalIndexSearchBackend()
+    raise ValueError(f"Unknown patent search backend: {name!r}")
+
+
+class PatentSearchService:
+    def __init__(self, backend: Optional[SearchBackend] = None, search_timeout: Optional[float] = None, cache=None,
+                 admission: Optional[AdmissionController] = None):
+        self.backend = backend or create_search_backend()
+        self.cache = cache
+        # Bounds the backend searches in flight across all requests
+        self.admission = admission or AdmissionController()
+        self.inflight = SingleFlight()
+        self.search_timeout = DEFAULT_SEARCH_TIMEOUT if search_timeout is None else search_timeout
+
+    async def search_patents(self, keywords: List[str], field_of_study: str = None, jurisdiction: str = 'US', limit: int = 25, timeout: Optional[float] = None, use_cache: bool = True, published_after: Optional[int] = None) -> Dict:
+        """
+        Search the configured backend for active patents by jurisdiction.
+
+        If the search takes longer than ``timeout`` seconds it is cancelled and an
+        error result is returned. Successful results are cached on the normalized
+        query when the service has a cache; pass ``use_cache=False`` to bypass it
+        (the fresh result is still stored). Concurrent calls for the same
+        normalized query share one backend search. ``published_after``
+        (YYYYMMDD) restricts the search to newer publications.
+        """
+        timeout = self.search_timeout if timeout is None else timeout
+        filing_date_threshold = filing_date_threshold_bucket()
+
+        normalized_query = normalize_query(keywords, jurisdiction, limit, filing_date_threshold, published_after)
+        search_key = make_cache_key({**normalized_query, "backend": self.backend.name})
+
+        if self.cache is not None and use_cache:
+            with metrics.span("search.cache_lookup"):
+                cached = await self._cache_get(search_key)
+            if cached is not None:
+                SEARCHES.inc(backend=self.backend.name, outcome="cache_hit")
+                metrics.annotate(search_cached=True)
+                return {**cached, "cached": True}
 
-            # For debugging, you can uncomment the next line
-            # print(f"Executing BigQuery search with SQL:\n{query}")
-
-            query_job = self.client.query(query, job_config=job_config)
-            results_iterator = query_job.result()
-
-            patents_data = []
-            for row in results_iterator:
-                patent_info = {
-                    "patent_number": row.get("publication_number"),
-                    "title": row.get("title"),
-                    "abstract": row.get("abstract"),
-                    "grant_date": str(row.get("grant_date")) if row.get("grant_date") else "N/A",
-                    "filing_date": str(row.get("filing_date")) if row.get("filing_date") else "N/A",
-                    "applicants": row.get("assignees", []),
-                    "inventors": row.get("inventors", []),
-                    "classifications": row.get("cpc_codes", []),
-                    "jurisdiction": row.get("country_code"),
-                    "status": "Active"  # Based on our query logic
-                }
-                patents_data.append(patent_info)
-
-            # print(f"BigQuery search found {len(patents_data)} patents within the limit.")
+        metrics.annotate(search_cached=False)
+        # Identical searches already running are joined instead of started again
+        results = await self.inflight.do(
+            search_key,
+            lambda: self._search_and_store(search_key, normalized_query, limit, filing_date_threshold, timeout)
+        )
+        return dict(results)
 
+    async def search_patents_multi(self, keywords: List[str], jurisdictions: List[str], limit: int = 25,
+                                   timeout: Optional[float] = None, use_cache: bool = True) -> Dict:
+        """
+        ``search_patents`` in several jurisdictions concurrently, so the wait is
+        that of the slowest one, merged by ``merge_jurisdiction_results``
+        (``limit`` applies per jurisdiction).
+        """
+        results = await asyncio.gather(*(
+            self.search_patents(keywords, jurisdiction=jurisdiction, limit=limit, timeout=timeout, use_cache=use_cache)
+            for jurisdiction in jurisdictions
+        ))
+        return merge_jurisdiction_results(dict(zip(jurisdictions, results)))
+
+    async def _search_and_store(self, search_key: str, normalized_query: Dict, limit: int, filing_date_threshold: int, timeout: float) -> Dict:
+        """Run one backend search under ``timeout`` and cache it if it succeeded"""
+        label = self.backend.label
+        try:
+            # Queue time does not count against the search timeout
+            async with self.admission.slot():
+                with metrics.span("search.backend"):
+                    found = await asyncio.wait_for(
+                        self.backend.search(
+                            keywords=normalized_query["keywords"],
+                            jurisdiction=normalized_query["jurisdiction"],
+                            limit=limit,
+                            filing_date_threshold=filing_date_threshold,
+                            published_after=normalized_query.get("published_after")
+                        ),
+                        timeout=timeout
+                    )
+        except AdmissionRejected as e:
+            print(f"{label} search rejected: {str(e)}")
+            SEARCHES.inc(backend=self.backend.name, outcome="rejected")
             return {
-                "success": True,
-                "count": len(patents_data),
-                "patents": patents_data,
-                "search_query": query,
+                "success": False,
+                "error": f"{label} search not started: {str(e)}",
+                "patents": [],
+                "count": 0,
+                "retry_after": e.retry_after,
+            }
+        except asyncio.TimeoutError:
+            print(f"{label} search timed out after {timeout}s")
+            SEARCHES.inc(backend=self.backend.name, outcome="timeout")
+            return {
+                "success": False,
+                "error": f"{label} search timed out after {timeout} seconds",
+                "patents": [],
+                "count": 0,
             }
-
         except Exception as e:
-            print(f"Error searching BigQuery patents: {str(e)}")
+            print(f"Error searching {label} patents: {str(e)}")
+            SEARCHES.inc(backend=self.backend.name, outcome="error")
             return {
                 "success": False,
-                "error": f"BigQuery search error: {str(e)}",
+                "error": f"{label} search error: {str(e)}",
                 "patents": [],
                 "count": 0,
             }
 
+        results = {
+            "success": True,
+            "count": len(found["patents"]),
+            "patents": found["patents"],
+            "search_query": found["search_query"],
+        }
+        SEARCHES.inc(backend=self.backend.name, outcome="success")
+        if self.cache is not None:
+            with metrics.span("search.cache_store"):
+                await self._cache_set(search_key, normalized_query, results)
+
+        return {**results, "cached": False}
+
+    async def _cache_get(self, key: str) -> Optional[Dict]:
+        """Cached result for ``key``; a cache that fails (e.g. a locked database) reads as a miss"""
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, self.cache.get, key)
+        except Exception as e:
+            print(f"Search cache read failed: {str(e)}")
+            SEARCH_CACHE_ERRORS.inc(operation="get")
+            return None
+
+    async def _cache_set(self, key: str, normalized_query: Dict, results: Dict):
+        """Cache a result; a failed write is logged and skipped, never failing the search"""
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, self.cache.set, key, normalized_query, results)
+        except Exception as e:
+            print(f"Search cache write failed: {str(e)}")
+            SEARCH_CACHE_ERRORS.inc(operation="set")
+
+    async def stream_patents(self, keywords: List[str], jurisdiction: str = 'US', limit: int = 25,
+                             page_size: Optional[int] = None, timeout: Optional[float] = None,
+                             use_cache: bool = True) -> AsyncIterator[List[Dict]]:
+        """
+        Search results as pages of patents, yielded as the backend delivers
+        them. ``timeout`` bounds the wait for each page. A cached result is
+        replayed in pages; streamed results are not cached, because that would
+        mean buffering all of them.
+        """
+        timeout = self.search_timeout if timeout is None else timeout
+        page_size = page_size or DEFAULT_STREAM_PAGE_SIZE
+        filing_date_threshold = filing_date_threshold_bucket()
+        normalized_query = normalize_query(keywords, jurisdiction, limit, filing_date_threshold)
+
+        if self.cache is not None and use_cache:
+            search_key = make_cache_key({**normalized_query, "backend": self.backend.name})
+            cached = await self._cache_get(search_key)
+            if cached is not None:
+                patents = cached["patents"]
+                for start in range(0, len(patents), page_size):
+                    yield patents[start:start + page_size]
+                return
+
+        # The slot is held until the last page is read; AdmissionRejected
+        # propagates to the caller before any page is yielded
+        async with self.admission.slot():
+            pages = self.backend.search_pages(
+                keywords=normalized_query["keywords"],
+                jurisdiction=normalized_query["jurisdiction"],
+                limit=limit,
+                filing_date_threshold=filing_date_threshold,
+                page_size=page_size
+            )
+            try:
+                while True:
+                    try:
+                        page = await asyncio.wait_for(pages.__anext__(), timeout=timeout)
+                    except StopAsyncIteration:
+                        break
+                    yield page
+            finally:
+                await pages.aclose()
+
+    async def estimate_search(self, keywords: List[str], jurisdiction: str = 'US', limit: int = 25) -> Dict:
+        """Dry-run a search: estimated bytes processed and whether it fits under the byte cap"""
+        normalized_query = normalize_query(keywords, jurisdiction, limit, filing_date_threshold_bucket())
+        return await self.backend.dry_run(
+            keywords=normalized_query["keywords"],
+            jurisdiction=normalized_query["jurisdiction"],
+            limit=limit,
+            filing_date_threshold=normalized_query["filing_date_threshold"]
+        )
+
+    async def search_patents_batch(self, inputs: List[Dict], jurisdiction: str = 'US', limit: int = 25, timeout: Optional[float] = None) -> Dict[str, Dict]:
+        """
+        Search many keyword sets in one jurisdiction with a single backend call.
+
+        ``inputs`` are ``{"tag": str, "keywords": [...], "use_cache": bool,
+        "published_after": int}`` (the last two optional); the result maps
+        each tag to a ``search_patents``-shaped result. Cached inputs
+        are answered from the cache and only the rest reach the backend. On
+        timeout or error every uncached input gets the same error result.
+        """
+        timeout = self.search_timeout if timeout is None else timeout
+        filing_date_threshold = filing_date_threshold_bucket()
+
+        results = {}
+        pending = []
+        for item in inputs:
+            normalized_query = normalize_query(
+                item["keywords"], jurisdiction, limit, filing_date_threshold, item.get("published_after")
+            )
+            cache_key = None
+            if self.cache is not None:
+                cache_key = make_cache_key({**normalized_query, "backend": self.backend.name})
+                if item.get("use_cache", True):
+                    cached = await self._cache_get(cache_key)
+                    if cached is not None:
+                        results[item["tag"]] = {**cached, "cached": True}
+                        continue
+            pending.append((item["tag"], normalized_query, cache_key))
+
+        if not pending:
+            return results
+
+        label = self.backend.label
+        retry_after = None
+        try:
+            # One batched job takes one slot
+            async with self.admission.slot():
+                found = await asyncio.wait_for(
+                    self.backend.search_batch(
+                        queries=[
+                            {"tag": tag, "keywords": q["keywords"], "published_after": q.get("published_after")}
+                            for tag, q, _ in pending
+                        ],
+                        jurisdiction=jurisdiction.upper(),
+                        limit=limit,
+                        filing_date_threshold=filing_date_threshold
+                    ),
+                    timeout=timeout
+                )
+        except AdmissionRejected as e:
+            print(f"{label} batch search rejected: {str(e)}")
+            error = f"{label} search not started: {str(e)}"
+            retry_after = e.retry_after
+            found = None
+        except asyncio.TimeoutError:
+            print(f"{label} batch search timed out after {timeout}s")
+            error = f"{label} search timed out after {timeout} seconds"
+            found = None
+        except Exception as e:
+            print(f"Error in {label} batch search: {str(e)}")
+            error = f"{label} search error: {str(e)}"
+            found = None
+
+        for tag, normalized_query, cache_key in pending:
+            if found is None:
+                results[tag] = {"success": False, "error": error, "patents": [], "count": 0}
+                if retry_after is not None:
+                    results[tag]["retry_after"] = retry_after
+                continue
+            result = {
+                "success": True,
+                "count": len(found[tag]["patents"]),
+                "patents": found[tag]["patents"],
+                "search_query": found[tag]["search_query"],
+            }
+            if cache_key is not None:
+                await self._cache_set(cache_key, normalized_query, result)
+            results[tag] = {**result, "cached": False}
+
+        return results
+
 # Test code (if you have a separate test file, update that instead)
 async def test_bigquery_patent_search():
     print("Testing BigQuery patent search...")
-    service = PatentSearchService()
+    service = PatentSearchService(backend=BigQuerySearchBackend())
 
     # Example search
     keywords = ["CRISPR", "gene editing"]
@@ -0,0 +1,219 @@
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from database import Patent, AnalysisPatent, ResearchAnalysis
+from patent_record import PatentRecord, parse_day
+
+# SQLite caps bound parameters per statement; stay well below it
+UPSERT_CHUNK_SIZE = 500
+
+# Numbers that stand for "none yet", as unpublished applications had in old searches
+MISSING_NUMBERS = frozenset(("", "N/A"))
+
+# Storage key prefix for hits that only have an application number
+APPLICATION_KEY_PREFIX = "application:"
+
+
+def storage_number(patent: Dict) -> Optional[str]:
+    """
+    The key a hit is stored under: its publication number, else its
+    application number with APPLICATION_KEY_PREFIX, else None (not stored)
+    """
+    number = str(patent.get("patent_number") or "").strip()
+    if number not in MISSING_NUMBERS:
+        return number
+    application = str(patent.get("application_number") or "").strip()
+    if application not in MISSING_NUMBERS:
+        return APPLICATION_KEY_PREFIX + application
+    return None
+
+
+def _patent_row(number: str, patent: Dict, now: datetime) -> Dict:
+    return {
+        "publication_number": number,
+        "title": patent.get("title"),
+        "abstract": patent.get("abstract"),
+        "publication_date": patent.get("publication_date"),
+        "grant_date": patent.get("grant_date"),
+        "filing_date": patent.get("filing_date"),
+        "jurisdiction": patent.get("jurisdiction"),
+        "status": patent.get("status"),
+        "family_id": patent.get("family_id"),
+        "applicants": patent.get("applicants") or [],
+        "inventors": patent.get("inventors") or [],
+        "classifications": patent.get("classifications") or [],
+        "updated_at": now,
+    }
+
+
+def upsert_patents(db: Session, patents: List[Dict]):
+    """Insert new patents and refresh known ones, keyed by storage_number"""
+    now = datetime.utcnow()
+    rows = {}
+    for patent in patents:
+        number = storage_number(patent)
+        if number:
+            rows[number] = _patent_row(number, patent, now)
+    rows = list(rows.values())
+
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        statement = insert(Patent).values(rows[start:start + UPSERT_CHUNK_SIZE])
+        statement = statement.on_conflict_do_update(
+            index_elements=[Patent.publication_number],
+            set_={
+                column: statement.excluded[column]
+                for column in rows[0] if column != "publication_number"
+            }
+        )
+        db.execute(statement)
+
+
+def save_analysis_patents(db: Session, analysis_id: str, patents: List[Dict],
+                          search_backend: Optional[str] = None, search_jurisdiction: Optional[str] = None):
+    """
+    Store an analysis' search hits, replacing earlier ones (caller commits).
+    Without ``search_jurisdiction`` each hit is tagged with its own jurisdiction.
+    """
+    upsert_patents(db, patents)
+    db.query(AnalysisPatent).filter(
+        AnalysisPatent.analysis_id == analysis_id
+    ).delete(synchronize_session=False)
+
+    now = datetime.utcnow()
+    seen = set()
+    links = []
+    for rank, patent in enumerate(patents):
+        number = storage_number(patent)
+        if not number or number in seen:
+            continue
+        seen.add(number)
+        links.append({
+            "analysis_id": analysis_id,
+            "publication_number": number,
+            "rank": rank,
+            "search_backend": search_backend,
+            "search_jurisdiction": search_jurisdiction or patent.get("jurisdiction"),
+            "found_at": now,
+        })
+    if links:
+        db.execute(insert(AnalysisPatent), links)
+
+
+def merge_analysis_patents(db: Session, analysis_id: str, patents: List[Dict],
+                           search_backend: Optional[str] = None, search_jurisdiction: Optional[str] = None) -> List[Dict]:
+    """
+    Add newly found patents to an analysis' stored hits without touching the
+    ones it already has. New hits are newer publications, so they go first
+    and the existing ranks shift down. Returns the patents that were new
+    (caller commits).
+    """
+    known = {
+        number for (number,) in db.query(AnalysisPatent.publication_number)
+        .filter(AnalysisPatent.analysis_id == analysis_id)
+    }
+    new_patents = []
+    for patent in patents:
+        number = storage_number(patent)
+        if number and number not in known:
+            known.add(number)
+            new_patents.append(patent)
+    if not new_patents:
+        return []
+
+    upsert_patents(db, new_patents)
+    db.query(AnalysisPatent).filter(
+        AnalysisPatent.analysis_id == analysis_id
+    ).update({AnalysisPatent.rank: AnalysisPatent.rank + len(new_patents)}, synchronize_session=False)
+
+    now = datetime.utcnow()
+    db.execute(insert(AnalysisPatent), [
+        {
+            "analysis_id": analysis_id,
+            "publication_number": storage_number(patent),
+            "rank": rank,
+            "search_backend": search_backend,
+            "search_jurisdiction": search_jurisdiction,
+            "found_at": now,
+        }
+        for rank, patent in enumerate(new_patents)
+    ])
+    return new_patents
+
+
+def load_analysis_patents(db: Session, analysis_id: str, limit: Optional[int] = None) -> List[Dict]:
+    """An analysis' patents in search-rank order"""
+    query = (
+        db.query(Patent)
+        .join(AnalysisPatent, AnalysisPatent.publication_number == Patent.publication_number)
+        .filter(AnalysisPatent.analysis_id == analysis_id)
+        .order_by(AnalysisPatent.rank)
+    )
+    if limit is not None:
+        query = query.limit(limit)
+    return [patent.to_dict() for patent in query]
+
+
+def load_analysis_patent_records(db: Session, analysis_id: str) -> List[PatentRecord]:
+    """An analysis' patents in search-rank order as PatentRecords, for scoring"""
+    rows = (
+        db.query(
+            Patent.publication_number, Patent.title, Patent.abstract,
+            Patent.publication_date, Patent.grant_date, Patent.filing_date,
+            Patent.applicants, Patent.inventors, Patent.classifications,
+            Patent.jurisdiction, Patent.status, Patent.family_id
+        )
+        .join(AnalysisPatent, AnalysisPatent.publication_number == Patent.publication_number)
+        .filter(AnalysisPatent.analysis_id == analysis_id)
+        .order_by(AnalysisPatent.rank)
+    )
+    # Plain column rows skip the ORM identity map, which would hold every Patent
+    return [
+        PatentRecord(
+            patent_number=row.publication_number,
+            title=row.title,
+            abstract=row.abstract,
+            publication_day=parse_day(row.publication_date),
+            grant_day=parse_day(row.grant_date),
+            filing_day=parse_day(row.filing_date),
+            applicants=row.applicants,
+            inventors=row.inventors,
+            classifications=row.classifications,
+            jurisdiction=row.jurisdiction,
+            status=row.status,
+            family_id=row.family_id,
+        )
+        for row in rows
+    ]
+
+
+def iter_patent_texts(db: Session, batch_size: int = 1000) -> Iterator[str]:
+    """Title and abstract of every stored patent, read in batches"""
+    rows = db.query(Patent.title, Patent.abstract).execution_options(yield_per=batch_size)
+    for title, abstract in rows:
+        yield f"{title or ''} {abstract or ''}"
+
+
+def analyses_for_patent(db: Session, publication_number: str) -> List[Dict]:
+    """Every analysis whose search found ``publication_number``"""
+    rows = (
+        db.query(
+            ResearchAnalysis.analysis_id, ResearchAnalysis.title, ResearchAnalysis.created_at,
+            AnalysisPatent.rank, AnalysisPatent.found_at
+        )
+        .join(AnalysisPatent, AnalysisPatent.analysis_id == ResearchAnalysis.analysis_id)
+        .filter(AnalysisPatent.publication_number == publication_number)
+        .order_by(ResearchAnalysis.created_at.desc())
+    )
+    return [
+        {
+            "analysis_id": row.analysis_id,
+            "title": row.title,
+            "created_at": row.created_at.isoformat() if row.created_at else None,
+            "rank": row.rank,
+            "found_at": row.found_at.isoformat() if row.found_at else None,
+        }
+        for row in rows
+    ]
@@ -0,0 +1,189 @@
+"""
+SQL for patent searches against the Google Patents Public Dataset.
+
+Keywords never reach the SQL text: each search folds its keywords into one
+case-insensitive RE2 alternation that is passed as a query parameter, so
+title and abstract are each matched in a single REGEXP_CONTAINS pass however
+many keywords there are. Only the columns the API and risk scorer use are
+selected, which keeps the bytes BigQuery bills for down.
+"""
+from typing import Dict, List, Optional
+
+DEFAULT_DATASET = "patents-public-data.patents"
+
+# Characters with a meaning in RE2 syntax; everything else matches literally
+RE2_SPECIAL_CHARACTERS = frozenset("\\.+*?()|[]{}^$")
+
+SELECT_COLUMNS = """
+    p.publication_number,
+    p.family_id,
+    (SELECT text FROM UNNEST(p.title_localized) WHERE language = 'en' LIMIT 1) AS title,
+    (SELECT text FROM UNNEST(p.abstract_localized) WHERE language = 'en' LIMIT 1) AS abstract,
+    p.publication_date,
+    p.filing_date,
+    p.grant_date,
+    p.country_code,
+    (SELECT ARRAY_AGG(c.code) FROM UNNEST(p.cpc) AS c) AS cpc_codes,
+    (SELECT ARRAY_AGG(a.name) FROM UNNEST(p.assignee_harmonized) AS a) AS assignees"""
+
+ACTIVE_PATENT_FILTER = """
+    p.country_code = @jurisdiction
+    AND p.grant_date > 0 -- It must be a granted patent
+    AND p.filing_date >= @filing_date_threshold -- Filed in the last 20 years"""
+
+
+def re2_escape(term: str) -> str:
+    """Escape RE2 metacharacters in ``term`` (re.escape also escapes spaces, which RE2 rejects)"""
+    return "".join("\\" + ch if ch in RE2_SPECIAL_CHARACTERS else ch for ch in term)
+
+
+def keyword_pattern(keywords: List[str]) -> str:
+    """
+    Case-insensitive RE2 pattern matching any of ``keywords`` as a substring,
+    the same matches as ``LOWER(text) LIKE '%keyword%'`` for each keyword.
+    """
+    terms = sorted({k.strip().lower() for k in keywords if k and k.strip()})
+    if not terms:
+        # Matches nothing, like a search without keywords
+        return "(?i)[^\\s\\S]"
+    return "(?i)(?:" + "|".join(re2_escape(term) for term in terms) + ")"
+
+
+def _keyword_match(pattern: str) -> str:
+    return f"""(
+        EXISTS(SELECT 1 FROM UNNEST(p.title_localized) AS tl WHERE tl.language = 'en' AND REGEXP_CONTAINS(tl.text, {pattern}))
+        OR EXISTS(SELECT 1 FROM UNNEST(p.abstract_localized) AS al WHERE al.language = 'en' AND REGEXP_CONTAINS(al.text, {pattern}))
+    )"""
+
+
+class PatentQuery:
+    """
+    A parameterized query: ``sql`` plus ``parameters`` as
+    ``{"name", "type", "value"}`` dicts. ``type`` is a BigQuery scalar type,
+    ``ARRAY<type>``, or ``ARRAY<STRUCT<name type, ...>>`` with a list of
+    dicts as value.
+    """
+
+    def __init__(self, sql: str, parameters: List[Dict]):
+        self.sql = sql
+        self.parameters = parameters
+
+    def query_parameters(self) -> List:
+        """``parameters`` as google-cloud-bigquery query parameter objects"""
+        from google.cloud import bigquery
+
+        converted = []
+        for parameter in self.parameters:
+            name, type_, value = parameter["name"], parameter["type"], parameter["value"]
+            if type_.startswith("ARRAY<STRUCT<"):
+                fields = [field.split() for field in type_[len("ARRAY<STRUCT<"):-2].split(",")]
+                converted.append(bigquery.ArrayQueryParameter(name, "STRUCT", [
+                    bigquery.StructQueryParameter(
+                        None, *(bigquery.ScalarQueryParameter(field, field_type, item[field]) for field, field_type in fields)
+                    )
+                    for item in value
+                ]))
+            elif type_.startswith("ARRAY<"):
+                converted.append(bigquery.ArrayQueryParameter(name, type_[len("ARRAY<"):-1], value))
+            else:
+                converted.append(bigquery.ScalarQueryParameter(name, type_, value))
+        return converted
+
+    def job_config(self, maximum_bytes_billed: Optional[int] = None, dry_run: bool = False):
+        """
+        QueryJobConfig for this query. BigQuery fails a job that would bill more
+        than ``maximum_bytes_billed`` instead of running it; a dry run only
+        reports ``total_bytes_processed``.
+        """
+        from google.cloud import bigquery
+
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=self.query_parameters(),
+            dry_run=dry_run,
+            use_query_cache=not dry_run
+        )
+        if maximum_bytes_billed:
+            job_config.maximum_bytes_billed = maximum_bytes_billed
+        return job_config
+
+
+class PatentQueryBuilder:
+    """Builds the search and batch-search queries for one dataset"""
+
+    def __init__(self, dataset_id: str = DEFAULT_DATASET):
+        self.dataset_id = dataset_id
+
+    def _common_parameters(self, jurisdiction: str, limit: int, filing_date_threshold: int) -> List[Dict]:
+        return [
+            {"name": "jurisdiction", "type": "STRING", "value": jurisdiction.upper()},
+            {"name": "filing_date_threshold", "type": "INT64", "value": filing_date_threshold},
+            {"name": "limit", "type": "INT64", "value": limit},
+        ]
+
+    def search(self, keywords: List[str], jurisdiction: str, limit: int, filing_date_threshold: int,
+               published_after: Optional[int] = None) -> PatentQuery:
+        """
+        Newest ``limit`` active patents in ``jurisdiction`` matching any keyword.
+        With ``published_after`` (YYYYMMDD) only later publications match and the
+        oldest ``limit`` of them are taken, so a watermark can page forward
+        without skipping any.
+        """
+        published_filter = "\n    AND p.publication_date > @published_after" if published_after else ""
+        direction = "ASC" if published_after else "DESC"
+        sql = f"""
+SELECT{SELECT_COLUMNS}
+FROM
+    `{self.dataset_id}.publications` AS p
+WHERE{ACTIVE_PATENT_FILTER}{published_filter}
+    AND {_keyword_match("@keyword_pattern")}
+ORDER BY
+    p.publication_date {direction}
+LIMIT @limit
+""".lstrip("\n")
+        parameters = [
+            {"name": "keyword_pattern", "type": "STRING", "value": keyword_pattern(keywords)},
+            *self._common_parameters(jurisdiction, limit, filing_date_threshold),
+        ]
+        if published_after:
+            parameters.append({"name": "published_after", "type": "INT64", "value": published_after})
+        return PatentQuery(sql, parameters)
+
+    def search_batch(self, queries: List[Dict], jurisdiction: str, limit: int, filing_date_threshold: int) -> PatentQuery:
+        """
+        All ``{"tag", "keywords", "published_after"}`` searches in one scan:
+        each input's pattern and publication-date watermark ride in an
+        ARRAY<STRUCT<tag, pattern, published_after>> parameter cross joined
+        with the publications, and ROW_NUMBER keeps the newest ``limit`` per tag,
+        or the oldest ``limit`` after the watermark for tags that have one.
+        """
+        sql = f"""
+SELECT
+    input.tag,{SELECT_COLUMNS}
+FROM
+    `{self.dataset_id}.publications` AS p
+    CROSS JOIN UNNEST(@inputs) AS input
+WHERE{ACTIVE_PATENT_FILTER}
+    AND p.publication_date > input.published_after
+    AND {_keyword_match("input.pattern")}
+QUALIFY
+    ROW_NUMBER() OVER (
+        PARTITION BY input.tag
+        ORDER BY IF(input.published_after > 0, p.publication_date, -p.publication_date)
+    ) <= @limit
+""".lstrip("\n")
+        parameters = [
+            {
+                "name": "inputs",
+                "type": "ARRAY<STRUCT<tag STRING, pattern STRING, published_after INT64>>",
+                "value": [
+                    {
+                        "tag": q["tag"],
+                        "pattern": keyword_pattern(q["keywords"]),
+                        "published_after": q.get("published_after") or 0,
+                    }
+                    for q in queries
+                ],
+            },
+            *self._common_parameters(jurisdiction, limit, filing_date_threshold),
+        ]
+        return PatentQuery(sql, parameters)
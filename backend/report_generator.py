@@ -2,11 +2,16 @@ from typing import Dict, List
 from datetime import datetime
 import json
 
+import metrics
+
 class ReportGenerator:
     """
     Generates structured FTO reports from risk assessment data
     """
     
+    REPORT_VERSION = "1.0"
+    
+    @metrics.timed("report.generate")
     def generate_report(self, research_data: Dict, risk_assessment: Dict) -> Dict:
         """
         Create a comprehensive FTO report
@@ -14,7 +19,7 @@ class ReportGenerator:
         report = {
             "report_metadata": {
                 "generated_date": datetime.now().isoformat(),
-                "report_version": "1.0",
+                "report_version": self.REPORT_VERSION,
                 "analysis_id": research_data.get('analysis_id'),
                 "report_type": "Freedom to Operate Analysis"
             },
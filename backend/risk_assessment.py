@@ -1,86 +1,207 @@
-from typing import List, Dict, Any
-from datetime import datetime, timedelta
-import re
+from typing import AsyncIterable, Iterable, List, Dict, Any, Optional, Sequence, Union
+from datetime import date, datetime, timedelta
+import hashlib
+import heapq
+import json
+
+from cpc_taxonomy import CPCTaxonomy, load_default_taxonomy
+from keyword_matcher import KeywordMatcher
+from patent_record import PatentRecord, as_record, as_records, format_day
+from text_similarity import IdfTable, TextSimilarity, load_default_idf_table, patent_text, research_text
+import metrics
+
+# Bump when scoring logic changes in a way the parameters below don't capture
+# (2: recency read from day numbers, so BigQuery's YYYYMMDD dates now count;
+# 3: text similarity factor)
+SCORING_MODEL_REVISION = 3
 
 class RiskAssessmentService:
     """
     Analyzes patent data to assess freedom-to-operate risks
     """
     
-    def __init__(self):
+    def __init__(self, taxonomy: Optional[CPCTaxonomy] = None, idf_table: Optional[IdfTable] = None):
+        # Field of study -> weighted CPC prefixes
+        self.taxonomy = taxonomy or load_default_taxonomy()
+        # Term document frequencies over stored patents, for text similarity
+        self.idf_table = idf_table or load_default_idf_table()
+        
         # Risk thresholds
         self.HIGH_RISK_THRESHOLD = 0.7
         self.MEDIUM_RISK_THRESHOLD = 0.4
         
         # Weights for different factors
-        self.KEYWORD_WEIGHT = 0.4
+        self.KEYWORD_WEIGHT = 0.3
+        self.SIMILARITY_WEIGHT = 0.1
         self.CLASSIFICATION_WEIGHT = 0.3
         self.RECENCY_WEIGHT = 0.2
         self.APPLICANT_TYPE_WEIGHT = 0.1
+        
+        # Credit per keyword found in the title vs. only in the abstract
+        self.TITLE_MATCH_WEIGHT = 1.0
+        self.ABSTRACT_MATCH_WEIGHT = 0.5
+        
+        # Recency score by patent age: (younger than this many years, score), then older, unknown
+        self.RECENCY_BANDS = ((5, 1.0), (10, 0.7), (15, 0.4))
+        self.RECENCY_OLDEST_SCORE = 0.2
+        self.RECENCY_UNKNOWN_SCORE = 0.5
+        
+        # Result sets at least this large are scored column-wise. The gain is
+        # small (about 1.2x, see benchmarks.bench_scoring) since keyword and
+        # text work still runs per patent; smaller sets don't repay the NumPy import
+        self.BATCH_SCORING_MIN_PATENTS = 1000
+        self._batch_scorer = None
+    
+    @property
+    def batch_scorer(self):
+        """Vectorized scorer, built on first use so NumPy is only imported when needed"""
+        if self._batch_scorer is None:
+            from batch_scoring import BatchRiskScorer
+            self._batch_scorer = BatchRiskScorer(self)
+        return self._batch_scorer
+    
+    @property
+    def model_version(self) -> str:
+        """
+        Identifies the scoring model (weights, thresholds, taxonomy, IDF table); stored
+        assessments computed under a different version are stale
+        """
+        params = {
+            "revision": SCORING_MODEL_REVISION,
+            "thresholds": [self.HIGH_RISK_THRESHOLD, self.MEDIUM_RISK_THRESHOLD],
+            "weights": [
+                self.KEYWORD_WEIGHT, self.CLASSIFICATION_WEIGHT,
+                self.RECENCY_WEIGHT, self.APPLICANT_TYPE_WEIGHT,
+                self.SIMILARITY_WEIGHT
+            ],
+            "keyword_match_weights": [self.TITLE_MATCH_WEIGHT, self.ABSTRACT_MATCH_WEIGHT],
+            "taxonomy": self.taxonomy.fingerprint,
+            "idf_table": self.idf_table.fingerprint,
+        }
+        digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+        return f"r{SCORING_MODEL_REVISION}-{digest[:12]}"
     
-    def assess_patents(self, research_data: Dict, patents: List[Dict]) -> Dict:
+    @metrics.timed("risk.assess")
+    def assess_patents(self, research_data: Dict, patents: Iterable[Union[Dict, PatentRecord]],
+                       batch: Optional[bool] = None) -> Dict:
         """
-        Main assessment function that analyzes all patents
+        Main assessment function that analyzes all patents, given as PatentRecords
+        or API-shape dicts.
+        A list is scored in one go: ``batch`` forces (True) or disables (False)
+        vectorized scoring; by default it is used for lists of
+        BATCH_SCORING_MIN_PATENTS or more. Any other iterable (e.g. a generator
+        over database rows) is consumed one patent at a time, keeping only the
+        top patents and running counts, so memory stays constant however many
+        patents it yields. Async iterables go to ``assess_patents_async``.
         """
+        if not isinstance(patents, Sequence):
+            return self._assess_stream(research_data, patents)
         if not patents:
             return self._create_low_risk_report(research_data)
         
-        # Analyze each patent
-        analyzed_patents = []
-        for patent in patents:
-            analysis = self._analyze_single_patent(research_data, patent)
-            analyzed_patents.append(analysis)
-        
-        # Sort by risk score
-        analyzed_patents.sort(key=lambda x: x['risk_score'], reverse=True)
+        if batch is None:
+            batch = len(patents) >= self.BATCH_SCORING_MIN_PATENTS
+        if not batch:
+            return self._assess_stream(research_data, patents)
         
+        # Score every patent as arrays, build dicts only for the top 10
+        patents = as_records(patents)
+        matcher = KeywordMatcher(research_data.get('keywords', []))
+        similarity = self.text_similarity(research_data)
+        columns = self.batch_scorer.score(research_data, patents, matcher, similarity)
+        order = self.batch_scorer.rank(columns)
+        analyzed_patents = self.batch_scorer.analyze(
+            research_data, patents, columns, order[:StreamingRiskAssessment.TOP_PATENTS]
+        )
+        high_risk_count = int((columns["risk_level"] == 2).sum())
+        return self._assessment(len(patents), high_risk_count, analyzed_patents)
+    
+    async def assess_patents_async(self, research_data: Dict,
+                                   patents: AsyncIterable[Union[Dict, PatentRecord]]) -> Dict:
+        """``assess_patents`` over an async iterable, one patent at a time"""
+        assessment = self.stream_assessment(research_data)
+        async for patent in patents:
+            assessment.add(patent)
+        return assessment.result()
+    
+    def _assess_stream(self, research_data: Dict, patents: Iterable[Union[Dict, PatentRecord]]) -> Dict:
+        assessment = self.stream_assessment(research_data)
+        for patent in patents:
+            assessment.add(patent)
+        return assessment.result()
+    
+    def _assessment(self, total: int, high_risk_count: int, top_patents: List[Dict]) -> Dict:
+        """Assessment of ``total`` patents from the highest-ranked ones, best first"""
         # Calculate overall risk
-        overall_risk = self._calculate_overall_risk(analyzed_patents)
+        overall_risk = self._calculate_overall_risk(top_patents, high_risk_count)
         
         # Generate recommendations
-        recommendations = self._generate_recommendations(overall_risk, analyzed_patents)
+        recommendations = self._generate_recommendations(overall_risk, top_patents)
         
         return {
             "overall_risk_level": overall_risk['level'],
             "overall_risk_score": overall_risk['score'],
             "risk_factors": overall_risk['factors'],
-            "total_patents_analyzed": len(patents),
-            "high_risk_patents": len([p for p in analyzed_patents if p['risk_level'] == 'HIGH']),
-            "analyzed_patents": analyzed_patents[:10],  # Top 10 most relevant
+            "total_patents_analyzed": total,
+            "high_risk_patents": high_risk_count,
+            "analyzed_patents": top_patents[:StreamingRiskAssessment.TOP_PATENTS],  # Top 10 most relevant
             "recommendations": recommendations,
             "assessment_date": datetime.now().isoformat()
         }
     
-    def _analyze_single_patent(self, research_data: Dict, patent: Dict) -> Dict:
+    def stream_assessment(self, research_data: Dict, previous: Optional[Dict] = None) -> "StreamingRiskAssessment":
+        """
+        Assessment that takes patents one at a time, e.g. while search results
+        stream in. Passing an earlier ``assess_patents`` result continues from
+        it, so only patents found since then need scoring; those rank ahead of
+        the earlier ones on ties, as if they had been stored first.
+        """
+        assessment = StreamingRiskAssessment(self, research_data)
+        if previous:
+            assessment.total = previous.get('total_patents_analyzed', 0)
+            assessment.high_risk_count = previous.get('high_risk_patents', 0)
+            for analysis in previous.get('analyzed_patents', [])[:StreamingRiskAssessment.TOP_PATENTS]:
+                assessment._keep(analysis, carried=True)
+        return assessment
+    
+    def text_similarity(self, research_data: Dict) -> TextSimilarity:
+        """Similarity of patent texts to the research's title, description and keywords"""
+        return TextSimilarity(research_text(research_data), self.idf_table)
+    
+    def _analyze_single_patent(self, research_data: Dict, patent: Union[Dict, PatentRecord],
+                               matcher: Optional[KeywordMatcher] = None, today: Optional[int] = None,
+                               similarity: Optional[TextSimilarity] = None) -> Dict:
         """
         Analyze a single patent for FTO risk
         """
-        # Extract research keywords
-        research_keywords = [kw.lower() for kw in research_data.get('keywords', [])]
+        patent = as_record(patent)
+        if matcher is None:
+            matcher = KeywordMatcher(research_data.get('keywords', []))
+        if similarity is None:
+            similarity = self.text_similarity(research_data)
         research_field = research_data.get('field_of_study', '').lower()
         
         # Calculate individual risk factors
-        keyword_score = self._calculate_keyword_overlap(
-            research_keywords, 
-            patent.get('title', '').lower()
-        )
+        title_hits = matcher.find(patent.title or '')
+        abstract_hits = matcher.find(patent.abstract or '')
+        keyword_score = self._calculate_keyword_overlap(matcher, title_hits, abstract_hits)
+        similarity_score = similarity.score(patent_text(patent))
         
         classification_score = self._calculate_classification_relevance(
             research_field,
-            patent.get('classifications', [])
+            patent.classifications
         )
         
-        recency_score = self._calculate_recency_score(
-            patent.get('grant_date', '')
-        )
+        recency_score = self._calculate_recency_score(patent.grant_day, today)
         
         applicant_score = self._calculate_applicant_type_score(
-            patent.get('applicants', [])
+            patent.applicants
         )
         
         # Calculate weighted risk score
         risk_score = (
             keyword_score * self.KEYWORD_WEIGHT +
+            similarity_score * self.SIMILARITY_WEIGHT +
             classification_score * self.CLASSIFICATION_WEIGHT +
             recency_score * self.RECENCY_WEIGHT +
             applicant_score * self.APPLICANT_TYPE_WEIGHT
@@ -95,83 +216,65 @@ class RiskAssessmentService:
             risk_level = "LOW"
         
         return {
-            "patent_number": patent.get('patent_number', 'N/A'),
-            "title": patent.get('title', 'No title'),
+            "patent_number": patent.patent_number or 'N/A',
+            "title": patent.title or 'No title',
             "risk_score": round(risk_score, 3),
             "risk_level": risk_level,
             "risk_factors": {
                 "keyword_overlap": round(keyword_score, 3),
+                "text_similarity": round(similarity_score, 3),
                 "classification_match": round(classification_score, 3),
                 "recency": round(recency_score, 3),
                 "applicant_type": round(applicant_score, 3)
             },
-            "grant_date": patent.get('grant_date', 'N/A'),
-            "applicants": patent.get('applicants', []),
+            "matched_keywords": self._matched_keywords(title_hits, abstract_hits),
+            "grant_date": format_day(patent.grant_day),
+            "applicants": list(patent.applicants),
             "relevance_explanation": self._generate_relevance_explanation(
                 risk_level, keyword_score, classification_score
             )
         }
     
-    def _calculate_keyword_overlap(self, research_keywords: List[str], patent_title: str) -> float:
+    def _calculate_keyword_overlap(self, matcher: KeywordMatcher, title_hits, abstract_hits) -> float:
         """
-        Calculate how many research keywords appear in patent title
+        Share of research keywords found in the patent, with full credit for title
+        hits and ABSTRACT_MATCH_WEIGHT credit for keywords found only in the abstract
         """
-        if not research_keywords or not patent_title:
+        if not len(matcher):
             return 0.0
         
-        matches = 0
-        for keyword in research_keywords:
-            # Use word boundaries for more accurate matching
-            if re.search(r'\b' + re.escape(keyword) + r'\b', patent_title):
-                matches += 1
+        title_matches = matcher.count(title_hits)
+        abstract_matches = matcher.count(abstract_hits - title_hits)
         
-        return matches / len(research_keywords)
+        return (
+            title_matches * self.TITLE_MATCH_WEIGHT +
+            abstract_matches * self.ABSTRACT_MATCH_WEIGHT
+        ) / len(matcher)
+    
+    def _matched_keywords(self, title_hits, abstract_hits) -> Dict:
+        return {"title": sorted(title_hits), "abstract": sorted(abstract_hits)}
     
     def _calculate_classification_relevance(self, research_field: str, classifications: List[str]) -> float:
         """
         Check if patent classifications match research field
         """
-        # Map research fields to relevant CPC classifications
-        field_mappings = {
-            'biotechnology': ['C12', 'C07K', 'A61K', 'C07H'],
-            'software': ['G06F', 'G06N', 'H04L', 'G06Q'],
-            'mechanical': ['F16', 'B25', 'F01', 'F02'],
-            'electrical': ['H01', 'H02', 'H03', 'H04'],
-            'chemical': ['C07', 'C08', 'C09', 'C01'],
-            'medical': ['A61', 'A62B', 'G16H']
-        }
-        
-        relevant_codes = field_mappings.get(research_field, [])
-        if not relevant_codes or not classifications:
-            return 0.3  # Default medium relevance if can't determine
-        
-        matches = 0
-        for classification in classifications[:5]:  # Check top 5
-            for code in relevant_codes:
-                if classification.startswith(code):
-                    matches += 1
-                    break
-        
-        return min(matches / 3.0, 1.0)  # Cap at 1.0
+        return self.taxonomy.relevance(research_field, classifications)
     
-    def _calculate_recency_score(self, grant_date: str) -> float:
+    def _calculate_recency_score(self, grant_day: Optional[int], today: Optional[int] = None) -> float:
         """
-        More recent patents pose higher risk
+        More recent patents pose higher risk. ``grant_day`` and ``today`` are
+        day numbers (see patent_record.parse_day)
         """
-        try:
-            patent_date = datetime.strptime(grant_date, '%Y-%m-%d')
-            years_old = (datetime.now() - patent_date).days / 365.25
-            
-            if years_old < 5:
-                return 1.0  # Very recent
-            elif years_old < 10:
-                return 0.7
-            elif years_old < 15:
-                return 0.4
-            else:
-                return 0.2  # Older patents less risky
-        except:
-            return 0.5  # Default if can't parse date
+        if grant_day is None:
+            return self.RECENCY_UNKNOWN_SCORE
+        if today is None:
+            today = date.today().toordinal()
+        years_old = (today - grant_day) / 365.25
+        
+        for max_years, score in self.RECENCY_BANDS:
+            if years_old < max_years:
+                return score
+        return self.RECENCY_OLDEST_SCORE  # Older patents less risky
     
     def _calculate_applicant_type_score(self, applicants: List[str]) -> float:
         """
@@ -192,9 +295,11 @@ class RiskAssessmentService:
         else:
             return 0.3
     
-    def _calculate_overall_risk(self, analyzed_patents: List[Dict]) -> Dict:
+    def _calculate_overall_risk(self, analyzed_patents: List[Dict], high_risk_count: Optional[int] = None) -> Dict:
         """
-        Calculate overall FTO risk based on all patents
+        Calculate overall FTO risk based on all patents.
+        Only the top 5 entries are inspected, so ``analyzed_patents`` may be just the
+        highest-ranked ones when ``high_risk_count`` covers the full set.
         """
         if not analyzed_patents:
             return {"level": "LOW", "score": 0.0, "factors": []}
@@ -215,7 +320,8 @@ class RiskAssessmentService:
         
         # Identify main risk factors
         factors = []
-        high_risk_count = len([p for p in analyzed_patents if p['risk_level'] == 'HIGH'])
+        if high_risk_count is None:
+            high_risk_count = len([p for p in analyzed_patents if p['risk_level'] == 'HIGH'])
         
         if high_risk_count > 0:
             factors.append(f"{high_risk_count} high-risk patents identified")
@@ -298,4 +404,55 @@ class RiskAssessmentService:
                 "🔄 Re-run analysis with broader keywords to ensure coverage"
             ],
             "assessment_date": datetime.now().isoformat()
-        }
\ No newline at end of file
+        }
+
+
+class StreamingRiskAssessment:
+    """
+    Scores patents as they arrive and keeps only the state the final
+    assessment needs: a heap of the 10 highest-risk patents and the patent
+    counts. ``result()`` equals ``assess_patents`` over every patent added.
+    """
+    
+    TOP_PATENTS = 10
+    
+    def __init__(self, service: RiskAssessmentService, research_data: Dict):
+        self.service = service
+        self.research_data = research_data
+        self.matcher = KeywordMatcher(research_data.get('keywords', []))
+        self.similarity = service.text_similarity(research_data)
+        self.today = date.today().toordinal()
+        self.total = 0
+        self.high_risk_count = 0
+        # Min-heap of (risk_score, added since the seed, -arrival, analysis): the
+        # root is the entry a stable descending sort would rank last
+        self._heap: List[tuple] = []
+        self._arrivals = 0
+    
+    def add(self, patent: Union[Dict, PatentRecord]) -> Dict:
+        """Score one patent and return its analysis"""
+        analysis = self.service._analyze_single_patent(self.research_data, patent, self.matcher, self.today, self.similarity)
+        self.total += 1
+        if analysis['risk_level'] == 'HIGH':
+            self.high_risk_count += 1
+        self._keep(analysis)
+        return analysis
+    
+    def _keep(self, analysis: Dict, carried: bool = False):
+        # Earlier patents win ties, except that patents seeded from an earlier
+        # assessment lose them to every patent added since
+        entry = (analysis['risk_score'], not carried, -self._arrivals, analysis)
+        self._arrivals += 1
+        if len(self._heap) < self.TOP_PATENTS:
+            heapq.heappush(self._heap, entry)
+        elif entry[:3] > self._heap[0][:3]:
+            heapq.heapreplace(self._heap, entry)
+    
+    def top(self) -> List[Dict]:
+        """The highest-risk patents so far, best first"""
+        return [entry[3] for entry in sorted(self._heap, key=lambda entry: entry[:3], reverse=True)]
+    
+    def result(self) -> Dict:
+        if not self.total:
+            return self.service._create_low_risk_report(self.research_data)
+        return self.service._assessment(self.total, self.high_risk_count, self.top())
@@ -0,0 +1,74 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict, List, Optional
+
+from patent_record import PatentRecord
+
+
+# Version of the format_patent shape. Cached search results are keyed by it,
+# so bump it whenever that shape changes (PatentRecord.to_dict) and results
+# cached in the old shape are no longer served.
+RESULT_FORMAT_VERSION = 2
+
+
+def format_patent(row) -> Dict:
+    """
+    Convert a publication row (BigQuery Row or dict) into the API patent shape,
+    with dates normalized to YYYYMMDD (see patent_record)
+    """
+    return PatentRecord.from_row(row).to_dict()
+
+
+class SearchBackend(ABC):
+    """
+    Interface for patent search backends; subclasses implement ``search``.
+
+    ``search`` returns ``{"patents": [...], "search_query": str}`` with patents in
+    the ``format_patent`` shape, restricted to granted patents of ``jurisdiction``
+    filed on or after ``filing_date_threshold`` and ordered newest first. With
+    ``published_after`` only later publications match, and when there are more
+    than ``limit`` the oldest are returned, so callers advancing a watermark
+    can page forward without gaps. Errors are raised;
+    cancelling the awaiting task must stop the underlying search.
+    """
+
+    name = "base"
+    label = "Patent"
+    # Whether dry_run can estimate a search's cost; only billed backends can
+    supports_dry_run = False
+
+    @abstractmethod
+    async def search(self, keywords: List[str], jurisdiction: str, limit: int, filing_date_threshold: int,
+                     published_after: Optional[int] = None) -> Dict:
+        ...
+
+    async def search_pages(self, keywords: List[str], jurisdiction: str, limit: int, filing_date_threshold: int,
+                           page_size: int) -> AsyncIterator[List[Dict]]:
+        """
+        The results of ``search`` in pages of up to ``page_size`` patents.
+        Backends that can fetch results incrementally override this so the
+        first page is available before the whole result set is.
+        """
+        found = await self.search(keywords, jurisdiction, limit, filing_date_threshold)
+        patents = found["patents"]
+        for start in range(0, len(patents), page_size):
+            yield patents[start:start + page_size]
+
+    async def dry_run(self, keywords: List[str], jurisdiction: str, limit: int, filing_date_threshold: int) -> Dict:
+        """Cost estimate for a search without running it; only called when ``supports_dry_run``"""
+        raise NotImplementedError(f"{self.label} search does not support dry runs")
+
+    async def search_batch(self, queries: List[Dict], jurisdiction: str, limit: int, filing_date_threshold: int) -> Dict[str, Dict]:
+        """
+        Run several keyword searches against one jurisdiction. ``queries`` are
+        ``{"tag": str, "keywords": [...], "published_after": int (optional)}``
+        and the result maps each tag to what ``search`` would have returned for
+        it (up to ``limit`` patents per tag). Backends that pay per table scan
+        override this to search all at once.
+        """
+        results = {}
+        for query in queries:
+            results[query["tag"]] = await self.search(
+                query["keywords"], jurisdiction, limit, filing_date_threshold,
+                published_after=query.get("published_after")
+            )
+        return results
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from database import SessionLocal, SearchCacheEntry
+from search_backend import RESULT_FORMAT_VERSION
+
+# Cache defaults, overridable from the environment
+DEFAULT_TTL_SECONDS = int(os.getenv("SEARCH_CACHE_TTL", str(24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1000"))
+
+
+def normalize_query(keywords: List[str], jurisdiction: str, limit: int, filing_date_threshold: int,
+                    published_after: Optional[int] = None) -> Dict:
+    """
+    Canonical form of a search: lowercased, deduplicated, sorted keywords plus the
+    parameters that change the result set. Equal searches normalize identically.
+    """
+    normalized = {
+        "keywords": sorted({k.strip().lower() for k in keywords if k.strip()}),
+        "jurisdiction": jurisdiction.upper(),
+        "limit": limit,
+        "filing_date_threshold": filing_date_threshold,
+    }
+    if published_after:
+        normalized["published_after"] = published_after
+    return normalized
+
+
+def make_cache_key(normalized_query: Dict) -> str:
+    """Key for a normalized query's results; it changes with RESULT_FORMAT_VERSION"""
+    keyed = {**normalized_query, "format": RESULT_FORMAT_VERSION}
+    return hashlib.sha256(json.dumps(keyed, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """
+    Patent search results persisted in the SQLite database, so they survive
+    restarts and are shared by all worker processes.
+
+    Entries expire after ``ttl_seconds``; once more than ``max_entries`` are
+    stored the least recently used ones are evicted.
+    """
+
+    def __init__(self, session_factory=SessionLocal, ttl_seconds: int = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.session_factory = session_factory
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, cache_key: str) -> Optional[Dict]:
+        """Return cached results for ``cache_key``, or None if missing or expired"""
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            entry = db.query(SearchCacheEntry).filter(
+                SearchCacheEntry.cache_key == cache_key
+            ).first()
+            if entry is None or entry.created_at < now - self.ttl:
+                if entry is not None:
+                    db.delete(entry)
+                    db.commit()
+                self.misses += 1
+                return None
+
+            entry.last_accessed = now
+            entry.hit_count = (entry.hit_count or 0) + 1
+            results = json.loads(entry.results)
+            db.commit()
+            self.hits += 1
+            return results
+        finally:
+            db.close()
+
+    def set(self, cache_key: str, normalized_query: Dict, results: Dict):
+        """Store results, then drop expired entries and evict down to ``max_entries``"""
+        now = datetime.utcnow()
+        db = self.session_factory()
+        try:
+            db.merge(SearchCacheEntry(
+                cache_key=cache_key,
+                query=json.dumps(normalized_query, sort_keys=True),
+                results=json.dumps(results),
+                created_at=now,
+                last_accessed=now,
+                hit_count=0
+            ))
+            db.flush()
+            db.query(SearchCacheEntry).filter(
+                SearchCacheEntry.created_at < now - self.ttl
+            ).delete(synchronize_session=False)
+
+            overflow = db.query(SearchCacheEntry).count() - self.max_entries
+            if overflow > 0:
+                lru_keys = [
+                    key for (key,) in db.query(SearchCacheEntry.cache_key)
+                    .order_by(SearchCacheEntry.last_accessed.asc())
+                    .limit(overflow)
+                ]
+                db.query(SearchCacheEntry).filter(
+                    SearchCacheEntry.cache_key.in_(lru_keys)
+                ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def clear(self):
+        db = self.session_factory()
+        try:
+            db.query(SearchCacheEntry).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    def stats(self) -> Dict:
+        db = self.session_factory()
+        try:
+            entries = db.query(SearchCacheEntry).count()
+        finally:
+            db.close()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": int(self.ttl.total_seconds()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,120 @@
+"""
+AdmissionController slot handoff, queue limits and cancellation.
+
+Run from the backend directory:
+    python -m unittest test_admission
+"""
+import asyncio
+import unittest
+
+from admission import QUEUE_FULL, QUEUE_TIMEOUT, AdmissionController, AdmissionRejected
+
+
+async def settle():
+    """Let every runnable task take its next step"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class AdmissionControllerTest(unittest.IsolatedAsyncioTestCase):
+    async def acquire_in_order(self, admission, names, acquired):
+        """Queue one task per name, each recording its name once it holds a slot"""
+        async def acquire(name):
+            await admission.acquire()
+            acquired.append(name)
+
+        tasks = []
+        for name in names:
+            tasks.append(asyncio.create_task(acquire(name)))
+            await settle()
+        return tasks
+
+    async def test_slots_are_handed_over_in_arrival_order(self):
+        admission = AdmissionController(max_concurrent=1, max_waiting=3, max_wait_seconds=5)
+        await admission.acquire()
+        acquired = []
+        tasks = await self.acquire_in_order(admission, ["a", "b", "c"], acquired)
+        self.assertEqual((admission.running, admission.waiting), (1, 3))
+
+        for expected in (["a"], ["a", "b"], ["a", "b", "c"]):
+            admission.release()
+            await settle()
+            self.assertEqual(acquired, expected)
+            self.assertEqual(admission.running, 1)
+        await asyncio.gather(*tasks)
+
+        admission.release()
+        self.assertEqual((admission.running, admission.waiting), (0, 0))
+        self.assertEqual(admission.admitted, 4)
+
+    async def test_waiting_too_long_is_refused(self):
+        admission = AdmissionController(max_concurrent=1, max_waiting=1, max_wait_seconds=0.01)
+        await admission.acquire()
+        with self.assertRaises(AdmissionRejected) as raised:
+            await admission.acquire()
+        self.assertEqual(raised.exception.reason, QUEUE_TIMEOUT)
+        self.assertEqual((admission.running, admission.waiting, admission.rejected), (1, 0, 1))
+
+        # The refused waiter left no trace; the next one gets the freed slot
+        admission.release()
+        await admission.acquire()
+        self.assertEqual(admission.running, 1)
+
+    async def test_full_queue_is_refused_before_waiting(self):
+        admission = AdmissionController(max_concurrent=1, max_waiting=1, max_wait_seconds=5)
+        await admission.acquire()
+        acquired = []
+        tasks = await self.acquire_in_order(admission, ["queued"], acquired)
+        self.assertTrue(admission.saturated)
+
+        with self.assertRaises(AdmissionRejected) as raised:
+            admission.check()
+        self.assertEqual(raised.exception.reason, QUEUE_FULL)
+        self.assertEqual(raised.exception.retry_after, 3)
+        with self.assertRaises(AdmissionRejected):
+            await admission.acquire()
+        self.assertEqual((admission.waiting, admission.rejected), (1, 2))
+
+        admission.release()
+        await asyncio.gather(*tasks)
+        self.assertEqual(acquired, ["queued"])
+        admission.check()
+
+    async def test_cancelled_waiter_gives_up_its_place(self):
+        admission = AdmissionController(max_concurrent=1, max_waiting=2, max_wait_seconds=5)
+        await admission.acquire()
+        acquired = []
+        leaving, staying = await self.acquire_in_order(admission, ["leaving", "staying"], acquired)
+
+        leaving.cancel()
+        await settle()
+        self.assertEqual(admission.waiting, 1)
+
+        admission.release()
+        await staying
+        self.assertEqual(acquired, ["staying"])
+        self.assertEqual(admission.running, 1)
+
+    async def test_cancel_after_handoff_passes_the_slot_on(self):
+        admission = AdmissionController(max_concurrent=1, max_waiting=2, max_wait_seconds=5)
+        await admission.acquire()
+        acquired = []
+        leaving, staying = await self.acquire_in_order(admission, ["leaving", "staying"], acquired)
+
+        # The slot goes to the first waiter, which is cancelled before it can resume
+        admission.release()
+        leaving.cancel()
+        await asyncio.gather(leaving, return_exceptions=True)
+        await settle()
+
+        self.assertTrue(leaving.cancelled())
+        self.assertEqual(acquired, ["staying"])
+        self.assertEqual((admission.running, admission.waiting), (1, 0))
+
+        await staying
+        admission.release()
+        self.assertEqual((admission.running, admission.waiting), (0, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,289 @@
+"""
+Background analysis jobs and watchlist runs against a fake search backend and
+a throwaway SQLite database; no network or GCP credentials needed.
+
+Run from the backend directory:
+    python -m unittest test_analysis_jobs
+"""
+import asyncio
+import contextvars
+import os
+from datetime import datetime
+import tempfile
+import unittest
+from unittest import mock
+
+# The database engines are created on import, so point them at a scratch file first
+_workdir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir.name, 'jobs.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+import watchlists  # noqa: E402
+from admission import AdmissionController  # noqa: E402
+from analysis_jobs import COMPLETED, ERROR  # noqa: E402
+from analysis_artifacts import REPORT, load_artifact  # noqa: E402
+from database import AsyncSessionLocal, ResearchAnalysis, SessionLocal, Watchlist, async_engine  # noqa: E402
+from migrations import run_migrations  # noqa: E402
+from patent_service import PatentSearchService  # noqa: E402
+from search_backend import SearchBackend  # noqa: E402
+
+DESCRIPTION = "A method for editing genomes with a programmable nuclease and guide RNA."
+
+
+def fake_patent(number: str, published: str = "20240105") -> dict:
+    return {
+        "patent_number": number, "title": "Gene editing nuclease", "abstract": "CRISPR guide RNA delivery",
+        "publication_date": published, "grant_date": published, "filing_date": "20210301",
+        "applicants": ["Example Corp"], "inventors": [], "classifications": ["C12N15/10"],
+        "jurisdiction": "US", "status": "Active", "family_id": number,
+    }
+
+
+class FakeBackend(SearchBackend):
+    name = "fake"
+    label = "Fake"
+
+    async def search(self, keywords, jurisdiction, limit, filing_date_threshold, published_after=None):
+        return {"patents": [fake_patent("US-1-B2")], "search_query": "fake"}
+
+    async def search_batch(self, queries, jurisdiction, limit, filing_date_threshold):
+        return {
+            query["tag"]: {"patents": [fake_patent(f"US-{i}-B2")], "search_query": "fake"}
+            for i, query in enumerate(queries)
+        }
+
+
+class LockedCache:
+    """A search cache on a database that stays locked"""
+
+    def get(self, key):
+        raise RuntimeError("database is locked")
+
+    def set(self, key, query, results):
+        raise RuntimeError("database is locked")
+
+
+class DownBackend(FakeBackend):
+    async def search_batch(self, queries, jurisdiction, limit, filing_date_threshold):
+        raise RuntimeError("backend unavailable")
+
+
+class CorpusBackend(FakeBackend):
+    """Watermark searches over a fixed corpus: the oldest ``limit`` later publications, newest first"""
+
+    def __init__(self, patents):
+        self.patents = patents
+
+    async def search(self, keywords, jurisdiction, limit, filing_date_threshold, published_after=None):
+        later = sorted(
+            (p for p in self.patents if int(p["publication_date"]) > (published_after or 0)),
+            key=lambda p: p["publication_date"]
+        )
+        selected = later[:limit] if published_after else later[-limit:]
+        return {"patents": selected[::-1], "search_query": "fake"}
+
+    search_batch = SearchBackend.search_batch
+
+
+def run(coroutine):
+    """Run ``coroutine`` on a fresh event loop; pooled connections belong to the loop, so drop them after"""
+    async def run_and_dispose():
+        try:
+            return await coroutine
+        finally:
+            await async_engine.dispose()
+    return asyncio.run(run_and_dispose())
+
+
+def research(title: str) -> main.ResearchInput:
+    return main.ResearchInput(
+        title=title, description=DESCRIPTION, field_of_study="Biotechnology", keywords=["crispr"]
+    )
+
+
+async def create_analysis(research_input: main.ResearchInput) -> str:
+    analysis_id = f"analysis-{research_input.title}"
+    async with AsyncSessionLocal() as db:
+        db.add(ResearchAnalysis(
+            analysis_id=analysis_id, title=research_input.title, description=research_input.description,
+            field_of_study=research_input.field_of_study, keywords='["crispr"]', patent_search_status="pending"
+        ))
+        await db.commit()
+    return analysis_id
+
+
+async def create_watchlist(title: str, watermark: int = 20230101) -> str:
+    analysis_id = await create_analysis(research(title))
+    async with AsyncSessionLocal() as db:
+        db.add(Watchlist(analysis_id=analysis_id, jurisdiction="US", watermark=watermark, next_run_at=datetime.utcnow()))
+        await db.commit()
+    return analysis_id
+
+
+async def stored_status(analysis_id: str):
+    async with AsyncSessionLocal() as db:
+        analysis = await db.get(ResearchAnalysis, analysis_id)
+        return analysis.patent_search_status, analysis.search_error
+
+
+class AnalysisJobTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        run_migrations()
+
+    def setUp(self):
+        service = PatentSearchService(backend=FakeBackend(), admission=AdmissionController(4, 4, 5))
+        patcher = mock.patch.object(main, "patent_service", service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unexpected_error_is_stored(self):
+        # A failure outside the search itself, after the row was marked as searching
+        with mock.patch.object(main, "_store_search_results", side_effect=RuntimeError("disk full")):
+            status = run(self._run_single("unexpected"))
+        self.assertEqual(status, (ERROR, "Analysis failed: disk full"))
+
+    def test_failing_cache_does_not_fail_the_search(self):
+        main.patent_service.cache = LockedCache()
+        self.assertEqual(run(self._run_single("locked-cache")), (COMPLETED, None))
+
+    def test_completed_analysis_stores_report(self):
+        self.assertEqual(run(self._run_single("report")), (COMPLETED, None))
+        with SessionLocal() as db:
+            self.assertIsNotNone(load_artifact(db, "analysis-report", REPORT, main._report_version()))
+
+    def test_batch_with_one_bad_item(self):
+        save = main.save_analysis_patents
+
+        def save_failing_for_second(db, analysis_id, *args, **kwargs):
+            if analysis_id == "analysis-batch-2":
+                raise RuntimeError("disk I/O error")
+            return save(db, analysis_id, *args, **kwargs)
+
+        with mock.patch.object(main, "save_analysis_patents", save_failing_for_second):
+            statuses = run(self._run_batch(["batch-1", "batch-2", "batch-3"]))
+        self.assertEqual(statuses, [
+            (COMPLETED, None),
+            (ERROR, "Analysis failed: disk I/O error"),
+            (COMPLETED, None),
+        ])
+
+    async def _run_batch(self, titles):
+        queue = main.AnalysisJobQueue(main.run_batch_job, workers=1, on_failure=main.record_batch_failure)
+        items = [(await create_analysis(research(title)), research(title)) for title in titles]
+        await queue.start()
+        try:
+            queue.submit("batch", items)
+            await queue._queue.join()
+        finally:
+            await queue.stop()
+        return [await stored_status(analysis_id) for analysis_id, _ in items]
+
+    def test_watchlist_runs_record_every_failure(self):
+        main.patent_service.backend = DownBackend()
+
+        async def run_all():
+            analysis_ids = [await create_watchlist(f"down-{i}") for i in range(3)]
+            return analysis_ids, await main.run_watchlists(analysis_ids)
+
+        analysis_ids, runs = run(run_all())
+        self.assertEqual(sorted(runs), sorted(analysis_ids))
+        for analysis_id in analysis_ids:
+            self.assertEqual(runs[analysis_id]["status"], ERROR)
+            self.assertIn("backend unavailable", runs[analysis_id]["error"])
+            with SessionLocal() as db:
+                self.assertGreater(db.get(Watchlist, analysis_id).next_run_at, datetime.utcnow())
+
+    def test_watchlist_run_adds_new_patents(self):
+        async def run_one():
+            analysis_id = await create_watchlist("watched")
+            return analysis_id, await main.run_watchlists([analysis_id])
+
+        analysis_id, runs = run(run_one())
+        self.assertEqual(runs[analysis_id]["status"], COMPLETED)
+        self.assertEqual(runs[analysis_id]["new_patents"], ["US-0-B2"])
+        self.assertEqual(runs[analysis_id]["watermark"], 20240105)
+
+    def test_watchlist_run_pages_through_a_backlog(self):
+        days = ["20240101", "20240102", "20240103", "20240103", "20240104", "20240105", "20240106"]
+        main.patent_service.backend = CorpusBackend([fake_patent(f"US-{i}-B2", day) for i, day in enumerate(days)])
+
+        async def run_one():
+            analysis_id = await create_watchlist("backlog", watermark=20231215)
+            return analysis_id, await main.run_watchlists([analysis_id])
+
+        with mock.patch.object(watchlists, "SEARCH_LIMIT", 2):
+            analysis_id, runs = run(run_one())
+        self.assertEqual(runs[analysis_id]["status"], COMPLETED)
+        self.assertEqual(sorted(runs[analysis_id]["new_patents"]), sorted(f"US-{i}-B2" for i in range(len(days))))
+        self.assertEqual(runs[analysis_id]["watermark"], 20240106)
+
+    def test_full_search_queue_refuses_streams_but_not_analyses(self):
+        # No slots and no room to wait: every new search would be refused
+        main.patent_service.admission = AdmissionController(max_concurrent=0, max_waiting=0)
+        client = TestClient(main.app)
+
+        response = client.get("/api/search/stream", params={"keywords": ["crispr"]})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response.headers)
+
+        # Analyses wait in their job queue, which has its own bound
+        with mock.patch.object(main.analysis_jobs, "submit") as submit:
+            response = client.post("/api/analyze", json=research("admitted").model_dump())
+        self.assertEqual(response.status_code, 202)
+        submit.assert_called_once()
+
+    async def _run_single(self, title: str):
+        queue = main.AnalysisJobQueue(main.run_analysis_job, workers=1, on_failure=main.record_analysis_failure)
+        research_input = research(title)
+        analysis_id = await create_analysis(research_input)
+        await queue.start()
+        try:
+            queue.submit(analysis_id, research_input)
+            await queue._queue.join()
+        finally:
+            await queue.stop()
+        self.assertIsNone(queue.get_progress(analysis_id))
+        return await stored_status(analysis_id)
+
+
+class JobContextTest(unittest.IsolatedAsyncioTestCase):
+    async def test_job_runs_in_the_submitting_context(self):
+        request_id = contextvars.ContextVar("request_id", default=None)
+        seen = []
+
+        async def run_job(analysis_id, payload, report):
+            seen.append(request_id.get())
+            request_id.set("changed by job")
+
+        queue = main.AnalysisJobQueue(run_job, workers=1)
+        await queue.start()
+        try:
+            token = request_id.set("req-1")
+            queue.submit("first", None)
+            request_id.reset(token)
+            queue.submit("second", None)
+            await queue._queue.join()
+        finally:
+            await queue.stop()
+        self.assertEqual(seen, ["req-1", None])
+        self.assertIsNone(request_id.get())
+
+
+class NextPageTest(unittest.TestCase):
+    def test_short_page_is_the_last(self):
+        self.assertIsNone(watchlists.next_page_after([fake_patent("a", "20240102")], 2))
+
+    def test_full_page_continues_from_its_newest_day(self):
+        page = [fake_patent("b", "20240103"), fake_patent("a", "20240102")]
+        self.assertEqual(watchlists.next_page_after(page, 2), 20240102)
+
+    def test_full_page_of_one_day_moves_past_it(self):
+        page = [fake_patent("b", "20240103"), fake_patent("a", "20240103")]
+        self.assertEqual(watchlists.next_page_after(page, 2), 20240103)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Keyset pagination of the analysis listing.
+
+Run from the backend directory:
+    python -m unittest test_analysis_listing
+"""
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# The database engines are created on import, so point them at a scratch file first
+_workdir = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir.name, 'listing.db')}")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import main  # noqa: E402
+from analysis_listing import encode_cursor, list_analyses_page  # noqa: E402
+from database import Base, ResearchAnalysis, get_db  # noqa: E402
+
+CREATED = datetime(2024, 1, 1, 12, 0, 0)
+
+
+class AnalysisListingTest(unittest.TestCase):
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        engine = create_engine(f"sqlite:///{os.path.join(workdir.name, 'listing.db')}")
+        self.addCleanup(engine.dispose)
+        Base.metadata.create_all(bind=engine)
+        self.Session = sessionmaker(bind=engine)
+
+        # Seven analyses created in the same instant, then three earlier ones
+        created = [CREATED] * 7 + [CREATED - timedelta(days=day) for day in (1, 2, 3)]
+        with self.Session() as db:
+            for i, created_at in enumerate(created):
+                db.add(ResearchAnalysis(
+                    analysis_id=f"analysis-{i:02d}", title=f"Analysis {i}", description="d",
+                    field_of_study="Biotechnology" if i % 2 else "Robotics", keywords="[]",
+                    created_at=created_at, patent_search_status="completed",
+                ))
+            db.commit()
+
+    def pages(self, limit: int, **filters):
+        """Every page in turn, following next_cursor"""
+        pages, cursor = [], None
+        with self.Session() as db:
+            while True:
+                page = list_analyses_page(db, limit=limit, cursor=cursor, **filters)
+                pages.append(page)
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    return pages
+
+    def test_pages_cover_every_row_once_in_order(self):
+        for limit in (1, 3, 7, 10, 50):
+            ids = [a["analysis_id"] for page in self.pages(limit) for a in page["analyses"]]
+            # Equal created_at values fall back to analysis_id, newest first
+            self.assertEqual(ids, [f"analysis-{i:02d}" for i in (6, 5, 4, 3, 2, 1, 0, 7, 8, 9)], limit)
+
+    def test_last_page(self):
+        pages = self.pages(4)
+        self.assertEqual([page["count"] for page in pages], [4, 4, 2])
+        self.assertIsNone(pages[-1]["next_cursor"])
+        self.assertIsNotNone(pages[0]["next_cursor"])
+
+        # A full last page still ends the listing: no cursor to an empty page
+        self.assertEqual([page["count"] for page in self.pages(5)], [5, 5])
+
+    def test_filters_apply_across_pages(self):
+        ids = [a["analysis_id"] for page in self.pages(2, field_of_study="Biotechnology") for a in page["analyses"]]
+        self.assertEqual(ids, ["analysis-05", "analysis-03", "analysis-01", "analysis-07", "analysis-09"])
+
+    def test_cursor_past_the_end(self):
+        with self.Session() as db:
+            page = list_analyses_page(db, cursor=encode_cursor(CREATED - timedelta(days=10), "analysis-99"))
+        self.assertEqual((page["count"], page["next_cursor"]), (0, None))
+
+    def test_malformed_cursor_is_a_400(self):
+        def get_test_db():
+            with self.Session() as db:
+                yield db
+
+        main.app.dependency_overrides[get_db] = get_test_db
+        self.addCleanup(main.app.dependency_overrides.pop, get_db)
+        client = TestClient(main.app)
+        for cursor in ("not-a-cursor", "bm8tc2VwYXJhdG9y", "é", "MjAyNC0xMy0wMXxhYmM="):
+            response = client.get("/api/analyses", params={"cursor": cursor})
+            self.assertEqual(response.status_code, 400, cursor)
+            self.assertIn("Invalid cursor", response.json()["detail"])
+
+        response = client.get("/api/analyses", params={"limit": 3})
+        self.assertEqual(response.status_code, 200)
+        next_page = client.get("/api/analyses", params={"limit": 3, "cursor": response.json()["next_cursor"]})
+        self.assertEqual([a["analysis_id"] for a in next_page.json()["analyses"]],
+                         ["analysis-03", "analysis-02", "analysis-01"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Batch (NumPy) risk scoring against the per-patent path it vectorizes.
+
+Run from the backend directory:
+    python -m unittest test_batch_scoring
+"""
+import unittest
+from datetime import date
+
+from benchmarks.bench_scoring import synthetic_patents
+from keyword_matcher import KeywordMatcher
+from patent_record import as_records
+from risk_assessment import RiskAssessmentService
+from text_similarity import patent_text
+
+RESEARCH = [
+    {"title": "Improved CRISPR delivery", "description": "Lipid nanoparticles carrying guide RNA",
+     "field_of_study": "Biotechnology", "keywords": ["CRISPR", "gene editing", "lipid nanoparticle", "guide RNA"]},
+    # A field the taxonomy does not know, and no keywords at all
+    {"title": "Basket weaving", "description": "Underwater", "field_of_study": "Basketry", "keywords": []},
+]
+
+# Unknown and ISO dates, no codes or applicants, missing text, and exact duplicates for score ties
+EDGE_PATENTS = [
+    {"patent_number": "US-1-B2", "title": "CRISPR gene editing", "abstract": "guide RNA", "grant_date": "N/A",
+     "applicants": [], "classifications": []},
+    {"patent_number": "US-2-B2", "title": None, "abstract": None, "grant_date": "0",
+     "applicants": ["University of California"], "classifications": ["C12N"]},
+    {"patent_number": "US-3-B2", "title": "Lipid nanoparticle", "abstract": "", "grant_date": "2019-03-12",
+     "applicants": ["Acme Corp.", "Jane Doe"], "classifications": ["A61K48/00", "A61K48/00", "unknown"]},
+    {"patent_number": "US-3-B2", "title": "Lipid nanoparticle", "abstract": "", "grant_date": "2019-03-12",
+     "applicants": ["Acme Corp.", "Jane Doe"], "classifications": ["A61K48/00", "A61K48/00", "unknown"]},
+]
+
+
+class BatchScoringTest(unittest.TestCase):
+    def setUp(self):
+        self.service = RiskAssessmentService()
+        self.patents = EDGE_PATENTS + synthetic_patents(300) + EDGE_PATENTS
+
+    def test_factor_columns_equal_per_patent_factors(self):
+        service = self.service
+        records = as_records(self.patents)
+        today = date.today().toordinal()
+        for research_data in RESEARCH:
+            matcher = KeywordMatcher(research_data["keywords"])
+            similarity = service.text_similarity(research_data)
+            columns = service.batch_scorer.score(research_data, records, matcher, similarity)
+            field = research_data["field_of_study"].lower()
+            for i, patent in enumerate(records):
+                title_hits, abstract_hits = matcher.find(patent.title or ""), matcher.find(patent.abstract or "")
+                expected = {
+                    "keyword": service._calculate_keyword_overlap(matcher, title_hits, abstract_hits),
+                    "similarity": similarity.score(patent_text(patent)),
+                    "classification": service._calculate_classification_relevance(field, patent.classifications),
+                    "recency": service._calculate_recency_score(patent.grant_day, today),
+                    "applicant": service._calculate_applicant_type_score(patent.applicants),
+                }
+                # Exact float equality: the batch path promises identical bits, not close values
+                self.assertEqual({name: float(columns[name][i]) for name in expected}, expected, patent)
+
+            analyses = service.batch_scorer.analyze(research_data, records, columns, range(len(records)))
+            self.assertEqual(analyses, [
+                service._analyze_single_patent(research_data, patent, matcher, today, similarity) for patent in records
+            ])
+
+    def test_assessments_are_identical(self):
+        for research_data in RESEARCH:
+            batch = self.service.assess_patents(research_data, self.patents, batch=True)
+            per_patent = self.service.assess_patents(research_data, self.patents, batch=False)
+            batch.pop("assessment_date")
+            per_patent.pop("assessment_date")
+            self.assertEqual(batch, per_patent)
+
+    def test_batch_threshold(self):
+        research_data = RESEARCH[0]
+        small = synthetic_patents(self.service.BATCH_SCORING_MIN_PATENTS - 1)
+        self.service._batch_scorer = None
+        self.service.assess_patents(research_data, small)
+        self.assertIsNone(self.service._batch_scorer)
+        self.service.assess_patents(research_data, small + synthetic_patents(1))
+        self.assertIsNotNone(self.service._batch_scorer)
+
+
+if __name__ == "__main__":
+    unittest.main()
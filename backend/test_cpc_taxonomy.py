@@ -0,0 +1,127 @@
+"""
+CPC classification relevance: the prefix trie against plain prefix matching,
+field aliases, the scoring it replaced and the batch path.
+
+Run from the backend directory:
+    python -m unittest test_cpc_taxonomy
+"""
+import json
+import random
+import unittest
+
+from cpc_taxonomy import DEFAULT_TAXONOMY_PATH, CPCTaxonomy, normalize_code
+
+with open(DEFAULT_TAXONOMY_PATH, "r", encoding="utf-8") as f:
+    TAXONOMY_DATA = json.load(f)
+
+# The hard-coded mapping the taxonomy file replaced, every prefix worth one match
+OLD_FIELD_MAPPINGS = {
+    'biotechnology': ['C12', 'C07K', 'A61K', 'C07H'],
+    'software': ['G06F', 'G06N', 'H04L', 'G06Q'],
+    'mechanical': ['F16', 'B25', 'F01', 'F02'],
+    'electrical': ['H01', 'H02', 'H03', 'H04'],
+    'chemical': ['C07', 'C08', 'C09', 'C01'],
+    'medical': ['A61', 'A62B', 'G16H'],
+}
+
+
+def old_relevance(research_field, classifications):
+    relevant_codes = OLD_FIELD_MAPPINGS.get(research_field, [])
+    if not relevant_codes or not classifications:
+        return 0.3
+    matches = 0
+    for classification in classifications[:5]:
+        for code in relevant_codes:
+            if classification.startswith(code):
+                matches += 1
+                break
+    return min(matches / 3.0, 1.0)
+
+
+def prefix_weight(prefixes, code):
+    """Weight of the longest matching prefix, by scanning every prefix"""
+    matching = [p for p in prefixes if normalize_code(code).startswith(normalize_code(p))]
+    return prefixes[max(matching, key=len)] if matching else 0.0
+
+
+def random_codes(rng, prefixes, count):
+    """Codes under the given prefixes, near misses and unrelated codes, in mixed spellings"""
+    sections = "ABCDEFGHY"
+    codes = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.5:
+            code = rng.choice(prefixes) + "".join(rng.choices("0123456789/ABN", k=rng.randint(0, 6)))
+        elif kind < 0.7:
+            code = rng.choice(prefixes)[:-1]
+        else:
+            code = rng.choice(sections) + "".join(rng.choices("0123456789", k=2)) + rng.choice("ABKNQ") + "15/11"
+        if rng.random() < 0.2:
+            code = code.lower()
+        if rng.random() < 0.2 and len(code) > 4:
+            code = code[:4] + " " + code[4:]
+        codes.append(code)
+    return codes
+
+
+class PrefixTrieTest(unittest.TestCase):
+    def setUp(self):
+        self.taxonomy = CPCTaxonomy(TAXONOMY_DATA)
+        self.rng = random.Random(8)
+
+    def test_trie_weight_is_the_longest_matching_prefix(self):
+        for field, spec in TAXONOMY_DATA["fields"].items():
+            prefixes = spec["prefixes"]
+            trie = self.taxonomy.trie_for(field)
+            for code in random_codes(self.rng, list(prefixes), 300):
+                self.assertEqual(trie.weight(normalize_code(code)), prefix_weight(prefixes, code), (field, code))
+
+    def test_more_specific_prefix_wins(self):
+        taxonomy = CPCTaxonomy({"fields": {"crops": {"prefixes": {"C12": 1.0, "C12N15/82": 0.5, "C12N15/8": 0.2}}}})
+        trie = taxonomy.trie_for("crops")
+        self.assertEqual(trie.weight("C12N15/8201"), 0.5)
+        self.assertEqual(trie.weight("C12N15/80"), 0.2)
+        self.assertEqual(trie.weight("C12Q1/68"), 1.0)
+        self.assertEqual(trie.weight("C1"), 0.0)
+
+    def test_aliases_score_like_their_field(self):
+        codes = ["C12N15/11", "G06N3/08", "A61K48/00"]
+        for field, spec in TAXONOMY_DATA["fields"].items():
+            expected = self.taxonomy.relevance(field, codes)
+            for alias in spec.get("aliases", []) + [field.upper(), f"  {field} "]:
+                self.assertEqual(self.taxonomy.relevance(alias, codes), expected, alias)
+        self.assertEqual(self.taxonomy.relevance("basket weaving", codes), self.taxonomy.default_score)
+
+    def test_agrees_with_the_old_matching(self):
+        # Where the old mapping could tell: up to five codes, each under an old prefix or under none
+        every_prefix = [p for spec in TAXONOMY_DATA["fields"].values() for p in spec["prefixes"]]
+        for field, old_prefixes in OLD_FIELD_MAPPINGS.items():
+            for _ in range(200):
+                codes = [
+                    code for code in random_codes(self.rng, old_prefixes, self.rng.randint(0, 5))
+                    if code == code.upper() and " " not in code
+                    and (any(code.startswith(p) for p in old_prefixes) or not prefix_weight(
+                        dict.fromkeys(every_prefix, 1.0), code))
+                ]
+                self.assertEqual(self.taxonomy.relevance(field, codes), old_relevance(field, codes), (field, codes))
+
+
+class RelevanceAllTest(unittest.TestCase):
+    def test_equals_per_patent_relevance(self):
+        taxonomy = CPCTaxonomy(TAXONOMY_DATA)
+        rng = random.Random(4)
+        fields = list(TAXONOMY_DATA["fields"]) + ["genomics", "basket weaving", ""]
+        every_prefix = [p for spec in TAXONOMY_DATA["fields"].values() for p in spec["prefixes"]]
+        patents = [random_codes(rng, every_prefix, rng.randint(0, 12)) for _ in range(400)]
+        patents += [[], [""], ["", "C12N"], ["C12N"] * 7]
+        for field in fields:
+            # Exact equality: the batch path promises identical bits
+            self.assertEqual(
+                taxonomy.relevance_all(field, patents).tolist(),
+                [taxonomy.relevance(field, codes) for codes in patents],
+                field
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
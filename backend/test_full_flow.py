@@ -1,6 +1,7 @@
 import requests
 import json
 import os
+import time
 
 # Base URL of the running FastAPI application
 BASE_URL = "http://localhost:8000"
@@ -21,6 +22,17 @@ def load_test_data():
         print(f"Error: Could not decode JSON from {TEST_DATA_FILE}")
         return []
 
+def wait_for_analysis(analysis_id, timeout=120, interval=1.0):
+    """Polls the status endpoint until the analysis completes or fails."""
+    deadline = time.time() + timeout
+    while True:
+        response = requests.get(f"{BASE_URL}/api/analyses/{analysis_id}/status")
+        response.raise_for_status()
+        status_data = response.json()
+        if status_data["status"] in ["completed", "error"] or time.time() > deadline:
+            return status_data
+        time.sleep(interval)
+
 def run_test(test_case_data, test_name):
     """Runs a single analysis test case."""
     print("-" * 50)
@@ -40,16 +52,24 @@ def run_test(test_case_data, test_name):
         print(json.dumps(response_data, indent=2))
         
         # Basic assertions to verify the test outcome
-        assert response.status_code == 200
-        assert response_data["status"] in ["completed", "error"]
-        if response_data["status"] == "completed":
-            assert "analysis_id" in response_data
-            assert "patent_count" in response_data
-            assert isinstance(response_data["top_patents"], list)
+        assert response.status_code == 202
+        assert response_data["status"] == "pending"
+        assert "analysis_id" in response_data
+
+        # The search runs in the background; poll until it finishes
+        status_data = wait_for_analysis(response_data["analysis_id"])
+        print("Final Status:")
+        print(json.dumps(status_data, indent=2))
+
+        assert status_data["status"] in ["completed", "error"]
+        if status_data["status"] == "completed":
+            analysis = requests.get(f"{BASE_URL}/api/analyses/{response_data['analysis_id']}").json()
+            assert "patent_count" in status_data
+            assert isinstance(analysis["patents"], list)
             print(f"\n✅ Test '{test_name}' PASSED")
         else:
             # This handles cases where the API itself reports a failure (e.g., search error)
-            print(f"\n⚠️ Test '{test_name}' COMPLETED WITH API-LEVEL ERROR: {response_data.get('message')}")
+            print(f"\n⚠️ Test '{test_name}' COMPLETED WITH API-LEVEL ERROR: {status_data.get('message')}")
 
     except requests.exceptions.RequestException as e:
         print(f"\n❌ Test '{test_name}' FAILED: Could not connect to the API.")
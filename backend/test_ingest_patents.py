@@ -0,0 +1,130 @@
+"""
+Checkpointed loading of export shards into the local patent index.
+
+Run from the backend directory:
+    python -m unittest test_ingest_patents
+"""
+import csv
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import ingest_patents
+from ingest_patents import PatentIngester
+from local_index import LocalPatentIndex
+
+
+def export_record(i: int) -> dict:
+    """A record shaped like patents-public-data.patents.publications"""
+    return {
+        "publication_number": f"US-{i}-B2",
+        "title_localized": [{"text": f"Titre {i}", "language": "fr"}, {"text": f"Gene editing {i}", "language": "en"}],
+        "abstract_localized": [{"text": f"CRISPR abstract {i}", "language": "en"}],
+        "publication_date": 20200101 + i, "filing_date": 20150101, "grant_date": 20200101 + i,
+        "country_code": "US", "family_id": str(1000 + i),
+        "cpc": [{"code": "C12N15/11"}], "assignee_harmonized": [{"name": "Example Corp"}], "inventor_harmonized": [],
+    }
+
+
+class InterruptedLoad(Exception):
+    pass
+
+
+class IngestTest(unittest.TestCase):
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.workdir = workdir.name
+        self.index = LocalPatentIndex(os.path.join(self.workdir, "index.db"))
+
+    def write_ndjson(self, name: str, records, compress: bool = False) -> str:
+        path = os.path.join(self.workdir, name)
+        opener = gzip.open if compress else open
+        with opener(path, "wt", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record) + "\n\n")
+        return os.path.abspath(path)
+
+    def ingest(self, shards, batch_size=3):
+        ingester = PatentIngester(self.index, batch_size=batch_size)
+        try:
+            return ingester.ingest(shards)
+        finally:
+            ingester.close()
+
+    def stored(self):
+        conn = self.index.connect(readonly=True)
+        try:
+            return [tuple(r) for r in conn.execute(
+                "SELECT publication_number, title, abstract, family_id, cpc_codes FROM publications ORDER BY id"
+            )]
+        finally:
+            conn.close()
+
+    def checkpoint(self, shard):
+        conn = self.index.connect(readonly=True)
+        try:
+            return tuple(conn.execute(
+                "SELECT records_done, completed FROM ingest_checkpoints WHERE shard = ?", (shard,)
+            ).fetchone())
+        finally:
+            conn.close()
+
+    def test_interrupted_load_resumes_after_the_last_batch(self):
+        shard = self.write_ndjson("part-0.json.gz", [export_record(i) for i in range(8)], compress=True)
+        write_batch = PatentIngester.write_batch
+        calls = []
+
+        def fail_on_third_batch(ingester, *args, **kwargs):
+            calls.append(args)
+            if len(calls) == 3:
+                raise InterruptedLoad()
+            return write_batch(ingester, *args, **kwargs)
+
+        with mock.patch.object(PatentIngester, "write_batch", fail_on_third_batch):
+            with self.assertRaises(InterruptedLoad):
+                self.ingest([shard])
+        self.assertEqual(len(self.stored()), 6)
+        self.assertEqual(self.checkpoint(shard), (6, 0))
+
+        with mock.patch.object(ingest_patents, "iter_records", wraps=ingest_patents.iter_records) as records:
+            stats = self.ingest([shard])
+            read_from = [call.args[1] for call in records.call_args_list]
+        self.assertEqual(read_from, [6])
+        self.assertEqual(stats["rows"], 2)
+        self.assertEqual(self.checkpoint(shard), (8, 1))
+        self.assertEqual([number for number, *_ in self.stored()], [f"US-{i}-B2" for i in range(8)])
+
+    def test_loaded_shard_is_skipped_until_it_changes(self):
+        shard = self.write_ndjson("part-0.json", [export_record(i) for i in range(4)])
+        self.assertEqual(self.ingest([shard])["rows"], 4)
+        self.assertEqual(self.ingest([shard])["shards"], 0)
+
+        # A rewritten shard (a new delta) is loaded again from the start, updating rows in place
+        changed = [{**export_record(i), "family_id": "2000"} for i in range(5)]
+        self.write_ndjson("part-0.json", changed)
+        os.utime(shard, ns=(1, 1))
+        self.assertEqual(self.ingest([shard])["rows"], 5)
+        self.assertEqual({family_id for _, _, _, family_id, _ in self.stored()}, {"2000"})
+        self.assertEqual(len(self.stored()), 5)
+
+    def test_fields_from_ndjson_and_csv(self):
+        ndjson = self.write_ndjson("part-0.json", [export_record(1), {"title": "no number"}])
+        path = os.path.join(self.workdir, "part-1.csv")
+        record = export_record(2)
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(record))
+            writer.writeheader()
+            writer.writerow({k: json.dumps(v) if isinstance(v, list) else v for k, v in record.items()})
+        self.ingest([ndjson, path])
+        self.assertEqual(self.stored(), [
+            ("US-1-B2", "Gene editing 1", "CRISPR abstract 1", "1001", '["C12N15/11"]'),
+            ("US-2-B2", "Gene editing 2", "CRISPR abstract 2", "1002", '["C12N15/11"]'),
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
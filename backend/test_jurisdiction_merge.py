@@ -0,0 +1,71 @@
+"""
+Merging per-jurisdiction search results and collapsing patent families.
+
+Run from the backend directory:
+    python -m unittest test_jurisdiction_merge
+"""
+import unittest
+
+from patent_service import merge_jurisdiction_results
+
+
+def hit(number: str, published: str, family_id=None) -> dict:
+    return {"patent_number": number, "publication_date": published, "family_id": family_id}
+
+
+def found(*patents, cached=False) -> dict:
+    return {"success": True, "count": len(patents), "patents": list(patents), "search_query": "q", "cached": cached}
+
+
+def numbers(merged) -> list:
+    return [patent["patent_number"] for patent in merged["patents"]]
+
+
+class JurisdictionMergeTest(unittest.TestCase):
+    def test_family_is_kept_once_as_its_newest_publication(self):
+        merged = merge_jurisdiction_results({
+            "US": found(hit("US-1-B2", "20200101", "F1"), hit("US-2-B2", "20190101", "F2")),
+            "EP": found(hit("EP-1-B1", "20210601", "F1"), hit("EP-3-B1", "20180101", "F3")),
+            "WO": found(hit("WO-1-A1", "20190601", "F1")),
+        })
+        self.assertTrue(merged["success"])
+        self.assertEqual(numbers(merged), ["EP-1-B1", "US-2-B2", "EP-3-B1"])
+        self.assertEqual((merged["count"], merged["families_collapsed"]), (3, 2))
+
+    def test_same_day_keeps_the_earlier_listed_jurisdiction(self):
+        publications = {"US": found(hit("US-1-B2", "20200101", "F1")), "EP": found(hit("EP-1-B1", "20200101", "F1"))}
+        self.assertEqual(numbers(merge_jurisdiction_results(publications)), ["US-1-B2"])
+        reordered = {"EP": publications["EP"], "US": publications["US"]}
+        self.assertEqual(numbers(merge_jurisdiction_results(reordered)), ["EP-1-B1"])
+
+    def test_patents_without_a_family_are_their_own(self):
+        merged = merge_jurisdiction_results({
+            "US": found(hit("US-1-B2", "20200101"), hit("US-2-B2", "20200101", ""), hit("US-3-B2", "20190101", "-1")),
+            "EP": found(hit("EP-1-B1", "20200101", "0"), hit("EP-2-B1", "20180101", "-1"), hit("EP-3-B1", "20170101", None)),
+        })
+        self.assertEqual(numbers(merged), ["US-1-B2", "US-2-B2", "EP-1-B1", "US-3-B2", "EP-2-B1", "EP-3-B1"])
+        self.assertEqual(merged["families_collapsed"], 0)
+
+    def test_unknown_dates_sort_last(self):
+        merged = merge_jurisdiction_results({
+            "US": found(hit("US-1-B2", "N/A", "F1"), hit("US-2-B2", "20200101")),
+            "EP": found(hit("EP-1-B1", "20100101", "F1")),
+        })
+        self.assertEqual(numbers(merged), ["US-2-B2", "EP-1-B1"])
+
+    def test_any_failed_jurisdiction_fails_the_merge(self):
+        merged = merge_jurisdiction_results({
+            "US": found(hit("US-1-B2", "20200101")),
+            "EP": {"success": False, "error": "timeout", "count": 0, "patents": []},
+        })
+        self.assertFalse(merged["success"])
+        self.assertEqual((merged["error"], merged["patents"]), ("EP: timeout", []))
+        self.assertEqual(merged["jurisdictions"]["US"], {"success": True, "count": 1, "cached": False})
+
+    def test_cached_only_when_every_jurisdiction_was(self):
+        self.assertTrue(merge_jurisdiction_results({"US": found(cached=True), "EP": found(cached=True)})["cached"])
+        self.assertFalse(merge_jurisdiction_results({"US": found(cached=True), "EP": found()})["cached"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+KeywordMatcher against the per-keyword regex it replaced.
+
+Run from the backend directory:
+    python -m unittest test_keyword_matcher
+"""
+import random
+import re
+import unittest
+
+from keyword_matcher import KeywordMatcher
+from risk_assessment import RiskAssessmentService
+
+
+def old_find(keywords, text):
+    """One word-bounded search per keyword, as the scorer did before KeywordMatcher"""
+    return frozenset(
+        keyword.lower() for keyword in keywords
+        if keyword and re.search(r'\b' + re.escape(keyword.lower()) + r'\b', text.lower())
+    )
+
+
+class KeywordMatcherTest(unittest.TestCase):
+    def assert_matches_old(self, keywords, texts):
+        matcher = KeywordMatcher(keywords)
+        for text in texts:
+            self.assertEqual(matcher.find(text), old_find(keywords, text), (keywords, text))
+        self.assertEqual(matcher.find_all(texts), [old_find(keywords, text) for text in texts])
+
+    def test_overlapping_and_prefix_keywords(self):
+        keywords = ["gene", "gene editing", "editing", "cas", "cas9", "guide rna", "rna"]
+        self.assert_matches_old(keywords, [
+            "Gene editing with Cas9 and a guide RNA",
+            "genes edited",          # no word-bounded hit for "gene" or "editing"
+            "cas9-mediated editing",  # "cas" is not word-bounded inside "cas9"
+            "the cas protein",
+            "gene-editing",           # the hyphen breaks "gene editing" but bounds "gene" and "editing"
+            "",
+        ])
+
+    def test_regex_metacharacters(self):
+        keywords = ["c++", "3.5", "a|b", "(x)", "[y]", "x*", "node.js", "$price"]
+        self.assert_matches_old(keywords, [
+            "written in c++ today", "c++17", "version 3.5 release", "version 315",
+            "a|b testing", "ab testing", "f (x) = 1", "array [y] index", "x* star",
+            "node.js server", "nodexjs", "a $price tag",
+        ])
+
+    def test_case_insensitive_and_duplicates(self):
+        matcher = KeywordMatcher(["CRISPR", "crispr", "Vector"])
+        found = matcher.find("Improved CRISPR vector")
+        self.assertEqual(found, {"crispr", "vector"})
+        self.assertEqual(len(matcher), 3)
+        self.assertEqual(matcher.count(found), 3)
+
+    def test_empty_keywords_never_hit(self):
+        matcher = KeywordMatcher(["", "crispr"])
+        self.assertEqual(matcher.find("crispr and more"), {"crispr"})
+        self.assertEqual(KeywordMatcher([""]).find("anything"), frozenset())
+        self.assertEqual(KeywordMatcher([]).find_all(["anything", ""]), [frozenset(), frozenset()])
+
+    def test_random_keywords_and_texts(self):
+        rng = random.Random(7)
+        words = ["gene", "gen", "editing", "edit", "cas9", "cas", "c++", "rna", "a.b", "ab"]
+        separators = [" ", "-", ", ", "/", ""]
+        for _ in range(300):
+            keywords = [
+                " ".join(rng.sample(words, rng.randint(1, 2))) for _ in range(rng.randint(1, 5))
+            ]
+            texts = [
+                "".join(rng.choice(words) + rng.choice(separators) for _ in range(rng.randint(0, 8)))
+                for _ in range(5)
+            ]
+            self.assert_matches_old(keywords, texts)
+
+
+class KeywordOverlapTest(unittest.TestCase):
+    def setUp(self):
+        self.service = RiskAssessmentService()
+
+    def overlap(self, keywords, title, abstract):
+        matcher = KeywordMatcher(keywords)
+        return self.service._calculate_keyword_overlap(matcher, matcher.find(title), matcher.find(abstract))
+
+    def test_title_hits_get_full_credit(self):
+        self.assertEqual(self.overlap(["crispr", "vector"], "CRISPR vector", ""), 1.0)
+
+    def test_abstract_only_hits_get_abstract_weight(self):
+        self.assertEqual(
+            self.overlap(["crispr", "vector"], "CRISPR delivery", "a lipid vector carrying crispr"),
+            (1 * self.service.TITLE_MATCH_WEIGHT + 1 * self.service.ABSTRACT_MATCH_WEIGHT) / 2
+        )
+
+    def test_no_keywords(self):
+        self.assertEqual(self.overlap([], "CRISPR", "CRISPR"), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
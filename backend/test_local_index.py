@@ -0,0 +1,100 @@
+"""
+The local FTS5 search backend's filters against a small fixture index.
+
+Run from the backend directory:
+    python -m unittest test_local_index
+"""
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from local_index import LocalIndexSearchBackend, LocalPatentIndex, build_match_expression
+
+THRESHOLD = 20050101
+
+
+def row(number, title, published, filed=20150101, granted=None, country="US", family_id=None):
+    """A publications row in LocalPatentIndex.upsert order; granted defaults to published"""
+    return (
+        number, title, f"Abstract of {title}", published, filed, published if granted is None else granted, country,
+        json.dumps(["C12N15/11"]), json.dumps(["Example Corp"]), json.dumps([]), family_id,
+    )
+
+
+CORPUS = [
+    row("US-1-B2", "CRISPR guide RNA delivery", 20200105, family_id="F1"),
+    row("US-2-B2", "Gene editing with CRISPR nucleases", 20210301),
+    row("US-3-B2", "CRISPR lipid nanoparticles", 20220710),
+    row("US-4-B2", "CRISPRs in plants", 20230101),            # prefix match on the last token
+    row("US-5-A1", "CRISPR application, not granted", 20230601, granted=0),
+    row("US-6-B2", "CRISPR filed too long ago", 20230701, filed=19990101),
+    row("EP-1-B1", "CRISPR guide RNA delivery", 20210601, country="EP", family_id="F1"),
+    row("US-7-B2", "Battery anode", 20240101),
+]
+
+
+def numbers(result):
+    return [patent["patent_number"] for patent in result["patents"]]
+
+
+class LocalIndexSearchTest(unittest.TestCase):
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.index = LocalPatentIndex(os.path.join(workdir.name, "index.db"))
+        self.index.ensure_schema()
+        conn = self.index.connect()
+        with conn:
+            LocalPatentIndex.upsert(conn, CORPUS)
+        conn.close()
+        self.backend = LocalIndexSearchBackend(self.index)
+
+    def search(self, keywords=("crispr",), jurisdiction="US", limit=10, published_after=None):
+        return asyncio.run(self.backend.search(list(keywords), jurisdiction, limit, THRESHOLD, published_after))
+
+    def test_granted_recent_patents_of_the_jurisdiction_newest_first(self):
+        self.assertEqual(numbers(self.search()), ["US-4-B2", "US-3-B2", "US-2-B2", "US-1-B2"])
+        self.assertEqual(numbers(self.search(jurisdiction="ep")), ["EP-1-B1"])
+        self.assertEqual(numbers(self.search(jurisdiction="WO")), [])
+
+    def test_limit_keeps_the_newest(self):
+        self.assertEqual(numbers(self.search(limit=2)), ["US-4-B2", "US-3-B2"])
+
+    def test_published_after_takes_the_oldest_later_publications(self):
+        self.assertEqual(numbers(self.search(published_after=20200105)), ["US-4-B2", "US-3-B2", "US-2-B2"])
+        # Over the limit the oldest come back, still newest first, so a watermark can page forward
+        self.assertEqual(numbers(self.search(published_after=20200101, limit=2)), ["US-2-B2", "US-1-B2"])
+        self.assertEqual(numbers(self.search(published_after=20230101)), [])
+
+    def test_keywords_match_phrases_and_prefixes(self):
+        self.assertEqual(numbers(self.search(["guide RNA"])), ["US-1-B2"])
+        self.assertEqual(numbers(self.search(["lipid nano"])), ["US-3-B2"])
+        self.assertEqual(numbers(self.search(["battery", "nucleases"])), ["US-7-B2", "US-2-B2"])
+        self.assertEqual(numbers(self.search(["", "!!"])), [])
+
+    def test_patents_come_in_the_api_shape(self):
+        patent = self.search(["guide RNA"])["patents"][0]
+        self.assertEqual(patent["publication_date"], "20200105")
+        self.assertEqual((patent["jurisdiction"], patent["family_id"]), ("US", "F1"))
+        self.assertEqual((patent["classifications"], patent["applicants"]), (["C12N15/11"], ["Example Corp"]))
+
+    def test_index_without_family_ids(self):
+        conn = sqlite3.connect(self.index.path)
+        conn.execute("ALTER TABLE publications DROP COLUMN family_id")
+        conn.close()
+        patents = self.search(["guide RNA"])["patents"]
+        self.assertEqual([(p["patent_number"], p["family_id"]) for p in patents], [("US-1-B2", None)])
+
+
+class MatchExpressionTest(unittest.TestCase):
+    def test_phrases_with_prefix_on_the_last_token(self):
+        self.assertEqual(build_match_expression(["Guide RNA", "cas9"]), '"guide rna"* OR "cas9"*')
+        self.assertEqual(build_match_expression(['say "hi"', "-"]), '"say hi"*')
+        self.assertIsNone(build_match_expression([]))
+
+
+if __name__ == "__main__":
+    unittest.main()
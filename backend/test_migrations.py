@@ -0,0 +1,124 @@
+"""
+Migrating a legacy database, where each analysis kept its patents as a JSON
+blob, to the shared patents/analysis_patents tables.
+
+Run from the backend directory:
+    python -m unittest test_migrations
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from sqlalchemy import create_engine, inspect, text
+
+import migrations
+from patent_store import storage_number
+
+# research_analyses as it was before migration 1
+LEGACY_SCHEMA = """
+CREATE TABLE research_analyses (
+    analysis_id VARCHAR NOT NULL,
+    title VARCHAR NOT NULL,
+    description TEXT NOT NULL,
+    field_of_study VARCHAR NOT NULL,
+    keywords TEXT NOT NULL,
+    researcher_name VARCHAR,
+    created_at DATETIME,
+    patent_search_status VARCHAR,
+    patent_results TEXT,
+    patent_count VARCHAR,
+    PRIMARY KEY (analysis_id)
+)
+"""
+
+
+def application(number: str) -> dict:
+    """An unpublished application, as the old USPTO search returned it"""
+    return {"patent_number": "N/A", "application_number": number, "title": f"Application {number}", "grant_date": "N/A"}
+
+
+def publication(number: str) -> dict:
+    return {"patent_number": number, "title": f"Patent {number}", "grant_date": "20200101"}
+
+
+LEGACY_ANALYSES = {
+    # Applications share "N/A", two hits have no number at all and one publication is listed twice
+    "apps": ([application("19234596"), application("19234526"), {"patent_number": "", "title": "Untitled"},
+              {"title": "No number"}, publication("US-1-B2"), publication("US-1-B2")], "12258236"),
+    "shared": ([publication("US-1-B2"), application("19234596")], "2"),
+    "failed": ({"error": "quota exceeded"}, "0"),
+    "garbled": ("not json", "7"),
+}
+
+
+class LegacyMigrationTest(unittest.TestCase):
+    def setUp(self):
+        workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(workdir.cleanup)
+        self.engine = create_engine(f"sqlite:///{os.path.join(workdir.name, 'legacy.db')}")
+        self.addCleanup(self.engine.dispose)
+        with self.engine.begin() as connection:
+            connection.execute(text(LEGACY_SCHEMA))
+            for analysis_id, (results, count) in LEGACY_ANALYSES.items():
+                connection.execute(text("""
+                    INSERT INTO research_analyses VALUES (
+                        :id, :id, 'description', 'Biotechnology', '[]', NULL, '2024-01-01', 'completed', :results, :count
+                    )
+                """), {"id": analysis_id, "count": count,
+                       "results": results if isinstance(results, str) else json.dumps(results)})
+
+    def query(self, sql: str):
+        with self.engine.connect() as connection:
+            return connection.execute(text(sql)).fetchall()
+
+    def test_every_hit_keeps_its_own_patent(self):
+        migrations.run_migrations(self.engine)
+
+        self.assertEqual(sorted(number for (number,) in self.query("SELECT publication_number FROM patents")), [
+            "US-1-B2", "application:19234526", "application:19234596", "legacy:apps:2", "legacy:apps:3",
+        ])
+        links = self.query("SELECT analysis_id, publication_number FROM analysis_patents ORDER BY analysis_id, rank")
+        self.assertEqual(links, [
+            ("apps", "application:19234596"), ("apps", "application:19234526"), ("apps", "legacy:apps:2"),
+            ("apps", "legacy:apps:3"), ("apps", "US-1-B2"),
+            ("shared", "US-1-B2"), ("shared", "application:19234596"),
+        ])
+
+    def test_patent_count_is_recounted_from_links(self):
+        migrations.run_migrations(self.engine)
+
+        self.assertEqual(
+            dict(self.query("SELECT analysis_id, patent_count FROM research_analyses")),
+            {"apps": 5, "shared": 2, "failed": 0, "garbled": 0},
+        )
+        self.assertEqual(
+            self.query("SELECT search_error FROM research_analyses WHERE analysis_id = 'failed'"), [("quota exceeded",)]
+        )
+        self.assertNotIn(migrations.LEGACY_ANALYSES_TABLE, inspect(self.engine).get_table_names())
+
+    def test_short_backfill_keeps_the_legacy_rows(self):
+        save = migrations.save_analysis_patents
+
+        def save_losing_shared(db, analysis_id, patents, **kwargs):
+            if analysis_id != "shared":
+                save(db, analysis_id, patents, **kwargs)
+
+        with mock.patch.object(migrations, "save_analysis_patents", save_losing_shared):
+            migrations.run_migrations(self.engine)
+        self.assertIn(migrations.LEGACY_ANALYSES_TABLE, inspect(self.engine).get_table_names())
+        self.assertEqual(len(self.query(f"SELECT * FROM {migrations.LEGACY_ANALYSES_TABLE}")), len(LEGACY_ANALYSES))
+
+
+class StorageNumberTest(unittest.TestCase):
+    def test_missing_numbers_fall_back_to_the_application(self):
+        self.assertEqual(storage_number(publication("US-1-B2")), "US-1-B2")
+        self.assertEqual(storage_number(application("19234596")), "application:19234596")
+        self.assertEqual(storage_number({"patent_number": " ", "application_number": "123"}), "application:123")
+        self.assertIsNone(storage_number({"patent_number": "N/A", "application_number": "N/A"}))
+        self.assertIsNone(storage_number({}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+PatentRecord conversions to and from the API patent shape.
+
+Run from the backend directory:
+    python -m unittest test_patent_record
+"""
+import unittest
+from datetime import date
+
+from patent_record import MISSING_DATE, PatentRecord, format_day, parse_day
+
+PATENT = {
+    "patent_number": "US-10000000-B2",
+    "title": "Gene editing nuclease",
+    "abstract": "CRISPR guide RNA delivery",
+    "publication_date": "20190312",
+    "grant_date": "20190312",
+    "filing_date": "20160101",
+    "applicants": ["Broad Institute Inc.", "MIT"],
+    "inventors": ["Jane Doe"],
+    "classifications": ["C12N15/11", "C12N9/22"],
+    "jurisdiction": "US",
+    "status": "Active",
+    "family_id": "54321",
+}
+
+
+class RoundTripTest(unittest.TestCase):
+    def test_api_dict_round_trips(self):
+        self.assertEqual(PatentRecord.from_dict(PATENT).to_dict(), PATENT)
+
+    def test_record_round_trips(self):
+        record = PatentRecord.from_dict(PATENT)
+        self.assertEqual(PatentRecord.from_dict(record.to_dict()), record)
+
+    def test_missing_and_zero_dates_become_na(self):
+        for missing in ("N/A", "0", 0, "", None, "not a date", "20191340"):
+            record = PatentRecord.from_dict({**PATENT, "grant_date": missing, "filing_date": missing})
+            self.assertIsNone(record.grant_day, missing)
+            patent = record.to_dict()
+            self.assertEqual((patent["grant_date"], patent["filing_date"]), (MISSING_DATE, MISSING_DATE))
+            self.assertEqual(PatentRecord.from_dict(patent), record)
+
+    def test_iso_dates_come_out_as_yyyymmdd(self):
+        for iso in ("2019-03-12", "2019-03-12T08:30:00", "2019-03-12 00:00:00+00:00"):
+            patent = PatentRecord.from_dict({**PATENT, "publication_date": iso, "grant_date": iso}).to_dict()
+            self.assertEqual(patent, PATENT, iso)
+
+    def test_unknown_family_ids_become_none(self):
+        for unknown in ("", "-1", "0", " -1 ", None):
+            record = PatentRecord.from_dict({**PATENT, "family_id": unknown})
+            self.assertIsNone(record.family_id, unknown)
+            self.assertIsNone(record.to_dict()["family_id"])
+            self.assertEqual(PatentRecord.from_dict(record.to_dict()), record)
+        self.assertEqual(PatentRecord.from_dict({**PATENT, "family_id": 10}).family_id, "10")
+
+    def test_missing_lists_become_empty(self):
+        record = PatentRecord.from_dict({"patent_number": "US-1-B2"})
+        self.assertEqual((record.applicants, record.inventors, record.classifications), ((), (), ()))
+        self.assertEqual(PatentRecord.from_dict(record.to_dict()), record)
+
+
+class DayTest(unittest.TestCase):
+    def test_parse_day_forms(self):
+        day = date(2019, 3, 12).toordinal()
+        for value in (20190312, "20190312", " 20190312 ", "2019-03-12", date(2019, 3, 12)):
+            self.assertEqual(parse_day(value), day, value)
+
+    def test_format_day(self):
+        self.assertEqual(format_day(date(2019, 3, 12).toordinal()), "20190312")
+        self.assertEqual(format_day(None), MISSING_DATE)
+
+
+if __name__ == "__main__":
+    unittest.main()
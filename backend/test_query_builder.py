@@ -0,0 +1,133 @@
+"""
+Golden-SQL tests for query_builder; no network or GCP credentials needed.
+
+Run from the backend directory:
+    python -m unittest test_query_builder
+
+After an intended change to the generated SQL, refresh the golden files with
+    UPDATE_GOLDEN_SQL=1 python -m unittest test_query_builder
+and review the diff.
+"""
+import os
+import re
+import unittest
+
+from query_builder import PatentQueryBuilder, keyword_pattern, re2_escape
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden_sql")
+THRESHOLD = 20050101
+
+
+def assert_golden(test: unittest.TestCase, name: str, sql: str):
+    path = os.path.join(GOLDEN_DIR, name)
+    if os.getenv("UPDATE_GOLDEN_SQL"):
+        os.makedirs(GOLDEN_DIR, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(sql)
+    with open(path, "r", encoding="utf-8") as f:
+        test.assertEqual(sql, f.read(), f"generated SQL differs from {name}")
+
+
+class SearchQueryTest(unittest.TestCase):
+    def setUp(self):
+        self.builder = PatentQueryBuilder()
+
+    def test_matches_golden_sql(self):
+        query = self.builder.search(["CRISPR", "gene editing"], "us", 25, THRESHOLD)
+        assert_golden(self, "search.sql", query.sql)
+        self.assertEqual(query.parameters, [
+            {"name": "keyword_pattern", "type": "STRING", "value": "(?i)(?:crispr|gene editing)"},
+            {"name": "jurisdiction", "type": "STRING", "value": "US"},
+            {"name": "filing_date_threshold", "type": "INT64", "value": THRESHOLD},
+            {"name": "limit", "type": "INT64", "value": 25},
+        ])
+
+    def test_sql_does_not_grow_with_keywords(self):
+        one = self.builder.search(["crispr"], "US", 25, THRESHOLD)
+        ten = self.builder.search([f"term {i}" for i in range(10)], "US", 25, THRESHOLD)
+        self.assertEqual(one.sql, ten.sql)
+        self.assertEqual(one.sql.count("REGEXP_CONTAINS"), 2)
+
+    def test_keywords_never_reach_sql_text(self):
+        hostile = "x%') OR TRUE --"
+        query = self.builder.search([hostile], "US", 25, THRESHOLD)
+        self.assertNotIn("OR TRUE", query.sql)
+        self.assertEqual(query.parameters[0]["value"], "(?i)(?:x%'\\) or true --)")
+
+    def test_published_after_filter(self):
+        query = self.builder.search(["crispr"], "US", 25, THRESHOLD, published_after=20240101)
+        assert_golden(self, "search_published_after.sql", query.sql)
+        self.assertEqual(query.parameters[-1], {"name": "published_after", "type": "INT64", "value": 20240101})
+
+    def test_selects_only_needed_columns(self):
+        sql = self.builder.search(["crispr"], "US", 25, THRESHOLD).sql
+        self.assertNotIn("inventor_harmonized", sql)
+        self.assertNotIn("SELECT *", sql)
+
+
+class BatchQueryTest(unittest.TestCase):
+    def test_matches_golden_sql(self):
+        query = PatentQueryBuilder().search_batch(
+            [{"tag": "a", "keywords": ["CRISPR"]}, {"tag": "b", "keywords": ["battery", "anode"]}],
+            "EP", 10, THRESHOLD
+        )
+        assert_golden(self, "search_batch.sql", query.sql)
+        self.assertEqual(query.parameters[0], {
+            "name": "inputs",
+            "type": "ARRAY<STRUCT<tag STRING, pattern STRING, published_after INT64>>",
+            "value": [
+                {"tag": "a", "pattern": "(?i)(?:crispr)", "published_after": 0},
+                {"tag": "b", "pattern": "(?i)(?:anode|battery)", "published_after": 0},
+            ],
+        })
+
+
+class KeywordPatternTest(unittest.TestCase):
+    def test_escapes_re2_metacharacters_only(self):
+        self.assertEqual(re2_escape("c++ (v1.2) a|b"), "c\\+\\+ \\(v1\\.2\\) a\\|b")
+        self.assertEqual(re2_escape("gene-editing 5' cap"), "gene-editing 5' cap")
+
+    def test_matches_like_substring_semantics(self):
+        keywords = ["CRISPR", "cas9 ", "c++", "3.5", "a|b", "[x]"]
+        pattern = keyword_pattern(keywords)
+        texts = [
+            "Improved crispr delivery", "CAS9 nuclease", "written in C++", "version 3.5 release",
+            "version 315", "a|b testing", "ab testing", "array [x] index", "nothing relevant",
+        ]
+        for text in texts:
+            expected = any(k.strip().lower() in text.lower() for k in keywords)
+            # Python's re agrees with RE2 on this subset of the syntax
+            self.assertEqual(bool(re.search(pattern, text)), expected, text)
+
+    def test_no_keywords_matches_nothing(self):
+        pattern = keyword_pattern(["  ", ""])
+        self.assertIsNone(re.search(pattern, "anything at all"))
+        self.assertIsNone(re.search(pattern, ""))
+
+
+class JobConfigTest(unittest.TestCase):
+    def test_dry_run_and_byte_cap(self):
+        query = PatentQueryBuilder().search(["crispr"], "US", 25, THRESHOLD)
+
+        config = query.job_config(maximum_bytes_billed=10 * 1024 ** 3)
+        self.assertEqual(config.maximum_bytes_billed, 10 * 1024 ** 3)
+        self.assertFalse(config.dry_run)
+
+        dry = query.job_config(dry_run=True)
+        self.assertTrue(dry.dry_run)
+        self.assertFalse(dry.use_query_cache)
+        self.assertIsNone(dry.maximum_bytes_billed)
+
+    def test_struct_array_parameter(self):
+        query = PatentQueryBuilder().search_batch([{"tag": "a", "keywords": ["crispr"]}], "US", 10, THRESHOLD)
+        inputs = query.query_parameters()[0].to_api_repr()
+        self.assertEqual(inputs["parameterType"]["arrayType"]["structTypes"], [
+            {"name": "tag", "type": {"type": "STRING"}},
+            {"name": "pattern", "type": {"type": "STRING"}},
+            {"name": "published_after", "type": {"type": "INT64"}},
+        ])
+        self.assertEqual(inputs["parameterValue"]["arrayValues"][0]["structValues"]["pattern"], {"value": "(?i)(?:crispr)"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,29 @@
+"""
+Search cache keys.
+
+Run from the backend directory:
+    python -m unittest test_search_cache
+"""
+import unittest
+from unittest import mock
+
+import search_cache
+from search_cache import make_cache_key, normalize_query
+
+
+class CacheKeyTest(unittest.TestCase):
+    def test_equal_searches_share_a_key(self):
+        self.assertEqual(
+            make_cache_key(normalize_query(["CRISPR", "vector "], "us", 100, 20050101)),
+            make_cache_key(normalize_query(["vector", "crispr", "Crispr"], "US", 100, 20050101)),
+        )
+
+    def test_key_changes_with_the_result_format(self):
+        query = normalize_query(["crispr"], "US", 100, 20050101)
+        key = make_cache_key(query)
+        with mock.patch.object(search_cache, "RESULT_FORMAT_VERSION", search_cache.RESULT_FORMAT_VERSION + 1):
+            self.assertNotEqual(make_cache_key(query), key)
+
+
+if __name__ == "__main__":
+    unittest.main()
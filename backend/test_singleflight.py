@@ -0,0 +1,113 @@
+"""
+SingleFlight coalescing, error propagation and cancellation.
+
+Run from the backend directory:
+    python -m unittest test_singleflight
+"""
+import asyncio
+import unittest
+
+from singleflight import SingleFlight
+
+
+class GatedWork:
+    """Work that runs until ``release`` is set, recording how it ended"""
+
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.release = asyncio.Event()
+        self.started = 0
+        self.cancelled = False
+
+    async def __call__(self):
+        self.started += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def settle():
+    """Let every runnable task take its next step"""
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+class SingleFlightTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.flight = SingleFlight()
+
+    def start_callers(self, work, count=3):
+        return [asyncio.create_task(self.flight.do("key", work)) for _ in range(count)]
+
+    async def test_callers_share_one_result(self):
+        work = GatedWork(result={"patents": []})
+        callers = self.start_callers(work)
+        await settle()
+        self.assertEqual(self.flight.in_flight, 1)
+
+        work.release.set()
+        results = await asyncio.gather(*callers)
+        self.assertEqual(work.started, 1)
+        self.assertTrue(all(result is work.result for result in results))
+        self.assertEqual(self.flight.stats(), {"in_flight": 0, "executed": 1, "coalesced": 2})
+
+    async def test_exception_reaches_every_waiter(self):
+        work = GatedWork(error=RuntimeError("backend down"))
+        callers = self.start_callers(work)
+        await settle()
+
+        work.release.set()
+        results = await asyncio.gather(*callers, return_exceptions=True)
+        self.assertEqual(work.started, 1)
+        self.assertTrue(all(result is work.error for result in results))
+        self.assertEqual(self.flight.in_flight, 0)
+
+    async def test_first_waiter_leaving_keeps_work_running(self):
+        work = GatedWork(result="found")
+        first, *others = self.start_callers(work)
+        await settle()
+
+        first.cancel()
+        await settle()
+        self.assertTrue(first.cancelled())
+        self.assertFalse(work.cancelled)
+        self.assertEqual(self.flight.in_flight, 1)
+
+        work.release.set()
+        self.assertEqual(await asyncio.gather(*others), ["found", "found"])
+        self.assertEqual(work.started, 1)
+
+    async def test_last_waiter_leaving_cancels_work(self):
+        work = GatedWork(result="found")
+        callers = self.start_callers(work, count=2)
+        await settle()
+
+        for caller in callers:
+            caller.cancel()
+        await settle()
+        self.assertTrue(all(caller.cancelled() for caller in callers))
+        self.assertTrue(work.cancelled)
+        self.assertEqual(self.flight.in_flight, 0)
+
+        # The key is forgotten, so the next call starts fresh work
+        fresh = GatedWork(result="again")
+        fresh.release.set()
+        self.assertEqual(await self.flight.do("key", fresh), "again")
+        self.assertEqual(self.flight.executed, 2)
+
+    async def test_distinct_keys_do_not_share(self):
+        work = GatedWork(result="found")
+        work.release.set()
+        await asyncio.gather(self.flight.do("a", work), self.flight.do("b", work))
+        self.assertEqual(work.started, 2)
+        self.assertEqual(self.flight.coalesced, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
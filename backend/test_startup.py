@@ -0,0 +1,87 @@
+"""
+Startup tests: importing the API must stay cheap and must not need GCP
+credentials or a database. Each check runs in a fresh interpreter, since
+import costs only show up once per process.
+
+Run from the backend directory:
+    python -m unittest test_startup
+
+IMPORT_TIME_BUDGET_SECONDS (default 2.0) sets how long ``import main`` may
+take on the machine running the tests.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "2.0"))
+
+# Modules that only a BigQuery search or a large batch assessment should load
+DEFERRED_MODULES = ["google.cloud.bigquery", "google.auth", "numpy"]
+
+
+def run_python(code: str, workdir: str) -> dict:
+    """Run ``code`` in a fresh interpreter and return the JSON it prints last"""
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+        # Any attempt to build a BigQuery client at startup fails loudly
+        "GOOGLE_APPLICATION_CREDENTIALS": os.path.join(workdir, "missing-credentials.json"),
+        "PATENT_SEARCH_BACKEND": "bigquery",
+        "PYTHONPATH": BACKEND_DIR,
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=workdir, env=env, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise AssertionError(f"subprocess failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class ImportTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.workdir.cleanup)
+
+    def test_import_is_lazy(self):
+        loaded = run_python(
+            "import json, sys; import main; "
+            f"print(json.dumps({{m: m in sys.modules for m in {DEFERRED_MODULES!r}}}))",
+            self.workdir.name
+        )
+        self.assertEqual(loaded, {module: False for module in DEFERRED_MODULES})
+        self.assertFalse(os.path.exists(os.path.join(self.workdir.name, "startup.db")), "import touched the database")
+
+    def test_import_time_budget(self):
+        # Best of three, so one slow start on a busy machine doesn't fail the test
+        timings = [
+            run_python(
+                "import json, time; started = time.perf_counter(); import main; "
+                "print(json.dumps(time.perf_counter() - started))",
+                self.workdir.name
+            )
+            for _ in range(3)
+        ]
+        self.assertLess(
+            min(timings), IMPORT_TIME_BUDGET_SECONDS,
+            f"import main took {min(timings):.2f}s, over the {IMPORT_TIME_BUDGET_SECONDS}s budget"
+        )
+
+    def test_serves_without_credentials(self):
+        result = run_python(
+            "import json; from fastapi.testclient import TestClient; import main\n"
+            "with TestClient(main.app) as client:\n"
+            "    root = client.get('/').status_code\n"
+            "    listing = client.get('/api/analyses').status_code\n"
+            "print(json.dumps([root, listing]))",
+            self.workdir.name
+        )
+        # The lifespan created the schema, so database-backed endpoints work too
+        self.assertEqual(result, [200, 200])
+
+
+if __name__ == "__main__":
+    unittest.main()
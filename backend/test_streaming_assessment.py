@@ -0,0 +1,90 @@
+"""
+StreamingRiskAssessment's top-10 heap against scoring every patent and
+sorting the full list, as assess_patents did before streaming.
+
+Run from the backend directory:
+    python -m unittest test_streaming_assessment
+"""
+import random
+import unittest
+from datetime import date
+
+from benchmarks.bench_scoring import synthetic_patents
+from keyword_matcher import KeywordMatcher
+from risk_assessment import RiskAssessmentService
+
+RESEARCH = {
+    "title": "Improved CRISPR delivery", "description": "Lipid nanoparticles carrying guide RNA",
+    "field_of_study": "Biotechnology", "keywords": ["CRISPR", "gene editing", "lipid nanoparticle", "guide RNA"],
+}
+
+
+def tied_patents(count: int, distinct: int = 6, seed: int = 3):
+    """``count`` patents sharing ``distinct`` texts, so most scores tie; numbers tell them apart"""
+    texts = synthetic_patents(distinct, seed=seed)
+    rng = random.Random(seed)
+    return [{**rng.choice(texts), "patent_number": f"US-{i}-B2"} for i in range(count)]
+
+
+def full_sort_assessment(service: RiskAssessmentService, research_data, patents):
+    """Score every patent, stable-sort the whole list and keep the top 10"""
+    matcher = KeywordMatcher(research_data.get("keywords", []))
+    similarity = service.text_similarity(research_data)
+    today = date.today().toordinal()
+    analyzed = [service._analyze_single_patent(research_data, p, matcher, today, similarity) for p in patents]
+    analyzed.sort(key=lambda x: x["risk_score"], reverse=True)
+    high_risk_count = len([p for p in analyzed if p["risk_level"] == "HIGH"])
+    overall_risk = service._calculate_overall_risk(analyzed, high_risk_count)
+    return {
+        "overall_risk_level": overall_risk["level"],
+        "overall_risk_score": overall_risk["score"],
+        "risk_factors": overall_risk["factors"],
+        "total_patents_analyzed": len(patents),
+        "high_risk_patents": high_risk_count,
+        "analyzed_patents": analyzed[:10],
+        "recommendations": service._generate_recommendations(overall_risk, analyzed),
+    }
+
+
+class StreamingAssessmentTest(unittest.TestCase):
+    def setUp(self):
+        self.service = RiskAssessmentService()
+
+    def assess(self, patents, **kwargs):
+        result = self.service.assess_patents(RESEARCH, patents, **kwargs)
+        result.pop("assessment_date")
+        return result
+
+    def test_equals_full_sort(self):
+        for patents in (synthetic_patents(250), synthetic_patents(7), tied_patents(200)):
+            expected = full_sort_assessment(self.service, RESEARCH, patents)
+            self.assertEqual(self.assess(patents, batch=False), expected)
+            self.assertEqual(self.assess(iter(patents)), expected)
+
+    def test_ties_keep_arrival_order(self):
+        patents = tied_patents(120, distinct=2)
+        top = self.assess(iter(patents))["analyzed_patents"]
+        self.assertEqual(top, full_sort_assessment(self.service, RESEARCH, patents)["analyzed_patents"])
+        # Among equal scores the earlier patent ranks first
+        arrival = {p["patent_number"]: i for i, p in enumerate(patents)}
+        for first, second in zip(top, top[1:]):
+            if first["risk_score"] == second["risk_score"]:
+                self.assertLess(arrival[first["patent_number"]], arrival[second["patent_number"]])
+
+    def test_continuing_an_assessment_ranks_new_patents_first_on_ties(self):
+        stored, found = tied_patents(60, seed=5), tied_patents(80, seed=5)[60:]
+        for patent in found:
+            patent["patent_number"] = "new-" + patent["patent_number"]
+        previous = self.service.assess_patents(RESEARCH, stored)
+
+        assessment = self.service.stream_assessment(RESEARCH, previous)
+        for patent in found:
+            assessment.add(patent)
+        result = assessment.result()
+        result.pop("assessment_date")
+        # As if the new patents had been stored ahead of the earlier ones
+        self.assertEqual(result, full_sort_assessment(self.service, RESEARCH, found + stored))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+TF-IDF text similarity: batch scoring against per-text scoring, and IDF
+tables written to and read back from disk.
+
+Run from the backend directory:
+    python -m unittest test_text_similarity
+"""
+import os
+import random
+import tempfile
+import unittest
+
+from text_similarity import IdfTable, TextSimilarity, term_counts
+
+QUERY = "CRISPR guide RNA delivery with lipid nanoparticles for gene editing"
+
+TEXTS = [
+    "Lipid nanoparticle delivery of CRISPR guide RNA",
+    "crispr CRISPR crispr-cas9 gene gene gene editing",
+    "",
+    "the method and the system",   # stop words only
+    "a b c 1 2",                    # nothing two characters long
+    "Battery anode with lithium polymer",
+    "Gene editing; guide-RNA; lipid/nanoparticle (delivery) 2024",
+]
+
+
+def random_texts(count: int, seed: int = 11):
+    rng = random.Random(seed)
+    words = QUERY.lower().split() + ["battery", "anode", "polymer", "antibody", "the", "method", "x"]
+    return [" ".join(rng.choices(words, k=rng.randint(0, 40))) for _ in range(count)]
+
+
+class ScoreAllTest(unittest.TestCase):
+    def assert_batch_matches(self, similarity: TextSimilarity, texts):
+        # Exact equality: score_all promises the same bits as score
+        self.assertEqual(similarity.score_all(texts).tolist(), [similarity.score(text) for text in texts])
+
+    def test_without_idf_table(self):
+        self.assert_batch_matches(TextSimilarity(QUERY, IdfTable(0, {})), TEXTS + random_texts(200))
+
+    def test_with_idf_table(self):
+        table = IdfTable.from_texts(random_texts(100, seed=5))
+        self.assert_batch_matches(TextSimilarity(QUERY, table), TEXTS + random_texts(200))
+
+    def test_empty_query_scores_zero(self):
+        similarity = TextSimilarity("the method", IdfTable(0, {}))
+        self.assertEqual(similarity.score_all(TEXTS).tolist(), [0.0] * len(TEXTS))
+        self.assertEqual(similarity.score(TEXTS[0]), 0.0)
+
+    def test_scores_are_bounded(self):
+        similarity = TextSimilarity(QUERY, IdfTable(0, {}))
+        self.assertAlmostEqual(similarity.score(QUERY), 1.0)
+        self.assertTrue(all(0.0 <= score <= 1.0 + 1e-12 for score in similarity.score_all(TEXTS)))
+
+
+class IdfTableTest(unittest.TestCase):
+    def test_from_texts_counts_documents_not_occurrences(self):
+        table = IdfTable.from_texts(["crispr crispr gene", "gene the", ""])
+        self.assertEqual(table.document_count, 3)
+        self.assertEqual(table.document_frequency, {"crispr": 1, "gene": 2})
+        self.assertGreater(table.idf("crispr"), table.idf("gene"))
+        self.assertGreater(table.idf("unseen"), table.idf("crispr"))
+
+    def test_save_and_load_round_trip(self):
+        table = IdfTable.from_texts(TEXTS + random_texts(50))
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, "idf_table.json")
+            table.save(path)
+            loaded = IdfTable.load(path)
+        self.assertEqual(loaded.document_count, table.document_count)
+        self.assertEqual(loaded.document_frequency, table.document_frequency)
+        self.assertEqual(loaded.fingerprint, table.fingerprint)
+        texts = TEXTS + random_texts(50, seed=2)
+        self.assertEqual(
+            TextSimilarity(QUERY, loaded).score_all(texts).tolist(),
+            TextSimilarity(QUERY, table).score_all(texts).tolist(),
+        )
+
+    def test_fingerprint_follows_the_counts(self):
+        self.assertEqual(IdfTable(2, {"a1": 1, "b2": 2}).fingerprint, IdfTable(2, {"b2": 2, "a1": 1}).fingerprint)
+        self.assertNotEqual(IdfTable(2, {"a1": 1}).fingerprint, IdfTable(3, {"a1": 1}).fingerprint)
+
+
+class TermCountsTest(unittest.TestCase):
+    def test_lowercased_terms_without_stop_words(self):
+        self.assertEqual(term_counts("The CRISPR method: crispr-Cas9 x 42"), {"crispr": 2, "cas9": 1, "42": 1})
+        self.assertEqual(term_counts(""), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,193 @@
+"""
+Lexical similarity between the research and each patent: the cosine of their
+TF-IDF vectors (sublinear term frequency, smoothed IDF), computed locally.
+
+Term rarity comes from an IdfTable of document frequencies over stored
+patents, built once with
+
+    python text_similarity.py --output idf_table.json
+
+and read from IDF_TABLE_PATH. Without a table every term weighs the same and
+the score is the cosine of the term frequencies alone.
+
+``TextSimilarity.score`` compares one text; ``score_all`` compares many at once
+as sparse vectors in NumPy arrays, with bit-identical results.
+"""
+import argparse
+import functools
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List
+
+DEFAULT_IDF_TABLE_PATH = os.getenv(
+    "IDF_TABLE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "idf_table.json")
+)
+
+_TOKEN = re.compile(r"[a-z0-9]{2,}")
+
+# English function words and patent boilerplate that carry no topic
+STOP_WORDS = frozenset((
+    "a an and any are as at be been being between both but by can each either for from has have "
+    "in into is it its may more most no not of on one or other same some such than that the their "
+    "them then there thereby therefore these they this those through thus to two under upon via was "
+    "were when where which while with within without "
+    "according apparatus based claim claims comprise comprises comprising configured consisting "
+    "device disclosed embodiment embodiments first further herein including least method methods "
+    "plurality present provide provided provides providing second system systems thereof third "
+    "using wherein"
+).split())
+
+
+def term_counts(text: str) -> Counter:
+    """
+    Occurrences of each lowercased alphanumeric term of two or more characters,
+    stop words removed, in order of first occurrence
+    """
+    counts = Counter(_TOKEN.findall(text.lower())) if text else Counter()
+    for stop_word in STOP_WORDS.intersection(counts):
+        del counts[stop_word]
+    return counts
+
+
+@functools.lru_cache(maxsize=256)
+def _sublinear_tf(count: int) -> float:
+    return 1.0 + math.log(count)
+
+
+class IdfTable:
+    """Number of documents each term occurs in, over a corpus of patent texts"""
+
+    def __init__(self, document_count: int, document_frequency: Dict[str, int]):
+        self.document_count = int(document_count)
+        self.document_frequency = document_frequency
+        payload = json.dumps([self.document_count, sorted(document_frequency.items())])
+        self.fingerprint = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+    @classmethod
+    def from_texts(cls, texts: Iterable[str]) -> "IdfTable":
+        frequency: Counter = Counter()
+        count = 0
+        for text in texts:
+            frequency.update(term_counts(text).keys())
+            count += 1
+        return cls(count, dict(frequency))
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_IDF_TABLE_PATH) -> "IdfTable":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["document_count"], data["document_frequency"])
+
+    def save(self, path: str):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"document_count": self.document_count, "document_frequency": self.document_frequency}, f)
+
+    def idf(self, term: str) -> float:
+        """Smoothed inverse document frequency; 1.0 for every term of an empty table"""
+        return math.log((1 + self.document_count) / (1 + self.document_frequency.get(term, 0))) + 1.0
+
+
+@functools.lru_cache(maxsize=None)
+def load_default_idf_table() -> IdfTable:
+    """The table at IDF_TABLE_PATH, parsed once per process; empty if there is none"""
+    if not os.path.exists(DEFAULT_IDF_TABLE_PATH):
+        return IdfTable(0, {})
+    return IdfTable.load(DEFAULT_IDF_TABLE_PATH)
+
+
+class TextSimilarity:
+    """TF-IDF cosine similarity of texts to one query text, in [0, 1]"""
+
+    def __init__(self, query: str, idf_table: IdfTable):
+        self.idf_table = idf_table
+        self._idf: Dict[str, float] = {}
+        weights = {term: _sublinear_tf(count) * self._term_idf(term) for term, count in term_counts(query).items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        self._query = {term: weight / norm for term, weight in weights.items()} if norm else {}
+
+    def _term_idf(self, term: str) -> float:
+        idf = self._idf.get(term)
+        if idf is None:
+            idf = self._idf[term] = self.idf_table.idf(term)
+        return idf
+
+    def score(self, text: str) -> float:
+        if not self._query:
+            return 0.0
+        dot = 0.0
+        squares = 0.0
+        for term, count in term_counts(text).items():
+            weight = _sublinear_tf(count) * self._term_idf(term)
+            squares += weight * weight
+            dot += weight * self._query.get(term, 0.0)
+        return dot / math.sqrt(squares) if squares else 0.0
+
+    def score_all(self, texts: List[str]):
+        """``score`` of every text, as a NumPy array"""
+        import numpy as np
+
+        if not self._query:
+            return np.zeros(len(texts), dtype=np.float64)
+
+        # One sparse document-term matrix in coordinate form: the row of each
+        # non-zero entry, its term's index in the vocabulary and its count
+        lengths = np.empty(len(texts), dtype=np.int64)
+        vocabulary: Dict[str, int] = {}
+        term_ids: List[int] = []
+        counts: List[int] = []
+        for row, text in enumerate(texts):
+            text_counts = term_counts(text)
+            lengths[row] = len(text_counts)
+            term_ids.extend([vocabulary.setdefault(term, len(vocabulary)) for term in text_counts])
+            counts.extend(text_counts.values())
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        term_ids_array = np.array(term_ids, dtype=np.int64)
+
+        # idf, query weight and sublinear tf are computed once per distinct term or count
+        idf = np.array([self._term_idf(term) for term in vocabulary], dtype=np.float64)[term_ids_array]
+        query = np.array([self._query.get(term, 0.0) for term in vocabulary], dtype=np.float64)[term_ids_array]
+        distinct_counts, count_ids = np.unique(np.array(counts, dtype=np.int64), return_inverse=True)
+        tf = np.array([_sublinear_tf(int(count)) for count in distinct_counts], dtype=np.float64)[count_ids]
+
+        weights = tf * idf
+        # bincount sums each row's entries in order, like the loop in score()
+        squares = np.bincount(rows, weights=weights * weights, minlength=len(texts))
+        dot = np.bincount(rows, weights=weights * query, minlength=len(texts))
+        norms = np.sqrt(squares)
+        return np.divide(dot, norms, out=np.zeros(len(texts), dtype=np.float64), where=squares > 0)
+
+
+def research_text(research_data: Dict) -> str:
+    """The research's title, description and keywords as one text"""
+    return " ".join([
+        research_data.get("title") or "",
+        research_data.get("description") or "",
+        *research_data.get("keywords", []),
+    ])
+
+
+def patent_text(patent) -> str:
+    """A PatentRecord's title and abstract as one text"""
+    return f"{patent.title or ''} {patent.abstract or ''}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the IDF table for text similarity from stored patents")
+    parser.add_argument("--output", default=DEFAULT_IDF_TABLE_PATH, help="JSON file to write")
+    args = parser.parse_args(argv)
+
+    from database import SessionLocal
+    from patent_store import iter_patent_texts
+
+    with SessionLocal() as db:
+        table = IdfTable.from_texts(iter_patent_texts(db))
+    table.save(args.output)
+    print(f"Wrote {len(table.document_frequency)} terms from {table.document_count} patents to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+Watchlists: finished analyses that are re-searched on a schedule.
+
+Each run only asks for publications newer than the watchlist's watermark (the
+latest publication date already seen, minus a lookback window for late
+indexing), merges the new hits into the analysis and rescores just those.
+Searches after a watermark return the oldest SEARCH_LIMIT matches, so a run
+pages forward through a backlog instead of skipping the older part of it.
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from database import AsyncSessionLocal, Watchlist, WatchlistRun
+
+DEFAULT_INTERVAL_DAYS = int(os.getenv("WATCHLIST_INTERVAL_DAYS", "7"))
+POLL_SECONDS = float(os.getenv("WATCHLIST_POLL_SECONDS", "60"))
+BATCH_SIZE = int(os.getenv("WATCHLIST_BATCH_SIZE", "500"))
+LOOKBACK_DAYS = int(os.getenv("WATCHLIST_LOOKBACK_DAYS", "30"))
+SEARCH_LIMIT = int(os.getenv("WATCHLIST_SEARCH_LIMIT", "100"))
+MAX_PAGES = int(os.getenv("WATCHLIST_MAX_PAGES", "10"))
+
+
+def date_to_int(value: datetime) -> int:
+    return int(value.strftime("%Y%m%d"))
+
+
+def parse_date_int(value) -> Optional[int]:
+    """YYYYMMDD int from "20240131", "2024-01-31" or 20240131; None if unparseable"""
+    digits = "".join(ch for ch in str(value or "") if ch.isdigit())
+    return int(digits[:8]) if len(digits) >= 8 else None
+
+
+def search_watermark(watermark: int, lookback_days: int = LOOKBACK_DAYS) -> int:
+    """
+    Publication date to search after: the watermark minus ``lookback_days``,
+    since publications can show up in the dataset a while after their date.
+    Hits already stored are skipped when merging, so the overlap is harmless.
+    """
+    try:
+        day = datetime.strptime(str(watermark), "%Y%m%d")
+    except ValueError:
+        return watermark
+    return date_to_int(day - timedelta(days=lookback_days))
+
+
+def next_page_after(patents: List[Dict], limit: int) -> Optional[int]:
+    """
+    Publication date to continue a run's search after, or None when ``patents``
+    (one page of a search after a watermark) was the last page. The next page
+    starts again at the newest date seen, since more publications of that day
+    may have been cut off by the limit; a page that is all one day moves past it.
+    """
+    if len(patents) < limit:
+        return None
+    dates = [d for d in (parse_date_int(p.get("publication_date")) for p in patents) if d]
+    if not dates:
+        return None
+    newest = max(dates)
+    return newest if min(dates) == newest else newest - 1
+
+
+def advance_watermark(watermark: int, patents: Iterable[Dict]) -> int:
+    """Latest publication date among ``patents``, never moving backwards"""
+    dates = [parse_date_int(p.get("publication_date")) for p in patents]
+    return max([watermark] + [d for d in dates if d])
+
+
+def initial_watermark(patents: Iterable[Dict], created_at: Optional[datetime]) -> int:
+    """Latest publication date the analysis already has, else the day it was created"""
+    fallback = date_to_int(created_at or datetime.utcnow())
+    dates = [d for d in (parse_date_int(p.get("publication_date")) for p in patents) if d]
+    return max(dates) if dates else fallback
+
+
+def watchlist_to_dict(watchlist: Watchlist) -> Dict:
+    return {
+        "analysis_id": watchlist.analysis_id,
+        "jurisdiction": watchlist.jurisdiction,
+        "interval_days": watchlist.interval_days,
+        "watermark": watchlist.watermark,
+        "active": watchlist.active,
+        "created_at": watchlist.created_at.isoformat() if watchlist.created_at else None,
+        "last_run_at": watchlist.last_run_at.isoformat() if watchlist.last_run_at else None,
+        "next_run_at": watchlist.next_run_at.isoformat() if watchlist.next_run_at else None,
+    }
+
+
+def run_to_dict(run: WatchlistRun) -> Dict:
+    return {
+        "run_id": run.run_id,
+        "started_at": run.started_at.isoformat() if run.started_at else None,
+        "status": run.status,
+        "previous_watermark": run.previous_watermark,
+        "watermark": run.watermark,
+        "new_patents": run.new_patents or [],
+        "new_high_risk_patents": run.new_high_risk_patents or [],
+        "previous_risk_level": run.previous_risk_level,
+        "risk_level": run.risk_level,
+        "error": run.error,
+    }
+
+
+class WatchlistScheduler:
+    """
+    Background loop that every ``poll_interval`` seconds collects up to
+    ``batch_size`` due watchlists and hands their analysis ids to ``run_due``,
+    which searches them together and reschedules each one.
+    """
+
+    def __init__(self, run_due: Callable[[List[str]], Awaitable[None]],
+                 poll_interval: float = POLL_SECONDS, batch_size: int = BATCH_SIZE,
+                 session_factory=AsyncSessionLocal):
+        self.run_due = run_due
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Start polling (call from the app lifespan)"""
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def due(self, now: Optional[datetime] = None) -> List[str]:
+        """Analysis ids of active watchlists whose next run is due, most overdue first"""
+        async with self.session_factory() as db:
+            rows = await db.execute(
+                select(Watchlist.analysis_id)
+                .where(Watchlist.active.is_(True), Watchlist.next_run_at <= (now or datetime.utcnow()))
+                .order_by(Watchlist.next_run_at)
+                .limit(self.batch_size)
+            )
+            return list(rows.scalars())
+
+    async def run_once(self) -> int:
+        """Run one batch of due watchlists; returns how many were run"""
+        due = await self.due()
+        if due:
+            await self.run_due(due)
+        return len(due)
+
+    async def _loop(self):
+        while True:
+            try:
+                # Keep going while a backlog remains, then wait for the next poll
+                while await self.run_once() >= self.batch_size:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Watchlist run failed: {str(e)}")
+            await asyncio.sleep(self.poll_interval)
@@ -177,6 +177,10 @@ const AnalysisResults = ({ analysisId, initialData, onNewAnalysis }) => {
                         <span>Keyword Match:</span>
                         <span>{(patent.risk_factors.keyword_overlap * 100).toFixed(0)}%</span>
                       </div>
+                      <div className="score-item">
+                        <span>Text Match:</span>
+                        <span>{((patent.risk_factors.text_similarity ?? 0) * 100).toFixed(0)}%</span>
+                      </div>
                       <div className="score-item">
                         <span>Field Match:</span>
                         <span>{(patent.risk_factors.classification_match * 100).toFixed(0)}%</span>
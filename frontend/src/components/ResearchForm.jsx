@@ -56,6 +56,30 @@ const ResearchForm = ({ onAnalysisComplete, onLoadingStart }) => {
     return Object.keys(newErrors).length === 0;
   };
 
+  const waitForAnalysis = (analysisId) => new Promise((resolve, reject) => {
+    const events = new EventSource(api.getEvents(analysisId));
+
+    events.addEventListener('status', (event) => {
+      const status = JSON.parse(event.data);
+      if (status.status === 'completed' || status.status === 'error') {
+        events.close();
+        resolve(status);
+      }
+    });
+
+    events.onerror = () => {
+      // Fall back to a single status poll if the stream drops
+      events.close();
+      axios.get(api.getStatus(analysisId))
+        .then(({ data }) => (
+          data.status === 'completed' || data.status === 'error'
+            ? resolve(data)
+            : resolve(waitForAnalysis(analysisId))
+        ))
+        .catch(reject);
+    };
+  });
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     
@@ -78,9 +102,16 @@ const ResearchForm = ({ onAnalysisComplete, onLoadingStart }) => {
       };
 
       const response = await axios.post(api.analyze, requestData);
-      
+      const analysisId = response.data.analysis_id;
+
+      // The search runs in the background; wait for it to finish
+      const finalStatus = await waitForAnalysis(analysisId);
+      if (finalStatus.status !== 'completed') {
+        throw new Error(finalStatus.message || 'Patent search failed');
+      }
+
       // Pass the results to parent component
-      onAnalysisComplete(response.data.analysis_id, response.data);
+      onAnalysisComplete(analysisId, finalStatus);
     } catch (error) {
       console.error('Analysis failed:', error);
       alert('Analysis failed. Please try again.');